@@ -1,119 +1,280 @@
+import itertools
 import re
-from urllib import response
-import PyPDF2 
-import io
-
-from click import prompt
-from langchain.embeddings.base import Embeddings
-from langchain_community.vectorstores import FAISS
-from groq import Groq
-import numpy as np
-
-# Simple embeddings using TF-IDF style approach (no torch needed)
-class SimpleEmbeddings(Embeddings):
-    """Simple embeddings using hash-based vectors"""
-    def embed_documents(self, texts):
-        """Embed a list of texts"""
-        embeddings = []
-        for text in texts:
-            # Create a simple embedding from text
-            hash_val = hash(text) % 10000
-            embedding = np.random.RandomState(hash_val).randn(384).tolist()
-            embeddings.append(embedding)
-        return embeddings
-    
-    def embed_query(self, text):
-        """Embed a single query"""
-        hash_val = hash(text) % 10000
-        return np.random.RandomState(hash_val).randn(384).tolist()
-from langchain.chains import RetrievalQA
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from concurrent.futures import ThreadPoolExecutor
 import tempfile
 import os
 import json
+import threading
+import time
+from candidate_store import content_hash
+from llm import cacheable, route_for, shared_llm_cache, shared_llm_stats, shared_single_flight
+from llm_backends import backend_from_config
+from question_bank import normalize_question
+from resume_sections import ResumeSections
+from skill_extractor import extract_skills, merge_skills
+from skill_results import analysis_from_counts, vocabulary_for
+
+# Heavy dependencies (Groq SDK, PyPDF2, LangChain, FAISS) are imported where
+# they are used so that importing this module stays cheap at app start-up.
+
+# Prefix of the error returned for a rejected API key; other models would fail the same way
+INVALID_KEY_ERROR = "ERROR: Invalid Groq API Key."
+
+# Used only when the model returns too few questions of a type
+QUESTION_TEMPLATES = {
+    "Basic": "Can you give a short overview of how you have used {skill}?",
+    "Technical": "How does {skill} work under the hood, and what trade-offs have you made when using it?",
+    "Experience": "Describe a project where you relied on {skill}. What was your role and what was the outcome?",
+    "Scenario": "Imagine a production problem involving {skill}. How would you investigate and resolve it?",
+    "Coding": "Write a short piece of code for a typical {skill} task and explain your approach.",
+    "Behavioral": "Tell me about a time you had to learn {skill} quickly. How did you go about it?",
+}
+
+def remove_files(paths):
+    """Delete files, ignoring ones already gone; empties the list in place"""
+    for path in list(paths):
+        try:
+            if os.path.exists(path):
+                os.unlink(path)
+        except OSError as e:
+            print(f"Error cleaning up temporary file {path}: {e}")
+    del paths[:]
 
 class ResumeAnalysisAgent:
-    def __init__(self, groq_api_key, cutoff_score=75):
+    def __init__(self, groq_api_key, cutoff_score=75, store=None, pool_index=None, single_flight=None,
+                 question_bank=None, llm_cache=None, fast_mode=False, llm_backend=None, ingestion_pool=None):
         self.groq_api_key = groq_api_key
         self.cutoff_score = cutoff_score
-        self.groq_client = Groq(api_key=groq_api_key)
+        # Fast screening: analysis makes no LLM calls; weakness detail is deferred to complete_details()
+        self.fast_mode = fast_mode
+        self._groq_client = None
+        self._groq_client_key = None
+        # Live Groq, or record/replay of a fixture file (MAIKNIT_LLM_BACKEND)
+        self.llm_backend = llm_backend or backend_from_config(lambda: self.groq_client)
+        # Shared by every agent in the process so identical prompts are sent once
+        self.single_flight = single_flight or shared_single_flight()
+        # Responses are shared through the data directory by every app worker on the host.
+        # Recording and replay bypass it, so every call reaches the fixture.
+        if llm_cache is None and self.llm_backend.name == "live":
+            llm_cache = shared_llm_cache()
+        self.llm_cache = llm_cache
+        self.store = store
+        self.pool_index = pool_index
+        # Documents are read in this pool's worker processes when set, otherwise in-process
+        self.ingestion_pool = ingestion_pool
+        # Per-document time limit for in-process reads (main thread only)
+        self.ingestion_timeout = None
+        self.question_bank = question_bank
+        # Temp and spill files this agent created; removed when its session ends
+        self.owned_files = []
+        self._spill_paths = {}
+        self.resume_hash = None
+        self.role_key = None
         self.resume_text = None
         self.rag_vectorstore = None
         self.analysis_result = None
         self.jd_text = None
         self.extracted_skills = None
+        # uint16 mention count per extracted skill for the current resume
+        self.skill_counts = None
         self.resume_weaknesses = []
         self.resume_strengths = []
         self.improvement_suggestions = {}
+        # Q&A answers per resume hash, keyed by normalised question
+        self.qa_answers = {}
+        self.qa_session = None
+        # Improvement suggestions keyed by (resume hash, role key, weaknesses digest, area, target role)
+        self.area_improvements = {}
+        # Serialises analyses, the write-back of background detail jobs and memory release
+        self._state_lock = threading.RLock()
+
+    @property
+    def groq_client(self):
+        """Groq client, created on first use and whenever the API key changes"""
+        if self._groq_client is None or self._groq_client_key != self.groq_api_key:
+            from groq import Groq
+            self._groq_client = Groq(api_key=self.groq_api_key)
+            self._groq_client_key = self.groq_api_key
+        return self._groq_client
+
+    # Raw text can be spilled to disk by release_memory() and is read back on access
+    def _get_spillable(self, name):
+        value = self.__dict__.get(f"_{name}")
+        path = self._spill_paths.get(name)
+        if value is None and path:
+            with open(path, 'r', encoding='utf-8') as f:
+                value = f.read()
+            self.__dict__[f"_{name}"] = value
+        return value
+
+    def _set_spillable(self, name, value):
+        path = self._spill_paths.pop(name, None)
+        if path:
+            self._remove_owned_file(path)
+        self.__dict__[f"_{name}"] = value
+
+    def _set_resume_text(self, value):
+        self._set_spillable("resume_text", value)
+        # The section index holds offsets into this text
+        self._resume_sections = None
+
+    resume_text = property(lambda self: self._get_spillable("resume_text"), _set_resume_text)
+    jd_text = property(lambda self: self._get_spillable("jd_text"),
+                       lambda self, value: self._set_spillable("jd_text", value))
+
+    @property
+    def resume_sections(self):
+        """Section and bullet index of the current resume, built once per resume text"""
+        if self._resume_sections is None and self.resume_text:
+            self._resume_sections = ResumeSections(self.resume_text)
+        return self._resume_sections
 
-    def call_groq_llm(self, prompt):
-        """Call Groq LLM to generate a response"""
+    @property
+    def rag_vectorstore(self):
+        """Vector store over the current resume, built on first use (and again after release_memory)"""
+        if self._rag_vectorstore is None and self.resume_text:
+            self._rag_vectorstore = self.create_rag_vector_store(self.resume_text)
+        return self._rag_vectorstore
+
+    @rag_vectorstore.setter
+    def rag_vectorstore(self, value):
+        self._rag_vectorstore = value
+
+    def _remove_owned_file(self, path):
+        remove_files([path])
+        if path in self.owned_files:
+            self.owned_files.remove(path)
+
+    def memory_footprint(self):
+        """Approximate bytes held by this agent's per-resume state"""
+        size = len(self.__dict__.get("_resume_text") or "") + len(self.__dict__.get("_jd_text") or "")
+        if self.analysis_result:
+            size += len(json.dumps(self.analysis_result, default=str))
+        if self._rag_vectorstore is not None:
+            index = self._rag_vectorstore.index
+            size += index.ntotal * index.d * 4
+            size += sum(len(doc.page_content) for doc in self._rag_vectorstore.docstore._dict.values())
+        if self._resume_sections is not None:
+            size += self._resume_sections.memory_footprint()
+        if self.qa_session:
+            size += self.qa_session.memory_footprint()
+        size += sum(len(answer) for answers in self.qa_answers.values() for answer in answers.values())
+        return size
+
+    def release_memory(self, spill_dir):
+        """Drop rebuildable state and spill raw text to spill_dir; returns approximate bytes released,
+        or None if an analysis or detail job is writing the agent's state right now"""
+        # A job that is mid-write would rebuild or re-set what we drop; skip this agent until next sweep
+        if not self._state_lock.acquire(blocking=False):
+            return None
+        try:
+            return self._release_memory(spill_dir)
+        finally:
+            self._state_lock.release()
+
+    def _release_memory(self, spill_dir):
+        before = self.memory_footprint()
+        # Rebuilt on demand from the resume text
+        self._rag_vectorstore = None
+        self._resume_sections = None
+        if self.qa_session:
+            self.qa_session.release()
+        for answers_hash in list(self.qa_answers):
+            if answers_hash != self.resume_hash:
+                del self.qa_answers[answers_hash]
+        for name in ("resume_text", "jd_text"):
+            value = self.__dict__.get(f"_{name}")
+            if value and name not in self._spill_paths:
+                with tempfile.NamedTemporaryFile(delete=False, dir=spill_dir, suffix=f'-{name}.txt',
+                                                 mode='w', encoding='utf-8') as f:
+                    f.write(value)
+                self._spill_paths[name] = f.name
+                self.owned_files.append(f.name)
+            if name in self._spill_paths:
+                self.__dict__[f"_{name}"] = None
+        return before - self.memory_footprint()
+
+    def call_groq_llm(self, prompt, task="default"):
+        """Call Groq LLM to generate a response, with the model settings routed for the task"""
+        route = route_for(task)
+        key = content_hash(json.dumps([route["model"], route["temperature"], route["max_tokens"], prompt]))
+        # Sampled responses are only coalesced, not kept, unless the route opts in
+        cache = self.llm_cache if cacheable(route) else None
+        if cache:
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
+        return self.single_flight.do(key, lambda: self._cached_completion(key, prompt, route, task, cache))
+
+    def _cached_completion(self, key, prompt, route, task, cache):
+        if cache:
+            # Another worker may have answered this prompt while we waited for the lease
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
+        response = self._groq_completion(prompt, route["model"], route, task)
+        if response.startswith("ERROR:") and route.get("fallback") and not response.startswith(INVALID_KEY_ERROR):
+            response = self._groq_completion(prompt, route["fallback"], route, task, fallback=True)
+        if cache and not response.startswith("ERROR:"):
+            cache.put(key, response)
+        return response
+
+    def _groq_completion(self, prompt, model, route=None, task="default", fallback=False):
+        route = route or route_for(task)
+        began = time.perf_counter()
         try:
-            message = self.groq_client.chat.completions.create(
-                model="llama-3.1-8b-instant",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.7,
-                max_tokens=1024,
-            )
-            return message.choices[0].message.content
+            completion = self.llm_backend.complete(prompt, model, route)
+            shared_llm_stats().record(task, model, time.perf_counter() - began - completion.waited,
+                                      completion.prompt_tokens, completion.completion_tokens,
+                                      fallback=fallback, waited=completion.waited)
+            return completion.content
         except Exception as e:
+            shared_llm_stats().record(task, model, time.perf_counter() - began, ok=False, fallback=fallback)
             error_msg = str(e)
             # Check if it's an API key issue
             if "401" in error_msg or "invalid_api_key" in error_msg.lower() or "unauthorized" in error_msg.lower():
-                return "ERROR: Invalid Groq API Key. Please check your API key at https://console.groq.com/keys"
+                return INVALID_KEY_ERROR + " Please check your API key at https://console.groq.com/keys"
             elif "decommissioned" in error_msg.lower():
                 return "ERROR: Model temporarily unavailable. Please try again later."
             else:
                 return f"ERROR: {error_msg[:100]}"
 
-    def extract_text_from_pdf(self, pdf_file):
-        """Extract text from a PDF file"""
-        try:
-            if hasattr(pdf_file, 'getvalue'):
-                pdf_data = pdf_file.getvalue()
-                pdf_file_like = io.BytesIO(pdf_data)
-                reader = PyPDF2.PdfReader(pdf_file_like)
-            else:
-                reader = PyPDF2.PdfReader(pdf_file)
-            
-            text = ""
-        
-            for page in reader.pages:
-                text += page.extract_text()    
-            return text
-        except Exception as e:
-            print(f"Error extracting text from PDF: {e}")
-            return None
+    def read_file_bytes(self, file):
+        """Return the raw bytes of an uploaded file or a file path"""
+        if hasattr(file, 'getvalue'):
+            return file.getvalue()
+        with open(file, 'rb') as f:
+            return f.read()
+
+    def extract_text_cached(self, file):
+        """Extract text from a file, reusing text any worker already extracted from the same bytes"""
+        if not self.store:
+            return self.extract_text_from_file(file)
+        file_hash = content_hash(self.read_file_bytes(file))
+        text = self.store.get_extracted_text(file_hash)
+        if text is None:
+            text = self.extract_text_from_file(file)
+            if text:
+                self.store.save_extracted_text(file_hash, text)
+        return text
 
-    def extract_text_from_txt(self, txt_file):
-        """Extract text from a text file"""
-        try:
-            if hasattr(txt_file, 'getvalue'):
-                return txt_file.getvalue().decode('utf-8')
-            else:
-                with open(txt_file, 'r', encoding='utf-8') as f:
-                    return f.read()
-        except Exception as e:
-            print(f"Error extracting text from text file: {e}")
-        return ""
-    
     def extract_text_from_file(self, file):
-        """Extract text from a file (PDF or TXT)"""
-        if hasattr(file, 'name'):
-            file_extension = file.name.split('.')[-1].lower()
-        else:
-            file_extension = file.split('.')[-1].lower()
-        if file_extension == 'pdf':
-            return self.extract_text_from_pdf(file)
-        elif file_extension == 'txt':
-            return self.extract_text_from_txt(file)
-        else:
-            print(f"Unsupported file extension: {file_extension}")
+        """Extract normalised text from a PDF, DOCX, HTML or TXT file (format detected from content)"""
+        from ingestion import IngestionError, read_document
+        name = getattr(file, 'name', None) or str(file)
+        try:
+            data = self.read_file_bytes(file)
+            if self.ingestion_pool:
+                return self.ingestion_pool.read(data, name)
+            return read_document(data, name, timeout=self.ingestion_timeout)
+        except (IngestionError, OSError) as e:
+            print(f"Error extracting text from {name}: {e}")
             return ""
-        
+
     def create_rag_vector_store(self, text):
         """Create a vector store for RAG"""
+        from langchain.text_splitter import RecursiveCharacterTextSplitter
+        from langchain_community.vectorstores import FAISS
+        from embeddings import SimpleEmbeddings
         text_splitter = RecursiveCharacterTextSplitter(
             chunk_size=1000,
             chunk_overlap=200,
@@ -126,6 +287,8 @@ class ResumeAnalysisAgent:
     
     def create_vector_store(self, text):
         """Create a simpler vector store for skill analysis"""
+        from langchain_community.vectorstores import FAISS
+        from embeddings import SimpleEmbeddings
         embeddings = SimpleEmbeddings()
         vectorstore = FAISS.from_texts([text], embeddings)
         return vectorstore
@@ -139,17 +302,46 @@ class ResumeAnalysisAgent:
         reasoning = response.split('.', 1)[1].strip() if '.' in response and len(response.split('.')) > 1 else ""
         return skill, min(score, 10), reasoning
     
-    def analyze_resume_weaknesses (self):
-        """Analyze weaknesses in the resume based on missing skills"""
+    def analyze_resume_weaknesses (self, on_weakness=None):
+        """Analyze weaknesses in the resume based on missing skills.
+
+        The skills are analysed concurrently; on_weakness(done, total) is
+        called as each finishes, with the weaknesses ready so far in
+        missing-skill order.
+        """
         if not self.resume_text or not self.extracted_skills or not self.analysis_result:
             return []
         
-        weaknesses = []
+        weaknesses = self._weakness_details(self.analysis_result, self.resume_sections, on_weakness)
+        self.resume_weaknesses = weaknesses
+        return weaknesses
+
+    def _weakness_details(self, analysis, sections, on_weakness=None):
         # Limit to top 3 missing skills to avoid timeout
-        missing_skills = self.analysis_result.get("missing_skills", [])[:3]
-        
-        for skill in missing_skills:
-            prompt = f"""For the skill "{skill}", provide improvement suggestions.
+        missing_skills = analysis.get("missing_skills", [])[:3]
+        if not missing_skills:
+            return []
+
+        from concurrent.futures import ThreadPoolExecutor, as_completed
+        finished = {}
+        with ThreadPoolExecutor(max_workers=len(missing_skills)) as executor:
+            futures = {executor.submit(self.analyze_weakness, skill, analysis, sections): skill
+                       for skill in missing_skills}
+            for future in as_completed(futures):
+                finished[futures[future]] = future.result()
+                if on_weakness:
+                    on_weakness([finished[skill] for skill in missing_skills if skill in finished],
+                                len(missing_skills))
+        return [finished[skill] for skill in missing_skills]
+
+    def analyze_weakness(self, skill, analysis=None, sections=None):
+        """Issue and suggestions for one missing skill, with one LLM call.
+
+        analysis and sections default to the current resume's.
+        """
+        analysis = analysis or self.analysis_result
+        sections = sections or self.resume_sections
+        prompt = f"""For the skill "{skill}", provide improvement suggestions.
 
 The resume lacks this skill or has minimal evidence.
 
@@ -159,55 +351,61 @@ Solution 1: [specific suggestion]
 Solution 2: [specific suggestion]  
 Solution 3: [specific suggestion]
 
-Example resume excerpt:
-{self.resume_text[:800]}"""
-            
-            try:
-                weakness_content = self.call_groq_llm(prompt)
-                
-                # Parse structured response
-                lines = weakness_content.split('\n')
-                weakness_desc = "Needs improvement"
-                suggestions = ["Add more details", "Include examples", "Use industry keywords"]
-                
-                for line in lines:
-                    if line.strip().startswith("Issue:"):
-                        weakness_desc = line.replace("Issue:", "").strip()
-                    elif line.strip().startswith("Solution"):
-                        suggestion_text = line.split(":", 1)[1].strip() if ":" in line else ""
-                        if suggestion_text:
-                            suggestions.append(suggestion_text)
-                
-                # Keep only first 3 suggestions
-                suggestions = suggestions[:3]
-
-                weakness_detail = {
-                    "skill": skill,
-                    "score": self.analysis_result.get("skill_scores", {}).get(skill, 0),
-                    "detail": weakness_desc,
-                    "suggestions": suggestions,
-                    "example": ""
-                }
-
-                weaknesses.append(weakness_detail)
-                self.improvement_suggestions[skill] = {"suggestions": suggestions}
-            except Exception as e:
-                # Fallback weakness if error occurs
-                weakness_detail = {
-                    "skill": skill,
-                    "score": self.analysis_result.get("skill_scores", {}).get(skill, 0),
-                    "detail": f"Limited evidence of {skill} in resume",
-                    "suggestions": ["Learn and practice this skill", "Add projects using this skill", "Get certifications"],
-                    "example": ""
-                }
-                weaknesses.append(weakness_detail)
-                continue
+Resume excerpt:
+{sections.excerpt(800, skills=[skill])}"""
         
-        self.resume_weaknesses = weaknesses
-        return weaknesses
-    
+        try:
+            weakness_content = self.call_groq_llm(prompt, task="weaknesses")
+            
+            # Parse structured response
+            lines = weakness_content.split('\n')
+            weakness_desc = "Needs improvement"
+            suggestions = ["Add more details", "Include examples", "Use industry keywords"]
+            
+            for line in lines:
+                if line.strip().startswith("Issue:"):
+                    weakness_desc = line.replace("Issue:", "").strip()
+                elif line.strip().startswith("Solution"):
+                    suggestion_text = line.split(":", 1)[1].strip() if ":" in line else ""
+                    if suggestion_text:
+                        suggestions.append(suggestion_text)
+            
+            # Keep only first 3 suggestions
+            suggestions = suggestions[:3]
+
+            weakness_detail = {
+                "skill": skill,
+                "score": analysis.get("skill_scores", {}).get(skill, 0),
+                "detail": weakness_desc,
+                "suggestions": suggestions,
+                "example": ""
+            }
+
+            self.improvement_suggestions[skill] = {"suggestions": suggestions}
+        except Exception as e:
+            # Fallback weakness if error occurs
+            weakness_detail = {
+                "skill": skill,
+                "score": analysis.get("skill_scores", {}).get(skill, 0),
+                "detail": f"Limited evidence of {skill} in resume",
+                "suggestions": ["Learn and practice this skill", "Add projects using this skill", "Get certifications"],
+                "example": ""
+            }
+        return weakness_detail
+
     def extract_skills_from_jd(self, jd_text):
-        """Extract skills from a job description"""
+        """Extract skills from a job description.
+
+        Known skills are matched locally from the skill dictionary; unless in
+        fast mode, skills the LLM finds on top of those are merged in.
+        """
+        local_skills = extract_skills(jd_text)
+        if self.fast_mode:
+            return local_skills
+        return merge_skills(local_skills, self.llm_skills_from_jd(jd_text))
+
+    def llm_skills_from_jd(self, jd_text):
+        """Extract skills from a job description with the LLM"""
         try:
             prompt = f"""
             Extract a comprehensive list of technical skills, technologies, and
@@ -217,7 +415,7 @@ Example resume excerpt:
             Job Description:
             {jd_text}
             """
-            skills_text = self.call_groq_llm(prompt)
+            skills_text = self.call_groq_llm(prompt, task="skills")
             
             match = re.search(r'\[(.*?)\]', skills_text, re.DOTALL)
             if match:
@@ -247,8 +445,9 @@ Example resume excerpt:
             return []
         
     def semantic_skill_analysis(self, resume_text, skills):
-        """Analyze skills using Groq"""
+        """Score skills by how often the resume mentions them (deterministic, no LLM)"""
         if not skills:
+            self.skill_counts = None
             return {
                 "overall_score": 0,
                 "skill_scores": {},
@@ -256,138 +455,310 @@ Example resume excerpt:
                 "strengths": [],
                 "missing_skills": []
             }
-        
-        skill_scores = {}
-        skill_reasoning = {}
-        missing_skills = []
-        total_score = 0
-
-        for skill in skills:
-            resume_lower = resume_text.lower()
-            skill_lower = skill.lower()
-            
-            # Check if skill is mentioned in resume
-            skill_found = (skill_lower in resume_lower or 
-                          skill_lower.replace(" ", "") in resume_lower.replace(" ", ""))
-            
-            if not skill_found:
-                # Not mentioned = score 1
-                score = 1
-                skill_reasoning_text = "Not mentioned in resume"
-            else:
-                # Count mentions and analyze depth
-                skill_count = resume_lower.count(skill_lower)
-                
-                # Score based on mention frequency and depth
-                # This is DETERMINISTIC - no LLM subjectivity
-                if skill_count >= 5:
-                    # Mentioned 5+ times = strong evidence of expertise
-                    score = 8
-                    skill_reasoning_text = f"Mentioned {skill_count} times - strong experience"
-                elif skill_count >= 3:
-                    # Mentioned 3-4 times = moderate experience
-                    score = 6
-                    skill_reasoning_text = f"Mentioned {skill_count} times - moderate experience"
-                elif skill_count >= 2:
-                    # Mentioned twice = some experience
-                    score = 4
-                    skill_reasoning_text = f"Mentioned {skill_count} times - basic experience"
-                else:
-                    # Mentioned once = minimal mention
-                    score = 2
-                    skill_reasoning_text = "Mentioned once - minimal evidence"
-            
-            skill_scores[skill] = score
-            skill_reasoning[skill] = skill_reasoning_text
-            total_score += score
-            if score <= 4:
-                missing_skills.append(skill)
-
-        # Calculate overall score properly
-        if skills:
-            overall_score = int((total_score / (10 * len(skills))) * 100)
-            overall_score = min(100, max(0, overall_score))  # Ensure between 0-100
-        else:
-            overall_score = 0
-            
-        selected = overall_score >= self.cutoff_score
 
-        reasoning = "Candidate evaluated based on resume content"
-        strengths = [skill for skill, score in skill_scores.items() if score >= 7]  # Strengths at 7+ (strong evidence)
-        improvement_areas = missing_skills if not selected else []
-        
-        self.resume_strengths = strengths
-
-        return {
-            "overall_score": overall_score,
-            "skill_scores": skill_scores,
-            "skill_reasoning": skill_reasoning,
-            "selected": selected,
-            "reasoning": reasoning,
-            "missing_skills": missing_skills,
-            "strengths": strengths,
-            "improvement_areas": improvement_areas
-        }
+        # Counts per skill of the role's shared vocabulary; scores and reasoning derive from them
+        vocabulary = vocabulary_for(skills)
+        self.skill_counts = vocabulary.count_mentions(resume_text)
+        result = analysis_from_counts(vocabulary, self.skill_counts, self.cutoff_score)
+        self.resume_strengths = result["strengths"]
+        return result
     
-    def analyze_resume(self, resume_file, role_requirements=None, custom_jd=None):
-        """Analyze a resume against role requirements or a custom JD"""
-        self.resume_text = self.extract_text_from_file(resume_file)
+    def analyze_resume(self, resume_file, role_requirements=None, custom_jd=None, role_name=None,
+                       defer_details=False):
+        """Analyze a resume against role requirements or a custom JD.
 
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.txt', mode='w',
-        encoding='utf-8') as tmp:
-            tmp.write(self.resume_text)
-            self.resume_file_path = tmp.name
+        With defer_details (or in fast mode) only the scores are computed and
+        the LLM weakness analysis is left to complete_details().
+        """
+        with self._state_lock:
+            return self._analyze_resume(resume_file, role_requirements, custom_jd, role_name, defer_details)
+
+    def _analyze_resume(self, resume_file, role_requirements, custom_jd, role_name, defer_details):
+        resume_hash = content_hash(self.read_file_bytes(resume_file))
+        if custom_jd:
+            role_key = f"Custom JD {content_hash(self.read_file_bytes(custom_jd))[:12]}"
+        else:
+            role_key = role_name or "Custom Skills"
 
-        self.rag_vectorstore = self.create_rag_vector_store(self.resume_text)
+        # A resume already analysed for this role is served from the store
+        # without any PDF extraction or LLM calls
+        if self.store and self.load_from_store(resume_hash, role_key):
+            if not (self.fast_mode or defer_details):
+                self.complete_details()
+            return self.analysis_result
 
+        # Read everything first so a failed extraction leaves the previous resume's state intact
+        resume_text = self.extract_text_cached(resume_file)
+        if not resume_text:
+            raise ValueError("No text could be extracted from the resume")
         if custom_jd:
-            self.jd_text = self.extract_text_from_file(custom_jd)
-            self.extracted_skills = self.extract_skills_from_jd(self.jd_text)
-                    
-            self.analysis_result = self.semantic_skill_analysis(self.resume_text, self.extracted_skills)
-                
-        elif role_requirements:
-            self.extracted_skills = role_requirements
-            
-            self.analysis_result = self.semantic_skill_analysis(self.resume_text, role_requirements)
+            jd_text = self.extract_text_cached(custom_jd)
+            skills = self.extract_skills_from_jd(jd_text)
+        else:
+            skills = role_requirements
+
+        self.resume_hash = resume_hash
+        self.role_key = role_key
+        self.resume_text = resume_text
+        self._write_resume_temp_file()
+
+        # The RAG vector store is built lazily on first use
+        self.rag_vectorstore = None
+
+        if custom_jd:
+            self.jd_text = jd_text
+        if custom_jd or role_requirements:
+            self.extracted_skills = skills
+            self.analysis_result = self.semantic_skill_analysis(self.resume_text, skills)
 
+        self.resume_weaknesses = []
         if self.analysis_result and "missing_skills" in self.analysis_result and self.analysis_result["missing_skills"]:
-            self.analyze_resume_weaknesses()
+            if self.fast_mode or defer_details:
+                self.analysis_result["details_pending"] = True
+            else:
+                self.analyze_resume_weaknesses()
             
-            self.analysis_result ["detailed_weaknesses"] = self.resume_weaknesses
+                self.analysis_result ["detailed_weaknesses"] = self.resume_weaknesses
+
+        if self.store and self.analysis_result:
+            file_name = getattr(resume_file, 'name', None) or os.path.basename(str(resume_file))
+            self.store.save_resume(self.resume_hash, self.resume_text, file_name)
+            self.store.save_analysis(self.resume_hash, role_key, self.extracted_skills,
+                                     self.analysis_result, jd_text=self.jd_text)
+            if self.pool_index:
+                self.pool_index.add_resume(self.resume_hash, self.resume_text)
         
         return self.analysis_result
+
+    def load_from_store(self, resume_hash, role):
+        """Restore agent state from a stored analysis. Returns False if there is none."""
+        candidate = self.store.get_analysis(resume_hash, role)
+        if not candidate:
+            return False
+        return self.load_candidate(candidate)
+
+    def load_candidate(self, candidate):
+        """Restore agent state from a candidate record returned by the store"""
+        resume_text = self.store.get_resume_text(candidate["resume_hash"])
+        if resume_text is None:
+            return False
+        with self._state_lock:
+            self._load_candidate(candidate, resume_text)
+        return True
+
+    def _load_candidate(self, candidate, resume_text):
+        self.resume_hash = candidate["resume_hash"]
+        self.role_key = candidate["role"]
+        self.resume_text = resume_text
+        self.jd_text = candidate.get("jd_text")
+        self.extracted_skills = candidate["skills"]
+        self.skill_counts = None
+        self.analysis_result = candidate["analysis"]
+        # The cutoff may have changed since the analysis was stored
+        self.analysis_result["selected"] = self.analysis_result.get("overall_score", 0) >= self.cutoff_score
+        self.resume_strengths = self.analysis_result.get("strengths", [])
+        self.resume_weaknesses = self.analysis_result.get("detailed_weaknesses", [])
+        self.rag_vectorstore = None
+        self._write_resume_temp_file()
+
+    def complete_details(self, on_weakness=None):
+        """Run the deferred LLM weakness analysis and update the stored analysis.
+
+        on_weakness is passed to analyze_resume_weaknesses() to report each weakness as it is ready.
+        The analysis runs on a snapshot of the current resume; if another resume or role has been
+        analysed in the meantime only the store is updated, never the agent.
+        """
+        with self._state_lock:
+            analysis = self.analysis_result
+            if not analysis or not analysis.get("details_pending"):
+                return analysis
+            resume_hash, role_key = self.resume_hash, self.role_key
+            skills, jd_text, sections = self.extracted_skills, self.jd_text, self.resume_sections
+        details = {key: value for key, value in analysis.items() if key != "details_pending"}
+        if analysis.get("missing_skills"):
+            details["detailed_weaknesses"] = self._weakness_details(analysis, sections, on_weakness)
+        with self._state_lock:
+            if (self.resume_hash, self.role_key) == (resume_hash, role_key):
+                self.analysis_result = details
+                self.resume_weaknesses = details.get("detailed_weaknesses", self.resume_weaknesses)
+        if self.store and resume_hash and role_key:
+            self.store.save_analysis(resume_hash, role_key, skills, details, jd_text=jd_text)
+        return details
+
+    def _write_resume_temp_file(self):
+        if getattr(self, 'resume_file_path', None):
+            self._remove_owned_file(self.resume_file_path)
+        with tempfile.NamedTemporaryFile(delete=False, suffix='.txt', mode='w',
+        encoding='utf-8') as tmp:
+            tmp.write(self.resume_text)
+            self.resume_file_path = tmp.name
+        self.owned_files.append(self.resume_file_path)
     
     def ask_question(self, question):
         """Ask a question about the resume using Groq"""
         if not self.resume_text:
             return "Please analyze a resume first."
-        
-        prompt = f"""
-        Answer this question about the resume: {question}
-        
-        Resume:
-        {self.resume_text[:2000]}
-        """
-        return self.call_groq_llm(prompt)
+        session = self.get_qa_session(self.resume_hash, self.resume_text)
+        # Only standalone answers are memoised; follow-ups depend on the conversation
+        standalone = not session.turns
+        if standalone:
+            answer = self._cached_answer(self.resume_hash, question)
+            if answer is not None:
+                session.record(question, answer)
+                return answer
+        answer = session.ask(question)
+        if standalone and not answer.startswith("ERROR:"):
+            self._remember_answer(self.resume_hash, question, answer)
+        return answer
+
+    def get_qa_session(self, resume_hash, resume_text):
+        """The multi-turn Q&A session for a resume, created on first use"""
+        from qa_session import QASession
+        session = self.qa_session
+        if session is None or session.resume_hash != resume_hash:
+            sections = self.resume_sections if resume_hash == self.resume_hash else ResumeSections(resume_text)
+            session = QASession(resume_hash, resume_text, lambda prompt: self.call_groq_llm(prompt, task="qa"),
+                                sections=sections)
+            if resume_hash == self.resume_hash:
+                self.qa_session = session
+        return session
+
+    def _qa_artifact_kind(self, question):
+        return f"qa:{content_hash(normalize_question(question))[:16]}"
+
+    def _cached_answer(self, resume_hash, question):
+        # Memoised per resume so repeat questions (and reruns) never hit the network
+        answers = self.qa_answers.setdefault(resume_hash, {})
+        key = normalize_question(question)
+        if key in answers:
+            return answers[key]
+        if self.store and resume_hash:
+            stored = self.store.get_artifact(resume_hash, self._qa_artifact_kind(question))
+            if stored is not None:
+                answers[key] = stored
+                return stored
+        return None
+
+    def _remember_answer(self, resume_hash, question, answer):
+        self.qa_answers.setdefault(resume_hash, {})[normalize_question(question)] = answer
+        if self.store and resume_hash:
+            self.store.save_artifact(resume_hash, self._qa_artifact_kind(question), answer)
+
+    def _answer_standalone(self, resume_hash, resume_text, question):
+        answer = self._cached_answer(resume_hash, question)
+        if answer is None:
+            answer = self.get_qa_session(resume_hash, resume_text).ask(question, use_history=False)
+            if not answer.startswith("ERROR:"):
+                self._remember_answer(resume_hash, question, answer)
+        return answer
+
+    def prefetch_answers(self, questions, max_workers=4):
+        """Answer questions concurrently so later asks for the current resume are cache hits"""
+        if not self.resume_text:
+            return 0
+        from concurrent.futures import ThreadPoolExecutor
+        # Pin the resume so a new analysis mid-prefetch cannot mix up answers
+        resume_hash, resume_text = self.resume_hash, self.resume_text
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            answers = list(executor.map(
+                lambda q: self._answer_standalone(resume_hash, resume_text, q), questions
+            ))
+        return sum(1 for answer in answers if not answer.startswith("ERROR:"))
     
+    def question_skills(self):
+        """Skills interview questions are drawn for: the candidate's strengths first, then the rest"""
+        strengths = (self.analysis_result or {}).get("strengths", [])
+        skills = list(strengths) + [s for s in (self.extracted_skills or []) if s not in strengths]
+        return skills[:10]
+
     def generate_interview_questions(self, question_types, difficulty, num_questions):
         """Generate interview questions based on the resume"""
         if not self.resume_text or not self.extracted_skills:
             return []
+        if not question_types:
+            return []
+        # Requested count split evenly across the selected types
+        quotas = {q_type: num_questions // len(question_types) for q_type in question_types}
+        for q_type in question_types[:num_questions % len(question_types)]:
+            quotas[q_type] += 1
+
+        questions = []
+        gaps = dict(quotas)
+        if self.question_bank:
+            # Banked questions are served without any LLM call; only gaps are generated
+            skills = self.question_skills()
+            for q_type, quota in quotas.items():
+                banked = self.question_bank.assemble(skills, q_type, difficulty, quota)
+                questions.extend((q_type, question) for question in banked)
+                gaps[q_type] = quota - len(banked)
+        # Types with nothing left to generate (or a zero quota) get no sub-request
+        gaps = {q_type: gap for q_type, gap in gaps.items() if gap > 0}
+
+        seen = {normalize_question(question) for _, question in questions}
+
+        def take(generated):
+            for q_type, question in generated:
+                key = normalize_question(question)
+                if gaps.get(q_type, 0) > 0 and key and key not in seen:
+                    seen.add(key)
+                    questions.append((q_type, question))
+                    gaps[q_type] -= 1
+
+        if gaps:
+            # One sub-request per type, concurrently, so wall time stays close to a single call
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(max_workers=len(gaps)) as executor:
+                results = list(executor.map(
+                    lambda item: self.generate_personalized_questions({item[0]: item[1]}, difficulty),
+                    list(gaps.items())
+                ))
+            for generated in results:
+                take(generated)
+        gaps = {q_type: gap for q_type, gap in gaps.items() if gap > 0}
+        if gaps:
+            # One short top-up request for whatever the model skipped or duplicated
+            take(self.generate_personalized_questions(gaps, difficulty, exclude=[q for _, q in questions]))
+        # Templated questions on the candidate's skills guarantee the requested count; once every
+        # skill has been used, numbered follow-ups keep each round distinct
+        skills = list(dict.fromkeys(self.question_skills() + list(self.extracted_skills)))
+        for round_number in itertools.count():
+            gaps = {q_type: gap for q_type, gap in gaps.items() if gap > 0}
+            if not gaps:
+                break
+            for q_type in gaps:
+                template = QUESTION_TEMPLATES.get(q_type, QUESTION_TEMPLATES["Basic"])
+                if round_number:
+                    template = f"Follow-up {round_number}: {template}"
+                for skill in skills:
+                    if gaps[q_type] <= 0:
+                        break
+                    take([(q_type, template.format(skill=skill))])
+
+        # Keep the selected type order
+        questions.sort(key=lambda q: question_types.index(q[0]))
+        return questions
+
+    def generate_personalized_questions(self, counts, difficulty, exclude=()):
+        """Generate resume-specific interview questions, counts[type] of each type, with one LLM call"""
+        question_types = list(counts)
+        num_questions = sum(counts.values())
         try:
             context = f"""
 Resume Content:
-{self.resume_text[:1500]}
+{self.resume_sections.excerpt(1500, skills=self.question_skills())}
 
 Skills to focus on: {', '.join(self.extracted_skills[:10])}
 Strengths: {', '.join(self.analysis_result.get('strengths', []))}
 Areas for improvement: {', '.join(self.analysis_result.get('missing_skills', []))}
 """
            
-            prompt = f"""Generate {num_questions} personalized {difficulty.lower()} level interview questions for this candidate.
-Include ONLY these question types: {', '.join(question_types)}.
+            avoid = ""
+            if exclude:
+                avoid = "Do not repeat any of these questions:\n" + "\n".join(f"- {q}" for q in exclude) + "\n"
 
+            prompt = f"""Generate {num_questions} personalized {difficulty.lower()} level interview questions for this candidate.
+Include exactly: {', '.join(f"{n} {q_type}" for q_type, n in counts.items())}.
+{avoid}
 For each question:
 1. Start with [Type: <type>]
 2. Then write the question
@@ -396,7 +767,7 @@ For each question:
 
 Format each question on a new line starting with [Type: ...]"""
 
-            questions_text = self.call_groq_llm(prompt)
+            questions_text = self.call_groq_llm(prompt, task="questions")
 
             questions = []
             current_type = None
@@ -430,19 +801,41 @@ Format each question on a new line starting with [Type: ...]"""
                     else:
                         questions.append((current_type, line))
 
-            # Limit to requested number
-            questions = questions[:num_questions]
-            
-            # If no questions parsed, return at least default ones
-            if not questions:
-                for q_type in question_types[:num_questions]:
-                    questions.append((q_type, f"Tell me about your experience with {q_type.lower()}."))
-            
+            if not questions and len(question_types) == 1:
+                # Single-type requests are often answered without the [Type: ...] tags
+                for line in questions_text.split('\n'):
+                    line = re.sub(r'^\s*(?:[-*\u2022]|\d+[.)])\s*', '', line).strip()
+                    if line.endswith('?') and not line.startswith('ERROR:'):
+                        questions.append((question_types[0], line))
+
             return questions
         
         except Exception as e:
             print(f"Error generating interview questions: {e}")
             return []
+
+    def generate_bank_questions(self, skill, question_type, difficulty, n):
+        """Generate reusable (not resume-specific) questions for one question bank slot"""
+        prompt = f"""Write {n} distinct {difficulty.lower()} level {question_type} interview questions that assess a candidate's {skill}.
+They must not refer to any particular resume or company.
+Write one question per line with no numbering or extra text."""
+        response = self.call_groq_llm(prompt, task="question_bank")
+        if response.startswith("ERROR:"):
+            return []
+        questions = []
+        for line in response.split('\n'):
+            line = re.sub(r'^\s*(?:[-*\u2022]|\d+[.)])\s*', '', line).strip()
+            # Skip headings and chatter such as "Here are 6 questions:"
+            if len(line) > 15 and not line.endswith(':'):
+                questions.append(line)
+        return questions[:n]
+
+    def fill_question_bank(self, question_types, difficulties, skills=None):
+        """Top up the question bank for these skills (default: the candidate's); returns the number of new questions"""
+        skills = skills or self.question_skills()
+        if not self.question_bank or not skills:
+            return 0
+        return self.question_bank.fill(self.generate_bank_questions, skills, question_types, difficulties)
         
     def improve_resume(self, improvement_areas, target_role=""):
         """Generate suggestions to improve the resume"""
@@ -469,13 +862,8 @@ Format each question on a new line starting with [Type: ...]"""
                                 skill_improvements ["specific"].append(f"**{skill_name}**: {suggestion}")
 
                         if "example" in weakness and weakness ["example"]:
-                            resume_chunks = self.resume_text.split('\n\n')
-                            relevant_chunk = ""
-                            for chunk in resume_chunks:
-                                if skill_name.lower() in chunk.lower() or "experience" in chunk.lower():
-                                    relevant_chunk = chunk
-                                    break
-                                    
+                            # The entry mentioning the skill, or the latest role
+                            relevant_chunk = self.resume_sections.relevant_block(skill_name)
                             if relevant_chunk:
                                 before_after_examples = {
                                 "before": relevant_chunk.strip(),
@@ -489,18 +877,40 @@ Format each question on a new line starting with [Type: ...]"""
                     improvements["Skills Highlighting"] = skill_improvements   
             remaining_areas = [area for area in improvement_areas if area not in improvements]
             if remaining_areas:
-                # Use Groq LLM instead of ChatOpenAI
-                weaknesses_text = ""
-                if self.resume_weaknesses:
-                    weaknesses_text = "Resume Weaknesses:\n"
-                    for i, weakness in enumerate(self.resume_weaknesses):
-                        weaknesses_text += f"{i+1}. {weakness ['skill']}: {weakness['detail']}\n"
-                        if "suggestions" in weakness:
-                            for j, sugg in enumerate (weakness ["suggestions"]):
-                                weaknesses_text += f" - {sugg}\n"
-                context = f"""
-                Resume Content (first 1000 chars):
-                {self.resume_text[:1000]}
+                # Each area is its own small request, run concurrently and cached per area
+                from concurrent.futures import ThreadPoolExecutor
+                context = self._improvement_context(target_role)
+                with ThreadPoolExecutor(max_workers=len(remaining_areas)) as executor:
+                    results = executor.map(lambda area: self.improve_area(area, target_role, context),
+                                           remaining_areas)
+                    for area, improvement in zip(remaining_areas, results):
+                        improvements[area] = improvement
+
+            for area in improvement_areas:
+                if area not in improvements:
+                    improvements [area] = {
+                        "description": f"Improvements needed in {area}",
+                        "specific": ["Review and enhance this section"]
+                    }
+            
+            return improvements
+        
+        except Exception as e:
+            print(f"Error generating resume improvements: {e}")
+            return {area: {"description": "Error generating improvements", "specific": []} for area in improvement_areas}
+        
+    def _improvement_context(self, target_role):
+        weaknesses_text = ""
+        if self.resume_weaknesses:
+            weaknesses_text = "Resume Weaknesses:\n"
+            for i, weakness in enumerate(self.resume_weaknesses):
+                weaknesses_text += f"{i+1}. {weakness ['skill']}: {weakness['detail']}\n"
+                if "suggestions" in weakness:
+                    for j, sugg in enumerate (weakness ["suggestions"]):
+                        weaknesses_text += f" - {sugg}\n"
+        return f"""
+                Resume Content (excerpts):
+                {self.resume_sections.excerpt(1000, skills=self.extracted_skills[:10])}
 
                 Skills to focus on: {', '.join(self.extracted_skills[:10])}
                 Strengths: {', '.join(self.analysis_result.get('strengths', []))}
@@ -509,63 +919,86 @@ Format each question on a new line starting with [Type: ...]"""
 
                 Target Role: {target_role if target_role else "Not specified"}
                 """
-                prompt = f"""Improve this resume in these areas: {', '.join(remaining_areas[:3])}.
 
-{context}
+    @staticmethod
+    def _parse_area_improvement(text):
+        # Extract from markdown code blocks if present
+        json_match = re.search(r'```(?:json)?\s*([\s\S]+?)\s*```', text)
+        raw = json_match.group(1) if json_match else None
+        if raw is None:
+            json_match = re.search(r'\{[\s\S]*\}', text)
+            raw = json_match.group(0) if json_match else None
+        if raw is None:
+            return None
+        try:
+            data = json.loads(raw)
+        except json.JSONDecodeError:
+            return None
+        # Accept the improvement itself or one wrapped in {"<area>": {...}}
+        if isinstance(data, dict) and "description" not in data and len(data) == 1:
+            data = next(iter(data.values()))
+        if not isinstance(data, dict) or "description" not in data:
+            return None
+        if not isinstance(data.get("specific"), list):
+            data["specific"] = [str(data["specific"])] if data.get("specific") else []
+        return data
+
+    def weaknesses_digest(self):
+        """Short hash of the weakness details, which improvements depend on and fast screening fills in later"""
+        return content_hash(json.dumps(self.resume_weaknesses, sort_keys=True))[:16]
+
+    def improve_area(self, area, target_role="", context=None):
+        """Suggestions for one improvement area, cached per (resume, role or JD, weaknesses, area, target role)"""
+        weaknesses = self.weaknesses_digest()
+        cache_key = (self.resume_hash, self.role_key, weaknesses, area, target_role)
+        if cache_key in self.area_improvements:
+            return self.area_improvements[cache_key]
+        artifact_kind = f"improve:{content_hash(json.dumps([self.role_key, weaknesses, area, target_role]))[:16]}"
+        if self.store and self.resume_hash:
+            stored = self.store.get_artifact(self.resume_hash, artifact_kind)
+            if stored is not None:
+                self.area_improvements[cache_key] = json.loads(stored)
+                return self.area_improvements[cache_key]
 
-For EACH improvement area, provide:
+        prompt = f"""Improve this resume in one area: {area}.
+
+{context or self._improvement_context(target_role)}
+
+Provide:
 1. description: What needs improvement
 2. specific: List of 3-5 actionable suggestions
 3. before_after: Example with "before" and "after" text
 
 Output ONLY valid JSON:
 {{
-  "area_name": {{
-    "description": "text",
-    "specific": ["suggestion1", "suggestion2"],
-    "before_after": {{"before": "old example", "after": "improved example"}}
-  }}
+  "description": "text",
+  "specific": ["suggestion1", "suggestion2"],
+  "before_after": {{"before": "old example", "after": "improved example"}}
 }}"""
+        improvement = None
+        # A malformed reply is retried once for this area only
+        for attempt in range(2):
+            response = self.call_groq_llm(prompt if attempt == 0 else
+                                          prompt + "\n\nYour previous reply was not valid JSON. Reply with the JSON object only.",
+                                          task="improvements")
+            if response.startswith("ERROR:"):
+                break
+            improvement = self._parse_area_improvement(response)
+            if improvement:
+                break
 
-                improve_text = self.call_groq_llm(prompt)
-
-                ai_improvements = {}
-
-                # Extract from markdown code blocks if present
-                json_match = re.search(r'```(?:json)?\s*([\s\S]+?)\s*```', improve_text)
-                if not json_match:
-                    json_match = re.search(r'\{[\s\S]*\}', improve_text)
-                    
-                if json_match:
-                    try:
-                        ai_improvements = json.loads(json_match.group(0) if json_match.group(0).startswith('{') else json_match.group(1))
-                        # Merge with existing improvements
-                        improvements.update(ai_improvements)
-                    except (json.JSONDecodeError, AttributeError, IndexError):
-                        pass
-                
-                # If JSON parsing failed, create basic improvements
-                if not ai_improvements:
-                    for area in remaining_areas:
-                        improvements[area] = {
-                            "description": f"Enhance {area} in your resume",
-                            "specific": [f"Add more details about {area}", f"Include quantifiable achievements", f"Use industry keywords"],
-                            "before_after": {"before": "Generic description", "after": "Specific, measurable achievement"}
-                        }
+        # If JSON parsing failed, create basic improvements (not cached, so a later request retries)
+        if not improvement:
+            return {
+                "description": f"Enhance {area} in your resume",
+                "specific": [f"Add more details about {area}", f"Include quantifiable achievements", f"Use industry keywords"],
+                "before_after": {"before": "Generic description", "after": "Specific, measurable achievement"}
+            }
+        self.area_improvements[cache_key] = improvement
+        if self.store and self.resume_hash:
+            self.store.save_artifact(self.resume_hash, artifact_kind, json.dumps(improvement))
+        return improvement
 
-            for area in improvement_areas:
-                if area not in improvements:
-                    improvements [area] = {
-                        "description": f"Improvements needed in {area}",
-                        "specific": ["Review and enhance this section"]
-                    }
-            
-            return improvements
-        
-        except Exception as e:
-            print(f"Error generating resume improvements: {e}")
-            return {area: {"description": "Error generating improvements", "specific": []} for area in improvement_areas}
-        
     def get_improved_resume(self, target_role="", highlight_skills=""):
         """Generate an improved version of the resume optimized for the job description"""
         if not self.resume_text:
@@ -620,6 +1053,24 @@ Output ONLY valid JSON:
                         if 'example' in weakness and weakness ['example']:
                             improvement_examples + f"For (skill_name): {weakness['example']}\n\n"
                         
+            # Where each highlighted skill already appears, so the rewrite strengthens those lines
+            sections = self.resume_sections
+            evidence_lines = []
+            unevidenced = []
+            for skill in skills_to_highlight:
+                evidence = sections.evidence(skill, limit=1)
+                if evidence:
+                    title, text = evidence[0]
+                    text = " ".join(text.split())
+                    evidence_lines.append(f"- {skill} ({title}): {text[:160]}")
+                else:
+                    unevidenced.append(skill)
+            skill_evidence = ""
+            if evidence_lines:
+                skill_evidence = "Where the highlighted skills already appear:\n" + "\n".join(evidence_lines) + "\n"
+            if unevidenced:
+                skill_evidence += f"Not yet shown anywhere in the resume: {', '.join(unevidenced)}\n"
+
             jd_context = ""
 
             if self.jd_text:
@@ -634,7 +1085,10 @@ Output ONLY valid JSON:
             Original Resume:
             {self.resume_text}
 
+            Resume structure: {sections.outline()}
+
             Skills to highlight(in order of priority): {', '.join(skills_to_highlight)}
+            {skill_evidence}
 
             {weakness_context}
 
@@ -654,12 +1108,18 @@ Output ONLY valid JSON:
             Format the resume in a modern ,clean style with clear section headings.
             """
 
-            improved_resume = self.call_groq_llm(prompt).strip()
+            improved_resume = self.call_groq_llm(prompt, task="rewrite").strip()
             
             with tempfile.NamedTemporaryFile(delete=False, suffix='.txt', mode='w',
                 encoding='utf-8') as tmp:
                 tmp.write(improved_resume)
+                if getattr(self, 'improved_resume_path', None):
+                    self._remove_owned_file(self.improved_resume_path)
                 self.improved_resume_path = tmp.name
+                self.owned_files.append(self.improved_resume_path)
+
+            if self.store and self.resume_hash and not improved_resume.startswith("ERROR:"):
+                self.store.save_artifact(self.resume_hash, "improved_resume", improved_resume)
                
             return improved_resume
         
@@ -668,13 +1128,5 @@ Output ONLY valid JSON:
             return "Error generating improved resume. Please try again."
         
     def cleanup(self):
-        """Clean up temporary files"""
-        try:
-            if hasattr(self, 'resume_file_path') and os.path.exists(self.
-            resume_file_path):
-                os.unlink(self.resume_file_path)
-            if hasattr(self, 'improved_resume_path') and os.path.exists(self.
-            improved_resume_path):
-                os.unlink(self.improved_resume_path)
-        except Exception as e:
-            print(f"Error cleaning up temporary files: {e}")
\ No newline at end of file
+        """Clean up temporary and spill files"""
+        remove_files(self.owned_files)
@@ -7,42 +7,19 @@ st.set_page_config(
 )
 import ui
 from agents import ResumeAnalysisAgent
+from roles import ROLE_REQUIREMENTS
+from candidate_store import CandidateStore, content_hash
+from candidate_index import CandidatePoolIndex
+from question_bank import QuestionBank
+from session_resources import SessionResourceManager
+from ingestion import IngestionPool
+from jobs import JobManager, FAILED
+import io
+import os
+import time
+import uuid
 import atexit
 
-#Role requirements dictionary
-ROLE_REQUIREMENTS = {
-    "AI/ML Engineer": [
-        "Python", "PyTorch", "TensorFlow", "Machine Learning", "Deep Learning", "MLOps", "Scikit-Learn", "NLP", "Computer Vision", "Reinforcement Learning", "Hugging Face", "Data Engineering", "Feature Engineering", "AutoML"
-    ],
-    "Frontend Engineer": [
-        "React", "Vue", "Angular", "HTML5", "CSS3", "JavaScript", "TypeScript", "Next.js", "Svelte", "Bootstrap", "Tailwind CSS", "GraphQL", "Redux", "WebAssembly", "Three.js", "Performance Optimization"
-    ],
-    "Backend Engineer": [
-        "Python", "Java", "Node.js", "REST APIs", "Cloud services", "Kubernetes", "Docker", "GraphQL", "Microservices", "gRPC", "Spring Boot", "Flask", "FastAPI", "SQL & NoSQL Databases", "Redis", "RabbitMQ", "CI/CD"
-    ],
-    "Data Engineer": [
-        "Python", "SQL", "Apache Spark", "Hadoop", "Kafka", "ETL Pipelines", "Airflow", "BigQuery", "Redshift", "Data Warehousing", "Snowflake", "Azure Data Factory", "GCP", "AWS Glue", "DBT"
-    ],
-    "DevOps Engineer": [
-        "Kubernetes", "Docker", "Terraform", "CI/CD", "AWS", "Azure", "GCP", "Jenkins", "Ansible", "Prometheus", "Grafana", "Helm", "Linux Administration",
-        "Networking", "Site Reliability Engineering (SRE)"
-    ],
-    "Full Stack Developer": [
-        "JavaScript", "TypeScript", "React", "Node.js", "Express", "MongoDB", "SQL", "HTML5", "CSS3", "RESTful APIs", "Git", "CI/CD", "Cloud Services",
-        "Responsive Design", "Authentication & Authorization"
-    ],
-    "Product Manager": [
-        "Product Strategy", "User Research", "Agile Methodologies", "Roadmapping", "Market Analysis", "Stakeholder Management", "Data Analysis", "User Stories",
-        "Product Lifecycle", "A/B Testing", "KPI Definition", "Prioritization",
-        "Competitive Analysis", "Customer Journey Mapping"
-    ],
-    "Data Scientist": [
-        "Python", "R", "SQL", "Machine Learning", "Statistics", "Data Visualization",
-        "Pandas", "NumPy", "Scikit-learn", "Jupyter", "Hypothesis Testing",
-        "Experimental Design", "Feature Engineering", "Model Evaluation"
-    ]
-}
-
 # Initialize session state variables
 if 'resume_agent' not in st.session_state: 
     st.session_state.resume_agent = None
@@ -53,6 +30,54 @@ if 'resume_analyzed' not in st.session_state:
 if 'analysis_result' not in st.session_state: 
     st.session_state.analysis_result = None
 
+if 'pending_jobs' not in st.session_state:
+    st.session_state.pending_jobs = {}
+
+if 'session_token' not in st.session_state:
+    st.session_state.session_token = uuid.uuid4().hex
+
+# Seconds between reruns while a background job is running
+JOB_POLL_SECONDS = 0.75
+
+# Answer the example Q&A questions in the background after each analysis
+QA_PREFETCH = os.environ.get("MAIKNIT_QA_PREFETCH", "1") != "0"
+
+@st.cache_resource
+def get_candidate_store():
+    """Shared persistent store of past analyses (one per process)"""
+    return CandidateStore()
+
+@st.cache_resource
+def get_pool_index():
+    """Shared semantic index over every analysed resume (one per process)"""
+    return CandidatePoolIndex(get_candidate_store(),
+                              index_type=os.environ.get("MAIKNIT_POOL_INDEX", "flat"))
+
+@st.cache_resource
+def get_question_bank():
+    """Shared bank of reusable interview questions (one per process)"""
+    return QuestionBank()
+
+@st.cache_resource
+def get_session_resources():
+    """Memory bounds and temp-file cleanup for every session's agent (one per process)"""
+    return SessionResourceManager(
+        idle_seconds=float(os.environ.get("MAIKNIT_SESSION_IDLE_SECONDS", "600")),
+        max_bytes=int(float(os.environ.get("MAIKNIT_SESSION_MEMORY_MB", "256")) * 1024 * 1024)
+    )
+
+@st.cache_resource
+def get_ingestion_pool():
+    """Worker processes that read uploaded documents, with per-document time and memory limits"""
+    return IngestionPool(max_workers=int(os.environ.get("MAIKNIT_INGEST_WORKERS", "2")),
+                         timeout=float(os.environ.get("MAIKNIT_INGEST_TIMEOUT", "30")),
+                         memory_mb=int(os.environ.get("MAIKNIT_INGEST_MEMORY_MB", "512")))
+
+@st.cache_resource
+def get_job_manager():
+    """Background runner for analysis, improvement and rewrite jobs (one per process)"""
+    return JobManager(max_workers=int(os.environ.get("MAIKNIT_JOB_WORKERS", "4")))
+
 def setup_agent(config):
     """Set up the resume analysis agent with Groq API key"""
     if not config["groq_api_key"]:
@@ -61,31 +86,146 @@ def setup_agent(config):
     
     # Initialize or update the agent with the Groq API key
     if st.session_state.resume_agent is None:
-        st.session_state.resume_agent = ResumeAnalysisAgent(groq_api_key=config["groq_api_key"])
+        st.session_state.resume_agent = ResumeAnalysisAgent(groq_api_key=config["groq_api_key"],
+                                                              store=get_candidate_store(),
+                                                              pool_index=get_pool_index(),
+                                                              question_bank=get_question_bank(),
+                                                              ingestion_pool=get_ingestion_pool())
     else:
         st.session_state.resume_agent.groq_api_key = config["groq_api_key"]
+    st.session_state.resume_agent.fast_mode = config.get("fast_screening", False)
     
     return st.session_state.resume_agent
 
+def reset_generated_results():
+    """Drop questions, suggestions, rewrites and the Q&A answer generated for the previous resume"""
+    for key in ("interview_questions", "resume_improvements", "improved_resume", "qa_answer"):
+        st.session_state.pop(key, None)
+
+def upload_copy(uploaded_file):
+    """Detached in-memory copy of an uploaded file for use on a worker thread"""
+    if uploaded_file is None:
+        return None
+    data = io.BytesIO(uploaded_file.getvalue())
+    data.name = uploaded_file.name
+    return data
+
+def submit_job(kind, key_parts, func, *args, meta=None, reuse_finished=True, with_progress=False, **kwargs):
+    """Start a background job for this session, or attach to an identical one already running"""
+    job_id = get_job_manager().submit(
+        kind, [st.session_state.session_token] + list(key_parts), func, *args,
+        reuse_finished=reuse_finished, with_progress=with_progress, **kwargs
+    )
+    st.session_state.pending_jobs[kind] = {"job_id": job_id, "meta": meta or {}}
+    return job_id
+
+def prefetch_example_answers(agent):
+    """Answer the example questions for the current resume in the background"""
+    if QA_PREFETCH and agent and agent.resume_hash:
+        # Not tracked in pending_jobs: nothing waits on it, it only warms the answer cache
+        get_job_manager().submit("qa_prefetch", [agent.resume_hash, id(agent)],
+                                 agent.prefetch_answers, ui.EXAMPLE_QUESTIONS)
+
+def fill_question_bank(agent, question_types, difficulty):
+    """Top up the question bank for the current candidate's skills in the background"""
+    if agent and agent.extracted_skills:
+        skills = agent.question_skills()
+        get_job_manager().submit("bank_fill", [skills, question_types, difficulty],
+                                 agent.fill_question_bank, question_types, [difficulty], skills=skills,
+                                 reuse_finished=False)
+
+def warm_candidate_caches(agent):
+    """Prefetch example answers and top up the question bank for a fully analysed candidate"""
+    prefetch_example_answers(agent)
+    fill_question_bank(agent, ui.DEFAULT_QUESTION_TYPES, ui.DEFAULT_DIFFICULTY)
+
+def complete_details(agent, warm_caches=False):
+    """Run the deferred weakness analysis in the background, publishing each weakness as it is ready"""
+    if agent and (agent.analysis_result or {}).get("details_pending"):
+        def run(report_progress):
+            return agent.complete_details(
+                on_weakness=lambda done, total: report_progress({"weaknesses": done, "total": total})
+            )
+        submit_job("details", [agent.resume_hash, agent.role_key], run, with_progress=True,
+                   meta={"warm_caches": warm_caches})
+
+def details_progress():
+    """Weaknesses ready so far and their total while the details job runs, else None"""
+    pending = st.session_state.pending_jobs.get("details")
+    job = get_job_manager().get(pending["job_id"]) if pending else None
+    if job is None:
+        return None
+    return job.progress or {"weaknesses": [], "total": None}
+
+def collect_finished_jobs():
+    """Move results of finished background jobs into session state"""
+    jobs = get_job_manager()
+    for kind, pending in list(st.session_state.pending_jobs.items()):
+        job = jobs.get(pending["job_id"])
+        if job is None:
+            st.session_state.pending_jobs.pop(kind)
+            st.warning(" A background task was lost. Please try again.")
+            continue
+        if not job.finished:
+            continue
+        st.session_state.pending_jobs.pop(kind)
+        if job.status == FAILED:
+            st.error(f" Error in background {kind} task: {job.error}")
+            continue
+        if kind == "analysis":
+            st.session_state.resume_analyzed = True
+            st.session_state.analysis_result = job.result
+            reset_generated_results()
+            # Scores are shown straight away; weaknesses follow one by one. Fast screening skips
+            # all further LLM work until the candidate is opened from the pool
+            if not st.session_state.resume_agent.fast_mode:
+                warm_candidate_caches(st.session_state.resume_agent)
+                complete_details(st.session_state.resume_agent)
+        elif kind == "details":
+            st.session_state.analysis_result = job.result
+            if pending["meta"].get("warm_caches"):
+                warm_candidate_caches(st.session_state.resume_agent)
+        elif kind == "improve":
+            st.session_state.resume_improvements = {"improvements": job.result, **pending["meta"]}
+        elif kind == "rewrite":
+            st.session_state.improved_resume = {"text": job.result, **pending["meta"]}
+
 def analyze_resume(agent, resume_file, role, custom_jd):
-    """Analyze the resume with the agent"""
+    """Score the resume in the background; the LLM weakness analysis follows as a separate job"""
     if not resume_file:
         st.error("A Please upload a resume.")
         return None
-    try:
-        with st.spinner(" Analyzing resume... This may take a minute."):
-            if custom_jd:
-                result = agent.analyze_resume(resume_file, custom_jd=custom_jd)
-            else:
-                result = agent.analyze_resume(resume_file,
-                role_requirements=ROLE_REQUIREMENTS[role])
-                st.session_state.resume_analyzed = True
-                st.session_state.analysis_result = result
-                return result
-    except Exception as e:
-        st.error(f" Error analyzing resume: {e}")
-        return None
+    resume_copy = upload_copy(resume_file)
+    jd_copy = upload_copy(custom_jd)
+    # Weaknesses still streaming in belong to the previous resume
+    st.session_state.pending_jobs.pop("details", None)
+    key_parts = [content_hash(resume_copy.getvalue()), role,
+                 content_hash(jd_copy.getvalue()) if jd_copy else None]
+    # Analysis changes the agent's current resume, so a finished job is never reused
+    if custom_jd:
+        return submit_job("analysis", key_parts, agent.analyze_resume, resume_copy,
+                          custom_jd=jd_copy, defer_details=True, reuse_finished=False)
+    return submit_job("analysis", key_parts, agent.analyze_resume, resume_copy,
+                      role_requirements=ROLE_REQUIREMENTS[role], role_name=role, defer_details=True,
+                      reuse_finished=False)
     
+def open_candidate(agent, candidate_id):
+    """Load a stored candidate into the agent without re-analysing"""
+    candidate = get_candidate_store().get_candidate(candidate_id)
+    if not candidate or not agent.load_candidate(candidate):
+        st.error(" Stored candidate could not be loaded.")
+        return None
+    st.session_state.resume_analyzed = True
+    st.session_state.analysis_result = agent.analysis_result
+    reset_generated_results()
+    st.session_state.pending_jobs.pop("details", None)
+    if agent.analysis_result.get("details_pending"):
+        # A fast-screened candidate: warm the caches once the deferred details are in
+        complete_details(agent, warm_caches=True)
+    else:
+        warm_candidate_caches(agent)
+    return agent.analysis_result
+
 def ask_question(agent, question):
     """Ask a question about the resume"""
     try:
@@ -95,40 +235,56 @@ def ask_question(agent, question):
     except Exception as e:
         return f"Error: {e}"
     
+def qa_conversation(agent):
+    """Question/answer turns of the current Q&A conversation"""
+    session = agent.qa_session
+    return list(session.turns) if session and session.resume_hash == agent.resume_hash else []
+
+def reset_qa_conversation(agent):
+    """Start the Q&A conversation afresh (cached answers are kept)"""
+    if agent.qa_session:
+        agent.qa_session.reset()
+    
 def generate_interview_questions (agent, question_types, difficulty, num_questions): 
     """Generate interview questions based on the resume"""
     try:
         with st.spinner ("Generating personalized interview questions..."): 
             questions = agent.generate_interview_questions(question_types, difficulty, num_questions)
-            return questions
+        # Bank the selected slots so the next candidate with these skills is served instantly
+        fill_question_bank(agent, question_types, difficulty)
+        return questions
     except Exception as e:
         st.error(f" Error generating questions: {e}")
         return []
     
 def improve_resume(agent, improvement_areas, target_role):
-    """Generate resume improvement suggestions"""
-    try:
-        with st.spinner("Analyzing and generating improvements..."):
-            return agent.improve_resume(improvement_areas, target_role)
-    except Exception as e:
-        st.error(f" Error generating improvements: {e}")
-        return {}
+    """Generate resume improvement suggestions in the background"""
+    # Weakness details arrive later for fast-screened candidates and change the suggestions
+    return submit_job("improve", [agent.resume_hash, agent.role_key, agent.weaknesses_digest(),
+                                  improvement_areas, target_role],
+                      agent.improve_resume, improvement_areas, target_role,
+                      meta={"target_role": target_role})
     
 def get_improved_resume(agent, target_role, highlight_skills):
-    """Get an improved version of the resume"""
-    try:
-        with st.spinner("Creating improved resume..."):
-            return agent.get_improved_resume(target_role, highlight_skills)
-    except Exception as e:
-        st.error(f" Error creating improved resume: {e}")
-    return "Error gefferating improved resume."
+    """Create an improved version of the resume in the background"""
+    # The rewrite follows the analysed role or JD and addresses the weaknesses found for it
+    return submit_job("rewrite", [agent.resume_hash, agent.role_key, agent.weaknesses_digest(),
+                                  target_role, highlight_skills],
+                      agent.get_improved_resume, target_role, highlight_skills,
+                      meta={"target_role": target_role})
 
 def cleanup():
     """Clean up resources when the app exits"""
-    if st.session_state.resume_agent:
-        st.session_state.resume_agent.cleanup()
+    # Sessions that ended earlier have already been cleaned up
+    get_session_resources().cleanup_all()
+    get_ingestion_pool().close()
+
+@st.cache_resource
+def register_cleanup():
+    """Register the exit handler once per process; the script itself runs on every rerun"""
+    atexit.register(cleanup)
 
-atexit.register(cleanup)
+register_cleanup()
 
 def main():
     ui.setup_page()
@@ -137,6 +293,13 @@ def main():
     config = ui.setup_sidebar()
 
     agent = setup_agent(config)
+    if agent:
+        resources = get_session_resources()
+        resources.touch(st.session_state.session_token, agent)
+        resources.sweep(current_token=st.session_state.session_token)
+
+    collect_finished_jobs()
+    pending_jobs = st.session_state.pending_jobs
 
     tabs = ui.create_tabs()
 
@@ -149,15 +312,25 @@ def main():
                 if agent and uploaded_resume:
                     analyze_resume(agent, uploaded_resume, role, custom_jd)
 
+        if "analysis" in pending_jobs:
+            st.info(" Analyzing resume in the background... You can keep using the app.")
+
         if st.session_state.analysis_result:
-            ui.display_analysis_results(st.session_state.analysis_result)
+            ui.display_analysis_results(
+                st.session_state.analysis_result,
+                cutoff_score=agent.cutoff_score if agent else 75,
+                accent_color=config["theme_color"],
+                details_progress=details_progress()
+            )
 
     # Tab 1: Resume Q&A
     with tabs[1]:
         if st.session_state.resume_analyzed and st.session_state.resume_agent:
             ui.resume_qa_section(
                 has_resume=True,
-                ask_question_func=lambda q: ask_question(st.session_state.resume_agent, q)
+                ask_question_func=lambda q: ask_question(st.session_state.resume_agent, q),
+                conversation_func=lambda: qa_conversation(st.session_state.resume_agent),
+                reset_conversation_func=lambda: reset_qa_conversation(st.session_state.resume_agent)
             )
         else:
             st.warning("Please upload and analyze a resume first in the 'Resume Analysis' tab.")
@@ -177,7 +350,8 @@ def main():
         if st.session_state.resume_analyzed and st.session_state.resume_agent:
             ui.resume_improvement_section(
                 has_resume=True,
-                improve_resume_func=lambda areas, role: improve_resume(st.session_state.resume_agent, areas, role)
+                improve_resume_func=lambda areas, role: improve_resume(st.session_state.resume_agent, areas, role),
+                pending="improve" in pending_jobs
             )
         else:
             st.warning("Please upload and analyze a resume first in the 'Resume Analysis' tab.")
@@ -187,11 +361,26 @@ def main():
         if st.session_state.resume_analyzed and st.session_state.resume_agent:
             ui.improved_resume_section(
                 has_resume=True,
-                get_improved_resume_func=lambda role, skills: get_improved_resume(st.session_state.resume_agent, role, skills)
+                get_improved_resume_func=lambda role, skills: get_improved_resume(st.session_state.resume_agent, role, skills),
+                pending="rewrite" in pending_jobs
             )
         else:
             st.warning("Please upload and analyze a resume first in the 'Resume Analysis' tab.")
 
+    # Tab 5: Candidate Search
+    with tabs[5]:
+        ui.candidate_search_section(
+            store=get_candidate_store(),
+            pool_index=get_pool_index(),
+            role_names=list(ROLE_REQUIREMENTS.keys()),
+            open_candidate_func=(lambda candidate_id: open_candidate(agent, candidate_id)) if agent else None
+        )
+
+    # Poll background jobs with cheap reruns until they finish
+    if st.session_state.pending_jobs:
+        time.sleep(JOB_POLL_SECONDS)
+        st.rerun()
+
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,118 @@
+import re
+import textwrap
+import threading
+from collections import OrderedDict
+
+FORMATS = {
+    "md": ("Markdown", "text/markdown"),
+    "txt": ("Plain text", "text/plain"),
+    "pdf": ("PDF", "application/pdf"),
+}
+
+
+def markdown_to_text(markdown):
+    """Strip the Markdown markup used in generated reports"""
+    text = re.sub(r"^#{1,6}\s*", "", markdown, flags=re.MULTILINE)
+    text = re.sub(r"\*\*(.+?)\*\*", r"\1", text)
+    text = re.sub(r"(?<!\w)\*(.+?)\*(?!\w)", r"\1", text)
+    text = re.sub(r"^```\w*\s*$", "", text, flags=re.MULTILINE)
+    return text
+
+
+def _pdf_escape(line):
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def text_to_pdf(text, title=None, font_size=10, line_height=14, width_chars=95):
+    """Render plain text as a simple paginated PDF using only the standard library"""
+    page_width, page_height, margin = 612, 792, 50
+    lines_per_page = (page_height - 2 * margin) // line_height
+
+    lines = []
+    for paragraph in text.splitlines():
+        wrapped = textwrap.wrap(paragraph, width_chars) if paragraph.strip() else [""]
+        lines.extend(wrapped)
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+
+    objects = []  # object bodies; object n is objects[n - 1]
+
+    def add(body):
+        objects.append(body)
+        return len(objects)
+
+    catalog = add(None)
+    page_tree = add(None)
+    font = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+    page_ids = []
+    for page_lines in pages:
+        content = [f"BT /F1 {font_size} Tf {line_height} TL {margin} {page_height - margin} Td"]
+        for line in page_lines:
+            content.append(f"({_pdf_escape(line)}) Tj T*")
+        content.append("ET")
+        stream = "\n".join(content).encode("cp1252", errors="replace")
+        content_id = add(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        page_ids.append(add(
+            f"<< /Type /Page /Parent {page_tree} 0 R /MediaBox [0 0 {page_width} {page_height}] "
+            f"/Resources << /Font << /F1 {font} 0 R >> >> /Contents {content_id} 0 R >>".encode()
+        ))
+    objects[page_tree - 1] = (
+        f"<< /Type /Pages /Kids [{' '.join(f'{pid} 0 R' for pid in page_ids)}] /Count {len(page_ids)} >>"
+    ).encode()
+    info = ""
+    if title:
+        info = f" /Info {add(f'<< /Title ({_pdf_escape(title)}) >>'.encode('cp1252', errors='replace'))} 0 R"
+    objects[catalog - 1] = f"<< /Type /Catalog /Pages {page_tree} 0 R >>".encode()
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root {catalog} 0 R{info} >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+
+def render_artifact(markdown, fmt, title=None):
+    """Render a Markdown report in one of FORMATS and return the bytes"""
+    if fmt == "md":
+        return markdown.encode("utf-8")
+    if fmt == "txt":
+        return markdown_to_text(markdown).encode("utf-8")
+    if fmt == "pdf":
+        return text_to_pdf(markdown_to_text(markdown), title=title)
+    raise ValueError(f"Unsupported artefact format: {fmt}")
+
+
+class ArtifactCache:
+    """Bounded LRU cache of rendered downloads, keyed by (artefact key, format).
+
+    Reports are only rendered when a download is requested, and the total
+    size of cached bytes is capped so long-running workers do not grow.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._items = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get_or_build(self, key, fmt, build_markdown, title=None):
+        """Return cached bytes for (key, fmt), rendering them with build_markdown() on a miss"""
+        cache_key = (key, fmt)
+        with self._lock:
+            if cache_key in self._items:
+                self._items.move_to_end(cache_key)
+                return self._items[cache_key]
+        data = render_artifact(build_markdown(), fmt, title=title)
+        with self._lock:
+            if cache_key not in self._items:
+                self._items[cache_key] = data
+                self._size += len(data)
+            while self._size > self.max_bytes and len(self._items) > 1:
+                _, evicted = self._items.popitem(last=False)
+                self._size -= len(evicted)
+        return data
@@ -0,0 +1,286 @@
+import json
+import os
+import re
+import threading
+import uuid
+import zlib
+
+import numpy as np
+
+from config import data_path
+
+EMBEDDING_DIM = 512
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "did", "do", "does", "for", "from",
+    "has", "have", "had", "in", "is", "it", "of", "on", "or", "that", "the", "this", "to",
+    "was", "were", "who", "what", "which", "with", "any", "candidate", "candidates", "built",
+}
+
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*")
+
+
+def tokenize(text):
+    """Lowercase word tokens with stopwords removed and plurals folded"""
+    tokens = []
+    for token in TOKEN_RE.findall(text.lower()):
+        if token in STOPWORDS:
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+def embed_texts(texts, dim=EMBEDDING_DIM):
+    """Embed texts as L2-normalised hashed bag-of-words vectors (unigrams + bigrams).
+
+    Unlike Python's hash(), crc32 is stable across processes, so vectors
+    written to disk stay comparable with queries embedded later.
+    """
+    vectors = np.zeros((len(texts), dim), dtype=np.float32)
+    for row, text in enumerate(texts):
+        tokens = tokenize(text)
+        features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        for feature in features:
+            h = zlib.crc32(feature.encode("utf-8"))
+            vectors[row, h % dim] += 1.0 if h & 0x80000000 else -1.0
+    # Sublinear term frequency so one repeated word cannot dominate a chunk
+    vectors = np.sign(vectors) * np.log1p(np.abs(vectors))
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (vectors / norms).astype(np.float32)
+
+
+def chunk_text(text, chunk_size=500):
+    """Split text into line-aligned chunks of roughly chunk_size characters"""
+    chunks = []
+    current = ""
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if current and len(current) + len(line) + 1 > chunk_size:
+            chunks.append(current)
+            current = ""
+        current = f"{current}\n{line}" if current else line
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class CandidatePoolIndex:
+    """Persistent semantic index over chunks of every analysed resume.
+
+    Chunk text lives in the candidate store; faiss ids are the chunk row ids,
+    so every hit maps back to a candidate's resume hash. The on-disk index is
+    opened memory-mapped and read-only. New resumes go into a small in-memory
+    delta index and are merged into the on-disk index by compact(), so adding
+    a resume never rebuilds the pool.
+
+    index_type is "flat" (exact), "hnsw" or "ivf" for large pools. An IVF
+    index needs training data, so the pool stays flat until it holds enough
+    chunks and is converted on the next compaction.
+    """
+
+    def __init__(self, store, index_path=None, index_type="flat", nlist=256, nprobe=16,
+                 hnsw_m=32, ef_search=64, compact_threshold=2000):
+        self.store = store
+        self.index_path = index_path or data_path("pool.index")
+        self.meta_path = self.index_path + ".json"
+        self.index_type = index_type
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.hnsw_m = hnsw_m
+        self.ef_search = ef_search
+        self.compact_threshold = compact_threshold
+        self._lock = threading.RLock()
+        # faiss is imported and the index opened on first use, not at app start-up
+        self._loaded = False
+
+    def _ensure_loaded(self):
+        if not self._loaded:
+            self.load()
+
+    def _generation_path(self, meta):
+        # Each compaction writes a new index file and then points the meta file at it, so replacing
+        # the meta is the single step that publishes an index together with its max_chunk_id.
+        # Meta files written before generations existed describe index_path itself.
+        generation = meta.get("generation")
+        return f"{self.index_path}.{generation}" if generation else self.index_path
+
+    def load(self):
+        """Open the on-disk index (memory-mapped) and catch up on newer chunks"""
+        import faiss
+        with self._lock:
+            self._loaded = True
+            self._main = None
+            self._main_path = None
+            self._main_type = None
+            self._main_max_id = 0
+            self._meta_mtime = None
+            for _ in range(3):
+                if not os.path.exists(self.meta_path):
+                    break
+                with open(self.meta_path, "r", encoding="utf-8") as f:
+                    meta = json.load(f)
+                    meta_mtime = os.fstat(f.fileno()).st_mtime_ns
+                path = self._generation_path(meta)
+                try:
+                    self._main = faiss.read_index(path, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+                except RuntimeError:
+                    # Removed by another process's compaction after we read the meta; read it again
+                    continue
+                self._main_path = path
+                self._main_type = meta["index_type"]
+                self._main_max_id = meta["max_chunk_id"]
+                self._meta_mtime = meta_mtime
+                self._tune(self._main)
+                break
+            self._delta = faiss.IndexIDMap2(faiss.IndexFlatIP(EMBEDDING_DIM))
+            self._delta_max_id = self._main_max_id
+            self._catch_up()
+
+    def _tune(self, index):
+        import faiss
+        if isinstance(index, faiss.IndexIVF):
+            index.nprobe = self.nprobe
+        elif isinstance(index, faiss.IndexIDMap2):
+            inner = faiss.downcast_index(index.index)
+            if isinstance(inner, faiss.IndexHNSW):
+                inner.hnsw.efSearch = self.ef_search
+
+    def _catch_up(self):
+        # Chunks stored after the last compaction, by this or another process
+        batch_ids = []
+        batch_texts = []
+        for chunk_id, text in self.store.iter_chunks(after_id=self._delta_max_id):
+            batch_ids.append(chunk_id)
+            batch_texts.append(text)
+        if batch_ids:
+            self._delta.add_with_ids(embed_texts(batch_texts), np.array(batch_ids, dtype=np.int64))
+            self._delta_max_id = batch_ids[-1]
+
+    def _refresh(self):
+        # Another process may have compacted the index since we opened it
+        mtime = os.stat(self.meta_path).st_mtime_ns if os.path.exists(self.meta_path) else None
+        if mtime != self._meta_mtime:
+            self.load()
+        else:
+            self._catch_up()
+
+    @property
+    def size(self):
+        """Number of indexed chunks"""
+        with self._lock:
+            self._ensure_loaded()
+            return (self._main.ntotal if self._main is not None else 0) + self._delta.ntotal
+
+    def add_resume(self, resume_hash, resume_text):
+        """Add a resume's chunks to the pool unless it is already indexed"""
+        if not resume_text or self.store.has_chunks(resume_hash):
+            return
+        self.store.add_chunks(resume_hash, chunk_text(resume_text))
+        with self._lock:
+            self._ensure_loaded()
+            self._catch_up()
+            if self._delta.ntotal >= self.compact_threshold:
+                self.compact()
+
+    def search(self, query, k=10, snippets_per_candidate=2):
+        """Return candidates ranked by their best matching chunks, with snippets"""
+        with self._lock:
+            self._ensure_loaded()
+            self._refresh()
+            query_vector = embed_texts([query])
+            hits = []
+            for index in (self._main, self._delta):
+                if index is None or index.ntotal == 0:
+                    continue
+                scores, ids = index.search(query_vector, min(index.ntotal, k * 5))
+                hits.extend((float(score), int(chunk_id))
+                            for score, chunk_id in zip(scores[0], ids[0]) if chunk_id >= 0)
+
+        hits.sort(reverse=True)
+        chunks = self.store.get_chunks([chunk_id for _, chunk_id in hits])
+        candidates = {}
+        for score, chunk_id in hits:
+            chunk = chunks.get(chunk_id)
+            if chunk is None or score <= 0:
+                continue
+            candidate = candidates.setdefault(chunk["resume_hash"], {
+                "resume_hash": chunk["resume_hash"],
+                "file_name": chunk["file_name"],
+                "score": score,
+                "snippets": [],
+            })
+            if len(candidate["snippets"]) < snippets_per_candidate:
+                candidate["snippets"].append(chunk["text"])
+        return sorted(candidates.values(), key=lambda c: c["score"], reverse=True)[:k]
+
+    def _target_type(self, size):
+        # IVF training needs about 39 vectors per list; smaller pools stay flat
+        if self.index_type == "ivf" and size < self.nlist * 39:
+            return "flat"
+        return self.index_type
+
+    def _build_index(self, vectors, ids):
+        import faiss
+        if self._target_type(len(ids)) == "ivf":
+            quantizer = faiss.IndexFlatIP(EMBEDDING_DIM)
+            index = faiss.IndexIVFFlat(quantizer, EMBEDDING_DIM, self.nlist, faiss.METRIC_INNER_PRODUCT)
+            index.train(vectors)
+            index_type = "ivf"
+        elif self.index_type == "hnsw":
+            index = faiss.IndexIDMap2(faiss.IndexHNSWFlat(EMBEDDING_DIM, self.hnsw_m, faiss.METRIC_INNER_PRODUCT))
+            index_type = "hnsw"
+        else:
+            index = faiss.IndexIDMap2(faiss.IndexFlatIP(EMBEDDING_DIM))
+            index_type = "flat"
+        index.add_with_ids(vectors, ids)
+        return index, index_type
+
+    def compact(self):
+        """Merge the in-memory delta into the on-disk index and reopen it memory-mapped"""
+        import faiss
+        with self._lock:
+            self._ensure_loaded()
+            self._refresh()
+            size = (self._main.ntotal if self._main is not None else 0) + self._delta.ntotal
+            target_type = self._target_type(size)
+            if self._delta.ntotal == 0 and self._main_type in (target_type, None):
+                return
+            if self._main is not None and self._main_type == target_type:
+                # Writable copy of the current index plus the new vectors only
+                index = faiss.read_index(self._main_path)
+                delta_ids = faiss.vector_to_array(self._delta.id_map).astype(np.int64)
+                index.add_with_ids(self._delta.index.reconstruct_n(0, self._delta.ntotal), delta_ids)
+                index_type = self._main_type
+                max_chunk_id = self._delta_max_id
+            else:
+                # First build, a type switch or an IVF pool now big enough to train: embed it all once
+                ids = []
+                texts = []
+                for chunk_id, text in self.store.iter_chunks():
+                    ids.append(chunk_id)
+                    texts.append(text)
+                if not ids:
+                    return
+                index, index_type = self._build_index(embed_texts(texts), np.array(ids, dtype=np.int64))
+                # Chunks stored since the delta was read are in this index too
+                max_chunk_id = ids[-1]
+
+            generation = uuid.uuid4().hex[:16]
+            faiss.write_index(index, f"{self.index_path}.{generation}")
+            tmp_meta = f"{self.meta_path}.{generation}.tmp"
+            with open(tmp_meta, "w", encoding="utf-8") as f:
+                json.dump({"index_type": index_type, "max_chunk_id": max_chunk_id, "generation": generation}, f)
+            os.replace(tmp_meta, self.meta_path)
+            # Processes that still have the old index mapped keep reading it until they reload
+            replaced = self._main_path
+            self.load()
+            if replaced and replaced != self._main_path:
+                try:
+                    os.remove(replaced)
+                except OSError:
+                    pass
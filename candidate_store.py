@@ -0,0 +1,303 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+from config import data_path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS resumes (
+    resume_hash TEXT PRIMARY KEY,
+    file_name TEXT,
+    resume_text TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS candidates (
+    id INTEGER PRIMARY KEY,
+    resume_hash TEXT NOT NULL REFERENCES resumes(resume_hash),
+    role TEXT NOT NULL,
+    overall_score INTEGER NOT NULL,
+    skills_json TEXT NOT NULL,
+    analysis_json TEXT NOT NULL,
+    jd_text TEXT,
+    created_at REAL NOT NULL,
+    UNIQUE (resume_hash, role)
+);
+CREATE INDEX IF NOT EXISTS idx_candidates_role_score ON candidates(role, overall_score DESC);
+CREATE INDEX IF NOT EXISTS idx_candidates_score ON candidates(overall_score DESC);
+
+CREATE TABLE IF NOT EXISTS candidate_skills (
+    candidate_id INTEGER NOT NULL REFERENCES candidates(id) ON DELETE CASCADE,
+    skill TEXT NOT NULL COLLATE NOCASE,
+    score INTEGER NOT NULL,
+    PRIMARY KEY (candidate_id, skill)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_skills_skill_score ON candidate_skills(skill, score, candidate_id);
+
+CREATE TABLE IF NOT EXISTS artifacts (
+    resume_hash TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    content TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (resume_hash, kind)
+);
+
+CREATE TABLE IF NOT EXISTS resume_chunks (
+    id INTEGER PRIMARY KEY,
+    resume_hash TEXT NOT NULL,
+    chunk_no INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    UNIQUE (resume_hash, chunk_no)
+);
+
+CREATE TABLE IF NOT EXISTS extracted_texts (
+    content_hash TEXT PRIMARY KEY,
+    text TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS resume_fts USING fts5(
+    resume_hash UNINDEXED,
+    resume_text
+);
+"""
+
+
+def content_hash(data):
+    """Return a stable SHA-256 hex digest for bytes or text"""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+def fts_query(text):
+    """Turn free text into an FTS5 query that matches all words literally"""
+    words = [word.replace('"', '""') for word in text.split()]
+    return " ".join(f'"{word}"' for word in words)
+
+
+class CandidateStore:
+    """Local SQLite store for analysed resumes, skill scores and generated artefacts.
+
+    Connections are kept per thread because Streamlit runs every session on
+    its own script thread. WAL mode lets readers page through results while
+    another session is writing a new analysis.
+    """
+
+    def __init__(self, db_path=None):
+        self.db_path = db_path or data_path("candidates.db")
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+        return conn
+
+    def save_resume(self, resume_hash, resume_text, file_name=None):
+        """Store extracted resume text once per content hash"""
+        conn = self._connect()
+        with conn:
+            cur = conn.execute(
+                "INSERT OR IGNORE INTO resumes (resume_hash, file_name, resume_text, created_at) VALUES (?, ?, ?, ?)",
+                (resume_hash, file_name, resume_text, time.time())
+            )
+            if cur.rowcount:
+                conn.execute(
+                    "INSERT INTO resume_fts (resume_hash, resume_text) VALUES (?, ?)",
+                    (resume_hash, resume_text)
+                )
+
+    def save_extracted_text(self, file_hash, text):
+        """Cache the text extracted from an uploaded file (resume or JD) by its content hash"""
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO extracted_texts (content_hash, text, created_at) VALUES (?, ?, ?)",
+                (file_hash, text, time.time())
+            )
+
+    def get_extracted_text(self, file_hash):
+        """Return previously extracted text for a file hash, or None"""
+        row = self._connect().execute(
+            "SELECT text FROM extracted_texts WHERE content_hash = ?", (file_hash,)
+        ).fetchone()
+        return row["text"] if row else None
+
+    def get_resume_text(self, resume_hash):
+        """Return the stored text for a resume hash, or None"""
+        row = self._connect().execute(
+            "SELECT resume_text FROM resumes WHERE resume_hash = ?", (resume_hash,)
+        ).fetchone()
+        return row["resume_text"] if row else None
+
+    def has_chunks(self, resume_hash):
+        """Return True if a resume's chunks are already in the pool"""
+        row = self._connect().execute(
+            "SELECT 1 FROM resume_chunks WHERE resume_hash = ? LIMIT 1", (resume_hash,)
+        ).fetchone()
+        return row is not None
+
+    def add_chunks(self, resume_hash, chunks):
+        """Store the search chunks of a resume and return their row ids"""
+        conn = self._connect()
+        with conn:
+            return [
+                conn.execute(
+                    "INSERT INTO resume_chunks (resume_hash, chunk_no, text) VALUES (?, ?, ?)",
+                    (resume_hash, chunk_no, text)
+                ).lastrowid
+                for chunk_no, text in enumerate(chunks)
+            ]
+
+    def get_chunks(self, chunk_ids):
+        """Return {chunk id: row} for the given chunk ids"""
+        if not chunk_ids:
+            return {}
+        placeholders = ",".join("?" * len(chunk_ids))
+        rows = self._connect().execute(
+            f"""SELECT rc.id, rc.resume_hash, rc.text, r.file_name
+                FROM resume_chunks rc LEFT JOIN resumes r USING (resume_hash)
+                WHERE rc.id IN ({placeholders})""",
+            [int(chunk_id) for chunk_id in chunk_ids]
+        ).fetchall()
+        return {row["id"]: dict(row) for row in rows}
+
+    def iter_chunks(self, after_id=0, batch_size=1000):
+        """Yield (id, text) for chunks with ids greater than after_id, in id order"""
+        conn = self._connect()
+        while True:
+            rows = conn.execute(
+                "SELECT id, text FROM resume_chunks WHERE id > ? ORDER BY id LIMIT ?",
+                (after_id, batch_size)
+            ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield row["id"], row["text"]
+            after_id = rows[-1]["id"]
+
+    def save_analysis(self, resume_hash, role, skills, analysis_result, jd_text=None):
+        """Insert or replace the analysis of a resume for a role and return the candidate id"""
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "DELETE FROM candidates WHERE resume_hash = ? AND role = ?", (resume_hash, role)
+            )
+            cur = conn.execute(
+                """INSERT INTO candidates
+                   (resume_hash, role, overall_score, skills_json, analysis_json, jd_text, created_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                (
+                    resume_hash,
+                    role,
+                    int(analysis_result.get("overall_score", 0)),
+                    json.dumps(list(skills or [])),
+                    json.dumps(analysis_result),
+                    jd_text,
+                    time.time()
+                )
+            )
+            candidate_id = cur.lastrowid
+            conn.executemany(
+                "INSERT OR REPLACE INTO candidate_skills (candidate_id, skill, score) VALUES (?, ?, ?)",
+                [(candidate_id, skill, int(score))
+                 for skill, score in analysis_result.get("skill_scores", {}).items()]
+            )
+        return candidate_id
+
+    def _candidate_from_row(self, row):
+        if row is None:
+            return None
+        candidate = dict(row)
+        candidate["skills"] = json.loads(candidate.pop("skills_json"))
+        candidate["analysis"] = json.loads(candidate.pop("analysis_json"))
+        return candidate
+
+    def get_analysis(self, resume_hash, role):
+        """Return a previously stored candidate record for (resume, role), or None"""
+        row = self._connect().execute(
+            "SELECT * FROM candidates WHERE resume_hash = ? AND role = ?", (resume_hash, role)
+        ).fetchone()
+        return self._candidate_from_row(row)
+
+    def get_candidate(self, candidate_id):
+        """Return a stored candidate record by id, or None"""
+        row = self._connect().execute(
+            "SELECT c.*, r.file_name FROM candidates c JOIN resumes r USING (resume_hash) WHERE c.id = ?",
+            (candidate_id,)
+        ).fetchone()
+        return self._candidate_from_row(row)
+
+    def _search_clause(self, role=None, skills=None, min_score=None, text=None):
+        clauses = []
+        params = []
+        if role:
+            clauses.append("c.role = ?")
+            params.append(role)
+        if min_score is not None:
+            clauses.append("c.overall_score >= ?")
+            params.append(int(min_score))
+        # skills maps skill name -> minimum score, e.g. {"Kubernetes": 6}
+        for skill, min_skill_score in (skills or {}).items():
+            clauses.append(
+                "c.id IN (SELECT candidate_id FROM candidate_skills WHERE skill = ? AND score >= ?)"
+            )
+            params.extend([skill, int(min_skill_score)])
+        if text:
+            clauses.append(
+                "c.resume_hash IN (SELECT resume_hash FROM resume_fts WHERE resume_fts MATCH ?)"
+            )
+            params.append(fts_query(text))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, params
+
+    def search(self, role=None, skills=None, min_score=None, text=None, limit=20, offset=0):
+        """Return one page of candidates matching the filters, best scores first"""
+        where, params = self._search_clause(role, skills, min_score, text)
+        rows = self._connect().execute(
+            f"""SELECT c.id, c.resume_hash, r.file_name, c.role, c.overall_score, c.created_at
+                FROM candidates c JOIN resumes r USING (resume_hash)
+                {where}
+                ORDER BY c.overall_score DESC, c.id DESC
+                LIMIT ? OFFSET ?""",
+            params + [int(limit), int(offset)]
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def count(self, role=None, skills=None, min_score=None, text=None):
+        """Return the number of candidates matching the filters"""
+        where, params = self._search_clause(role, skills, min_score, text)
+        return self._connect().execute(
+            f"SELECT COUNT(*) FROM candidates c {where}", params
+        ).fetchone()[0]
+
+    def roles(self):
+        """Return the distinct roles that have stored analyses"""
+        rows = self._connect().execute("SELECT DISTINCT role FROM candidates ORDER BY role").fetchall()
+        return [row["role"] for row in rows]
+
+    def save_artifact(self, resume_hash, kind, content):
+        """Store a generated artefact (improved resume, questions, report) for a resume"""
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO artifacts (resume_hash, kind, content, created_at) VALUES (?, ?, ?, ?)",
+                (resume_hash, kind, content, time.time())
+            )
+
+    def get_artifact(self, resume_hash, kind):
+        """Return a stored artefact, or None"""
+        row = self._connect().execute(
+            "SELECT content FROM artifacts WHERE resume_hash = ? AND kind = ?", (resume_hash, kind)
+        ).fetchone()
+        return row["content"] if row else None
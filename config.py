@@ -0,0 +1,15 @@
+import os
+
+# Directory for local persistent state (candidate store, indexes, caches).
+# Point MAIKNIT_DATA_DIR at a mounted volume to keep data across containers.
+DATA_DIR = os.environ.get(
+    "MAIKNIT_DATA_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+)
+
+
+def data_path(*parts):
+    """Return a path inside the data directory, creating the directory if needed"""
+    path = os.path.join(DATA_DIR, *parts)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return path
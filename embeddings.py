@@ -0,0 +1,14 @@
+from langchain.embeddings.base import Embeddings
+
+from candidate_index import embed_texts
+
+# Simple embeddings using TF-IDF style approach (no torch needed)
+class SimpleEmbeddings(Embeddings):
+    """Simple embeddings using hash-based vectors"""
+    def embed_documents(self, texts):
+        """Embed a list of texts"""
+        return embed_texts(texts).tolist()
+    
+    def embed_query(self, text):
+        """Embed a single query"""
+        return embed_texts([text])[0].tolist()
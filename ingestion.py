@@ -0,0 +1,308 @@
+"""Text extraction from uploaded documents (PDF, DOCX, HTML, TXT).
+
+The format is detected from the content, with the file name only as a tie
+breaker, and every reader's output goes through the same normalisation.
+Readers are plain functions from bytes to text; register_reader() adds a
+format. IngestionPool runs readers in worker processes so a hostile or
+broken document cannot stall or exhaust the app: each read has a time and
+a memory limit.
+"""
+import io
+import os
+import re
+import signal
+import threading
+import unicodedata
+import zipfile
+from html.parser import HTMLParser
+from xml.etree import ElementTree
+
+# Formats by file extension, used only when the content is ambiguous
+EXTENSIONS = {".pdf": "pdf", ".docx": "docx", ".html": "html", ".htm": "html", ".txt": "txt"}
+
+# Uncompressed size a DOCX part may expand to before it is rejected as a zip bomb
+MAX_DOCX_PART_BYTES = 50 * 1024 * 1024
+
+_HTML_START = re.compile(rb"^\s*(?:<!--.*?-->\s*)*<(?:!doctype\s+html|html|head|body)\b", re.IGNORECASE | re.DOTALL)
+
+# Characters dropped during normalisation: zero-width spaces and joiners, soft hyphens, BOMs
+_DROP = dict.fromkeys(map(ord, "\u200b\u200c\u200d\u2060\u00ad\ufeff"))
+
+# Tabs, carriage returns and form feeds become spaces (NFKC already maps Unicode spaces)
+_TO_SPACE = str.maketrans("\t\r\f\v", "    ")
+_SPACE_RUN = re.compile(r" {2,}")
+_LINE_EDGES = re.compile(r" ?\n ?")
+_BLANK_LINES = re.compile(r"\n{3,}")
+
+
+class IngestionError(Exception):
+    """A document could not be read"""
+
+
+def normalize_text(text):
+    """NFKC-normalise text (ligatures, full-width forms, non-breaking spaces) and tidy whitespace.
+
+    Runs of spaces collapse to one space, trailing spaces and indentation are
+    dropped and blank lines collapse to at most one.
+    """
+    if not text.isascii():
+        text = unicodedata.normalize("NFKC", text).translate(_DROP)
+    text = text.translate(_TO_SPACE)
+    # Each substitution only runs when there is something to replace; plain
+    # substring checks are much cheaper than a regex scan on large batches
+    if "  " in text:
+        text = _SPACE_RUN.sub(" ", text)
+    if " \n" in text or "\n " in text:
+        text = _LINE_EDGES.sub("\n", text)
+    if "\n\n\n" in text:
+        text = _BLANK_LINES.sub("\n\n", text)
+    return text.strip()
+
+
+def detect_format(data, name=None):
+    """"pdf", "docx", "html" or "txt" from the document's bytes; None if it cannot be read"""
+    head = data[:2048]
+    if b"%PDF-" in data[:1024]:
+        return "pdf"
+    if head.startswith(b"PK\x03\x04"):
+        try:
+            with zipfile.ZipFile(io.BytesIO(data)) as archive:
+                if "word/document.xml" in archive.namelist():
+                    return "docx"
+        except zipfile.BadZipFile:
+            pass
+        return None
+    if _HTML_START.match(head.lstrip(b"\xef\xbb\xbf")):
+        return "html"
+    if b"\x00" in head:
+        return None
+    extension = os.path.splitext(name or "")[1].lower()
+    if EXTENSIONS.get(extension) == "html" and b"<" in head:
+        return "html"
+    return "txt"
+
+
+def read_txt(data):
+    for encoding in ("utf-8-sig", "cp1252"):
+        try:
+            return data.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+    return data.decode("latin-1")
+
+
+def read_pdf(data):
+    import PyPDF2
+    reader = PyPDF2.PdfReader(io.BytesIO(data))
+    return "\n".join(page.extract_text() or "" for page in reader.pages)
+
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+
+def read_docx(data):
+    """Paragraph text of a Word document, tables included, using only the standard library"""
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        info = archive.getinfo("word/document.xml")
+        if info.file_size > MAX_DOCX_PART_BYTES:
+            raise IngestionError("DOCX document part is too large")
+        root = ElementTree.fromstring(archive.read(info))
+    paragraphs = []
+    for paragraph in root.iter(f"{_W}p"):
+        parts = []
+        for node in paragraph.iter():
+            if node.tag == f"{_W}t" and node.text:
+                parts.append(node.text)
+            elif node.tag == f"{_W}tab":
+                parts.append("\t")
+            elif node.tag in (f"{_W}br", f"{_W}cr"):
+                parts.append("\n")
+        # List paragraphs carry numbering properties; mark them as bullets
+        bullet = paragraph.find(f"{_W}pPr/{_W}numPr") is not None
+        text = "".join(parts)
+        if text.strip():
+            paragraphs.append(("- " if bullet else "") + text)
+    return "\n".join(paragraphs)
+
+
+class _HTMLText(HTMLParser):
+    BLOCKS = {"p", "div", "br", "li", "tr", "h1", "h2", "h3", "h4", "h5", "h6", "section", "article",
+              "header", "footer", "ul", "ol", "table", "blockquote", "pre", "hr"}
+    SKIP = {"script", "style", "head", "noscript", "template"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self.skipping = 0
+
+    def _line_break(self):
+        # Adjacent block boundaries (</li><li>) give one line break, not a blank line
+        if self.parts and not self.parts[-1].endswith("\n"):
+            self.parts.append("\n")
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP:
+            self.skipping += 1
+        elif tag in self.BLOCKS:
+            self._line_break()
+            if tag == "li":
+                self.parts.append("- ")
+        elif tag in ("td", "th"):
+            self.parts.append(" ")
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP:
+            self.skipping = max(0, self.skipping - 1)
+        elif tag in self.BLOCKS:
+            self._line_break()
+
+    def handle_data(self, data):
+        if not self.skipping:
+            self.parts.append(data)
+
+
+def read_html(data):
+    parser = _HTMLText()
+    parser.feed(read_txt(data))
+    parser.close()
+    return "".join(parser.parts)
+
+
+READERS = {"pdf": read_pdf, "docx": read_docx, "html": read_html, "txt": read_txt}
+
+
+def register_reader(fmt, reader, extensions=()):
+    """Add or replace the reader for a format; extensions map file names to it when content is ambiguous"""
+    READERS[fmt] = reader
+    for extension in extensions:
+        EXTENSIONS[extension.lower()] = fmt
+
+
+def _on_alarm(signum, frame):
+    raise IngestionError("timed out")
+
+
+def read_document(data, name=None, timeout=None):
+    """Normalised text of a document. Raises IngestionError if it cannot be read.
+
+    timeout (seconds) is enforced with SIGALRM, so only in a process's main thread.
+    """
+    fmt = detect_format(data, name)
+    if fmt is None:
+        fmt = EXTENSIONS.get(os.path.splitext(name or "")[1].lower())
+    reader = READERS.get(fmt)
+    if reader is None:
+        raise IngestionError(f"unsupported document format: {name or 'upload'}")
+    use_alarm = bool(timeout) and hasattr(signal, "SIGALRM") and threading.current_thread() is threading.main_thread()
+    if use_alarm:
+        previous = signal.signal(signal.SIGALRM, _on_alarm)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        text = reader(data)
+    except IngestionError:
+        raise
+    except MemoryError:
+        raise IngestionError("document needs more memory than allowed")
+    except Exception as e:
+        raise IngestionError(f"could not read {fmt.upper()}: {e}")
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+    return normalize_text(text or "")
+
+
+def limit_memory(memory_mb):
+    """Cap this process's address space at its current size plus memory_mb (best effort, Linux)"""
+    try:
+        import resource
+        with open("/proc/self/status", encoding="ascii") as f:
+            size_kb = next(int(line.split()[1]) for line in f if line.startswith("VmSize:"))
+        limit = (size_kb * 1024) + memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, resource.getrlimit(resource.RLIMIT_AS)[1]))
+    except (ImportError, OSError, ValueError, StopIteration) as e:
+        print(f"Could not limit ingestion worker memory: {e}")
+
+
+def _init_worker(memory_mb):
+    # Readers import lazily; load the PDF parser before the limit applies
+    try:
+        import PyPDF2  # noqa: F401
+    except ImportError:
+        pass
+    if memory_mb:
+        limit_memory(memory_mb)
+
+
+class IngestionPool:
+    """Reads documents in worker processes, each read limited in time and memory.
+
+    A read that overruns its time is interrupted in the worker; if the
+    worker is stuck in native code or dies (e.g. out of memory), the pool
+    is replaced and the read fails with IngestionError.
+    """
+
+    def __init__(self, max_workers=2, timeout=30, memory_mb=512):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.memory_mb = memory_mb
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                import multiprocessing
+                from concurrent.futures import ProcessPoolExecutor
+                # Fresh interpreters rather than forks of a threaded app process
+                methods = multiprocessing.get_all_start_methods()
+                context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context,
+                                                     initializer=_init_worker, initargs=(self.memory_mb,))
+            return self._executor
+
+    def _restart(self, executor):
+        with self._lock:
+            if self._executor is not executor:
+                return
+            self._executor = None
+        for process in list((getattr(executor, "_processes", None) or {}).values()):
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def read(self, data, name=None):
+        """Normalised text of a document; raises IngestionError on failure or when a limit is hit"""
+        from concurrent.futures import TimeoutError as FutureTimeout
+        from concurrent.futures.process import BrokenProcessPool
+        executor = self._pool()
+        try:
+            future = executor.submit(read_document, data, name, self.timeout)
+            # Grace period for the in-worker alarm to fire first
+            return future.result(timeout=self.timeout + 5)
+        except FutureTimeout:
+            self._restart(executor)
+            raise IngestionError(f"timed out after {self.timeout} s")
+        except BrokenProcessPool:
+            self._restart(executor)
+            raise IngestionError(f"reader crashed (memory limit {self.memory_mb} MB?)")
+
+    def read_many(self, documents):
+        """Read [(data, name)] concurrently; yields (index, text, error) as each finishes"""
+        from concurrent.futures import ThreadPoolExecutor, as_completed
+
+        def read_one(index, data, name):
+            try:
+                return index, self.read(data, name), None
+            except IngestionError as e:
+                return index, None, str(e)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as threads:
+            futures = [threads.submit(read_one, index, data, name) for index, (data, name) in enumerate(documents)]
+            for future in as_completed(futures):
+                yield future.result()
+
+    def close(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
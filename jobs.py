@@ -0,0 +1,101 @@
+import json
+import threading
+import time
+import traceback
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from candidate_store import content_hash
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class Job:
+    """A unit of background work and, once finished, its result or error"""
+
+    def __init__(self, job_id, kind):
+        self.id = job_id
+        self.kind = kind
+        self.status = PENDING
+        self.result = None
+        self.error = None
+        self.progress = None
+        self.created_at = time.time()
+        self.finished_at = None
+
+    @property
+    def finished(self):
+        return self.status in (DONE, FAILED)
+
+
+class JobManager:
+    """Per-process background runner for long LLM operations.
+
+    Jobs run on a thread pool, so a Streamlit rerun (any widget change)
+    no longer cancels work that is already paid for. Submitting the same
+    input again while a job is in flight, or after it finished, returns
+    the existing job instead of starting a new one. Finished jobs are kept
+    in a bounded LRU store that the UI polls on cheap reruns.
+    """
+
+    def __init__(self, max_workers=4, max_finished=256):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="maiknit-job")
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._finished = OrderedDict()
+        self.max_finished = max_finished
+
+    @staticmethod
+    def job_id(kind, *key_parts):
+        """Stable id for a job from its kind and inputs"""
+        return content_hash(json.dumps([kind, key_parts], sort_keys=True, default=str))
+
+    def submit(self, kind, key_parts, func, *args, reuse_finished=True, with_progress=False, **kwargs):
+        """Run func(*args, **kwargs) in the background unless an identical job exists; return its id.
+
+        With reuse_finished=False only an in-flight duplicate is reused, for
+        jobs whose side effects must happen again on resubmission. With
+        with_progress, func also gets a report_progress(value) keyword
+        argument that publishes a partial result as the job's progress.
+        """
+        job_id = self.job_id(kind, *key_parts)
+        with self._lock:
+            job = self._jobs.get(job_id)
+            # Failed jobs are always retried
+            if job and (job.status == FAILED or (job.finished and not reuse_finished)):
+                job = None
+            if job:
+                if job_id in self._finished:
+                    self._finished.move_to_end(job_id)
+                return job_id
+            job = Job(job_id, kind)
+            self._jobs[job_id] = job
+            self._finished.pop(job_id, None)
+        if with_progress:
+            kwargs["report_progress"] = lambda value: setattr(job, "progress", value)
+        self._executor.submit(self._run, job, func, args, kwargs)
+        return job_id
+
+    def _run(self, job, func, args, kwargs):
+        job.status = RUNNING
+        try:
+            job.result = func(*args, **kwargs)
+            job.status = DONE
+        except Exception as e:
+            print(f"Background job {job.kind} failed: {e}\n{traceback.format_exc()}")
+            job.error = str(e)
+            job.status = FAILED
+        job.finished_at = time.time()
+        with self._lock:
+            self._finished[job.id] = job
+            while len(self._finished) > self.max_finished:
+                evicted_id, _ = self._finished.popitem(last=False)
+                self._jobs.pop(evicted_id, None)
+
+    def get(self, job_id):
+        """Return the Job for an id, or None if it was never submitted or has been evicted"""
+        with self._lock:
+            return self._jobs.get(job_id)
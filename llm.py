@@ -0,0 +1,494 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from collections import deque
+
+from config import data_path
+
+
+class _Call:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesce identical concurrent calls so only one runs and every caller gets its result.
+
+    Within a process, callers with the same key wait on the leader's call.
+    With lease_db set, callers in other worker processes coordinate through
+    a SQLite lease: one process runs the call and publishes the (string)
+    result for the processes that were waiting on that lease. Results are
+    only kept long enough for those waiters to read them; this is not a cache.
+    """
+
+    def __init__(self, lease_db=None, lease_seconds=120, poll_interval=0.2, result_ttl=60):
+        self.lease_db = lease_db
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.result_ttl = result_ttl
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        if lease_db:
+            conn = self._connect()
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS leases (key TEXT PRIMARY KEY, token TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS results (token TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+
+    def do(self, key, func):
+        """Return func() for key, sharing one execution among concurrent callers"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            if call.event.wait(self.lease_seconds):
+                if call.error is not None:
+                    raise call.error
+                return call.result
+            # The leader is stuck; do the work ourselves rather than wait forever
+            return func()
+
+        try:
+            call.result = self._lead(key, func) if self.lease_db else func()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.lease_db, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def _acquire(self, conn, key):
+        # Returns (is_leader, lease token)
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT token, expires_at FROM leases WHERE key = ?", (key,)).fetchone()
+            if row and row[1] > now:
+                return False, row[0]
+            token = uuid.uuid4().hex
+            conn.execute(
+                "INSERT OR REPLACE INTO leases (key, token, expires_at) VALUES (?, ?, ?)",
+                (key, token, now + self.lease_seconds)
+            )
+            return True, token
+        finally:
+            conn.execute("COMMIT")
+
+    def _release(self, conn, key, token, value=None):
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if value is not None:
+                conn.execute(
+                    "INSERT OR REPLACE INTO results (token, value, created_at) VALUES (?, ?, ?)",
+                    (token, value, now)
+                )
+            conn.execute("DELETE FROM leases WHERE key = ? AND token = ?", (key, token))
+            conn.execute("DELETE FROM results WHERE created_at < ?", (now - self.result_ttl,))
+        finally:
+            conn.execute("COMMIT")
+
+    def _wait_for(self, conn, key, token):
+        # Returns the published result, or None if the lease went away without one
+        while True:
+            time.sleep(self.poll_interval)
+            row = conn.execute("SELECT value FROM results WHERE token = ?", (token,)).fetchone()
+            if row:
+                return row[0]
+            lease = conn.execute("SELECT token, expires_at FROM leases WHERE key = ?", (key,)).fetchone()
+            if not lease or lease[0] != token or lease[1] <= time.time():
+                # The leader may have published and released between our two reads
+                row = conn.execute("SELECT value FROM results WHERE token = ?", (token,)).fetchone()
+                return row[0] if row else None
+
+    def _lead(self, key, func):
+        conn = self._connect()
+        while True:
+            is_leader, token = self._acquire(conn, key)
+            if not is_leader:
+                value = self._wait_for(conn, key, token)
+                if value is not None:
+                    return value
+                continue
+            try:
+                value = func()
+            except Exception:
+                self._release(conn, key, token)
+                raise
+            self._release(conn, key, token, value)
+            return value
+
+
+class LLMCache:
+    """SQLite cache of LLM responses keyed by request hash.
+
+    Kept in the data directory, so every app worker on the host (and every
+    restart) reuses responses that any of them already paid for. Entries
+    older than ttl seconds are ignored and dropped when the cache is opened;
+    ttl=None keeps them forever.
+    """
+
+    def __init__(self, db_path=None, ttl=None):
+        self.db_path = db_path or data_path("llm_cache.db")
+        self.ttl = ttl
+        self._local = threading.local()
+        conn = self._connect()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        if ttl is not None:
+            conn.execute("DELETE FROM responses WHERE created_at < ?", (time.time() - ttl,))
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        """Cached response for key, or None"""
+        row = self._connect().execute("SELECT value, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None or (self.ttl is not None and row[1] < time.time() - self.ttl):
+            return None
+        return row[0]
+
+    def put(self, key, value):
+        self._connect().execute(
+            "INSERT OR REPLACE INTO responses (key, value, created_at) VALUES (?, ?, ?)",
+            (key, value, time.time())
+        )
+
+
+# Model settings per kind of LLM call. Short structured tasks use the small
+# model with tight budgets; only the full resume rewrite gets the large model.
+# "fallback" is tried once when the primary model fails (not for auth errors).
+# "priority" is "interactive" for calls a user waits on and "batch" otherwise;
+# the rate limiter serves interactive calls first. Only deterministic
+# (temperature 0) responses go to the persistent LLM cache unless a route
+# sets "cache": true.
+MODEL_ROUTES = {
+    "default": {"model": "llama-3.1-8b-instant", "temperature": 0.7, "max_tokens": 1024,
+                "timeout": 30, "fallback": None, "priority": "batch"},
+    "skills": {"model": "llama-3.1-8b-instant", "temperature": 0.0, "max_tokens": 300,
+               "timeout": 15, "fallback": "llama-3.3-70b-versatile", "priority": "batch"},
+    "weaknesses": {"model": "llama-3.1-8b-instant", "temperature": 0.3, "max_tokens": 300,
+                   "timeout": 20, "fallback": "llama-3.3-70b-versatile", "priority": "batch"},
+    "qa": {"model": "llama-3.1-8b-instant", "temperature": 0.3, "max_tokens": 400,
+           "timeout": 20, "fallback": "llama-3.3-70b-versatile", "priority": "interactive"},
+    "questions": {"model": "llama-3.1-8b-instant", "temperature": 0.7, "max_tokens": 800,
+                  "timeout": 30, "fallback": "llama-3.3-70b-versatile", "priority": "interactive"},
+    "question_bank": {"model": "llama-3.1-8b-instant", "temperature": 0.7, "max_tokens": 800,
+                      "timeout": 30, "fallback": "llama-3.3-70b-versatile", "priority": "batch"},
+    "improvements": {"model": "llama-3.1-8b-instant", "temperature": 0.5, "max_tokens": 600,
+                     "timeout": 30, "fallback": "llama-3.3-70b-versatile", "priority": "interactive"},
+    "rewrite": {"model": "llama-3.3-70b-versatile", "temperature": 0.5, "max_tokens": 2048,
+                "timeout": 90, "fallback": "llama-3.1-8b-instant", "priority": "interactive"},
+}
+
+_model_routes = None
+
+
+def model_routes():
+    """MODEL_ROUTES with per-task overrides from the JSON file named by MAIKNIT_MODEL_ROUTES.
+
+    The file maps task names to the settings to change, e.g.
+    {"qa": {"max_tokens": 300}, "rewrite": {"model": "llama-3.1-8b-instant"}}
+    """
+    global _model_routes
+    if _model_routes is None:
+        routes = {task: dict(route) for task, route in MODEL_ROUTES.items()}
+        path = os.environ.get("MAIKNIT_MODEL_ROUTES")
+        if path:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    for task, overrides in json.load(f).items():
+                        routes.setdefault(task, {}).update(overrides)
+            except (OSError, ValueError, AttributeError) as e:
+                print(f"Error reading model routes {path}: {e}")
+        _model_routes = routes
+    return _model_routes
+
+
+def route_for(task):
+    """Settings for a task; unknown tasks and missing settings come from the default route"""
+    routes = model_routes()
+    return {**routes["default"], **routes.get(task, {})}
+
+
+def cacheable(route):
+    """Whether a route's responses may be kept in the persistent LLM cache"""
+    return route.get("cache", route["temperature"] == 0)
+
+
+class LLMStats:
+    """Per-task latency and token counts of LLM requests in this process, for tuning the routes"""
+
+    def __init__(self, window=1000):
+        self.window = window
+        self._tasks = {}
+        self._lock = threading.Lock()
+
+    def record(self, task, model, latency, prompt_tokens=0, completion_tokens=0, ok=True, fallback=False,
+               waited=0.0):
+        with self._lock:
+            stats = self._tasks.get(task)
+            if stats is None:
+                stats = self._tasks[task] = {"calls": 0, "errors": 0, "fallbacks": 0, "prompt_tokens": 0,
+                                             "completion_tokens": 0, "wait_seconds": 0.0, "models": {},
+                                             "latencies": deque(maxlen=self.window)}
+            stats["calls"] += 1
+            stats["errors"] += not ok
+            stats["fallbacks"] += fallback
+            stats["prompt_tokens"] += prompt_tokens
+            stats["completion_tokens"] += completion_tokens
+            stats["wait_seconds"] += waited
+            stats["models"][model] = stats["models"].get(model, 0) + 1
+            stats["latencies"].append(latency)
+
+    def summary(self):
+        """{task: counts, token totals and latency percentiles (ms) over the recent window}"""
+        with self._lock:
+            tasks = {task: dict(stats, latencies=sorted(stats["latencies"]), models=dict(stats["models"]))
+                     for task, stats in self._tasks.items()}
+        summary = {}
+        for task, stats in sorted(tasks.items()):
+            latencies = stats.pop("latencies")
+            # Failed requests report no usage
+            answered = max(1, stats["calls"] - stats["errors"])
+            summary[task] = dict(
+                stats,
+                avg_prompt_tokens=stats["prompt_tokens"] / answered,
+                avg_completion_tokens=stats["completion_tokens"] / answered,
+                avg_wait_ms=stats["wait_seconds"] * 1000 / stats["calls"],
+                p50_ms=latencies[len(latencies) // 2] * 1000 if latencies else 0.0,
+                p95_ms=latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000 if latencies else 0.0,
+                max_ms=latencies[-1] * 1000 if latencies else 0.0,
+            )
+        return summary
+
+    def reset(self):
+        with self._lock:
+            self._tasks.clear()
+
+
+def parse_reset(value):
+    """Seconds in a rate limit reset header such as "7.66s", "2m59.56s" or "350ms" (None if unparseable)"""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = re.findall(r"(\d+(?:\.\d+)?)(ms|h|m|s)", value)
+    if not parts:
+        return None
+    scale = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+    return sum(float(number) * scale[unit] for number, unit in parts)
+
+
+class RateLimiter:
+    """Client-side token buckets for requests and tokens per minute, shared by all threads.
+
+    Buckets refill continuously at limit/60 per second. An unknown limit
+    does not throttle. The request limit is configured (rpm); the token
+    limit and remaining budgets are learned from x-ratelimit-* headers, and
+    a 429 pauses every caller until the server's retry-after.
+
+    Interactive calls may drain the buckets; batch calls leave `reserve` of
+    each bucket for interactive ones and hold back while any interactive
+    call is waiting, so batches get what interactive users do not need.
+    """
+
+    def __init__(self, rpm=None, tpm=None, reserve=0.2, max_wait=120):
+        self.reserve = reserve
+        self.max_wait = max_wait
+        self._limits = {"requests": rpm, "tokens": tpm}
+        self._levels = {"requests": float(rpm or 0), "tokens": float(tpm or 0)}
+        self._refilled_at = time.monotonic()
+        self._blocked_until = 0.0
+        self._interactive_waiting = 0
+        self._cond = threading.Condition()
+
+    def _refill(self, now):
+        elapsed = now - self._refilled_at
+        self._refilled_at = now
+        for name, limit in self._limits.items():
+            if limit:
+                self._levels[name] = min(limit, self._levels[name] + elapsed * limit / 60)
+
+    def _wait_time(self, costs, interactive, now):
+        """Seconds until a call with these costs may go, 0 if it may go now"""
+        if now < self._blocked_until:
+            return self._blocked_until - now
+        if not interactive and self._interactive_waiting:
+            return 0.05
+        wait = 0.0
+        for name, cost in costs.items():
+            limit = self._limits[name]
+            if not limit:
+                continue
+            # A call larger than the whole bucket goes once the bucket is full
+            need = min(cost, limit) + (0 if interactive else self.reserve * limit)
+            need = min(need, limit)
+            if self._levels[name] < need:
+                wait = max(wait, (need - self._levels[name]) * 60 / limit)
+        return wait
+
+    def acquire(self, tokens, interactive=False):
+        """Block until a call of about `tokens` tokens fits the quota; returns seconds waited"""
+        costs = {"requests": 1, "tokens": tokens}
+        began = time.monotonic()
+        with self._cond:
+            if interactive:
+                self._interactive_waiting += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    wait = self._wait_time(costs, interactive, now)
+                    if wait <= 0 or now - began >= self.max_wait:
+                        break
+                    self._cond.wait(min(wait, 1.0))
+                for name, cost in costs.items():
+                    if self._limits[name]:
+                        self._levels[name] -= cost
+            finally:
+                if interactive:
+                    self._interactive_waiting -= 1
+                    self._cond.notify_all()
+        return time.monotonic() - began
+
+    def settle(self, estimated, actual):
+        """Return tokens reserved for a call beyond what it actually used"""
+        with self._cond:
+            if self._limits["tokens"] and actual is not None and actual < estimated:
+                self._levels["tokens"] = min(self._limits["tokens"], self._levels["tokens"] + estimated - actual)
+                self._cond.notify_all()
+
+    def update(self, headers):
+        """Learn the token limit and remaining budgets from x-ratelimit-* (and retry-after) response headers.
+
+        Groq's x-ratelimit-*-requests headers count requests per day, not per
+        minute, so they never size the request bucket (only rpm does); a spent
+        daily budget pauses every caller until its reset instead.
+        """
+        now = time.monotonic()
+        with self._cond:
+            self._refill(now)
+            try:
+                limit = headers.get("x-ratelimit-limit-tokens")
+                if limit is not None:
+                    limit = int(float(limit))
+                    if not self._limits["tokens"]:
+                        self._levels["tokens"] = float(limit)
+                    self._limits["tokens"] = limit
+                remaining = headers.get("x-ratelimit-remaining-tokens")
+                if remaining is not None and self._limits["tokens"]:
+                    self._levels["tokens"] = min(self._levels["tokens"], float(remaining))
+            except ValueError:
+                pass
+            for name in ("requests", "tokens"):
+                try:
+                    spent = float(headers.get(f"x-ratelimit-remaining-{name}", 1)) < 1
+                except ValueError:
+                    continue
+                if spent:
+                    reset = parse_reset(headers.get(f"x-ratelimit-reset-{name}"))
+                    if reset:
+                        self._blocked_until = max(self._blocked_until, now + reset)
+            retry_after = parse_reset(headers.get("retry-after"))
+            if retry_after:
+                self._blocked_until = max(self._blocked_until, now + retry_after)
+            self._cond.notify_all()
+
+    def snapshot(self):
+        """Current limits, bucket levels and pause, for logs and tests"""
+        with self._cond:
+            self._refill(time.monotonic())
+            return {"limits": dict(self._limits), "levels": dict(self._levels),
+                    "blocked_for": max(0.0, self._blocked_until - time.monotonic()),
+                    "interactive_waiting": self._interactive_waiting}
+
+
+_shared_single_flight = None
+_shared_llm_cache = None
+# Cached LLM responses expire after a week unless MAIKNIT_LLM_CACHE_TTL says otherwise
+LLM_CACHE_TTL = 7 * 24 * 3600
+_shared_lock = threading.Lock()
+_shared_llm_stats = LLMStats()
+_shared_rate_limiter = None
+
+
+def shared_single_flight():
+    """Process-wide SingleFlight for LLM calls.
+
+    Set MAIKNIT_LLM_LEASE_DB to a SQLite path on a shared volume to also
+    coalesce identical prompts across worker processes.
+    """
+    global _shared_single_flight
+    with _shared_lock:
+        if _shared_single_flight is None:
+            _shared_single_flight = SingleFlight(lease_db=os.environ.get("MAIKNIT_LLM_LEASE_DB") or None)
+        return _shared_single_flight
+
+
+def shared_llm_cache():
+    """Process-wide LLMCache, or None when MAIKNIT_LLM_CACHE=0.
+
+    MAIKNIT_LLM_CACHE_TTL (seconds, default a week) expires old responses.
+    """
+    global _shared_llm_cache
+    if os.environ.get("MAIKNIT_LLM_CACHE", "1") == "0":
+        return None
+    with _shared_lock:
+        if _shared_llm_cache is None:
+            ttl = os.environ.get("MAIKNIT_LLM_CACHE_TTL")
+            _shared_llm_cache = LLMCache(ttl=float(ttl) if ttl else LLM_CACHE_TTL)
+        return _shared_llm_cache
+
+
+def shared_llm_stats():
+    """Process-wide LLMStats"""
+    return _shared_llm_stats
+
+
+def shared_rate_limiter():
+    """Process-wide RateLimiter for the Groq key.
+
+    MAIKNIT_GROQ_RPM and MAIKNIT_GROQ_TPM set the limits up front (otherwise
+    they are learned from response headers); MAIKNIT_INTERACTIVE_RESERVE is
+    the share of each bucket batch calls leave for interactive ones.
+    """
+    global _shared_rate_limiter
+    with _shared_lock:
+        if _shared_rate_limiter is None:
+            rpm = os.environ.get("MAIKNIT_GROQ_RPM")
+            tpm = os.environ.get("MAIKNIT_GROQ_TPM")
+            _shared_rate_limiter = RateLimiter(rpm=int(rpm) if rpm else None, tpm=int(tpm) if tpm else None,
+                                               reserve=float(os.environ.get("MAIKNIT_INTERACTIVE_RESERVE", "0.2")))
+        return _shared_rate_limiter
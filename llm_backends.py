@@ -0,0 +1,160 @@
+"""Where LLM completions come from: the Groq API, or a fixture file.
+
+live    calls Groq (through the shared rate limiter)
+record  calls Groq and appends every prompt/response pair to a fixture file
+replay  answers from a fixture file with no network, optionally with latency
+
+MAIKNIT_LLM_BACKEND selects the backend (default live), MAIKNIT_LLM_FIXTURE
+the fixture file and MAIKNIT_REPLAY_LATENCY the replay latency: a number of
+milliseconds, or "recorded" to sleep as long as the recorded call took.
+"""
+import json
+import os
+import threading
+import time
+
+from candidate_store import content_hash
+from config import data_path
+from llm import shared_rate_limiter
+
+
+class Completion:
+    """Text and token usage of one completion"""
+
+    def __init__(self, content, prompt_tokens=0, completion_tokens=0, waited=0.0):
+        self.content = content
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+        # Seconds spent waiting for the rate limiter
+        self.waited = waited
+
+
+class FixtureMiss(Exception):
+    """Raised in replay when a prompt was never recorded"""
+
+
+def fixture_key(prompt, model, route):
+    """Identity of a call in a fixture file: the prompt and the settings that change the answer"""
+    return content_hash(json.dumps([model, route["temperature"], route["max_tokens"], prompt]))
+
+
+class LiveBackend:
+    """Completions from the Groq API"""
+
+    name = "live"
+
+    def __init__(self, get_client):
+        # Called per request, so a changed API key takes effect straight away
+        self.get_client = get_client
+
+    def complete(self, prompt, model, route):
+        limiter = shared_rate_limiter()
+        # Prompt plus the completion budget, until the response reports actual usage
+        estimated = len(prompt) // 4 + route["max_tokens"]
+        waited = limiter.acquire(estimated, interactive=route.get("priority") == "interactive")
+        try:
+            raw = self.get_client().chat.completions.with_raw_response.create(
+                model=model,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=route["temperature"],
+                max_tokens=route["max_tokens"],
+                timeout=route["timeout"],
+            )
+        except Exception as e:
+            response = getattr(e, "response", None)
+            if response is not None:
+                # 429s carry retry-after and the current budgets
+                limiter.update(response.headers)
+            limiter.settle(estimated, 0)
+            raise
+        limiter.update(raw.headers)
+        message = raw.parse()
+        usage = message.usage
+        limiter.settle(estimated, getattr(usage, "total_tokens", None))
+        return Completion(message.choices[0].message.content,
+                          getattr(usage, "prompt_tokens", 0) or 0,
+                          getattr(usage, "completion_tokens", 0) or 0, waited)
+
+
+_fixture_lock = threading.Lock()
+
+
+class RecordBackend:
+    """Live completions, each appended to a JSONL fixture file for later replay"""
+
+    name = "record"
+
+    def __init__(self, live, path):
+        self.live = live
+        self.path = path
+
+    def complete(self, prompt, model, route):
+        began = time.perf_counter()
+        completion = self.live.complete(prompt, model, route)
+        entry = {
+            "key": fixture_key(prompt, model, route), "model": model, "temperature": route["temperature"],
+            "max_tokens": route["max_tokens"], "prompt": prompt, "response": completion.content,
+            "prompt_tokens": completion.prompt_tokens, "completion_tokens": completion.completion_tokens,
+            "latency": time.perf_counter() - began - completion.waited,
+        }
+        with _fixture_lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+        return completion
+
+
+class ReplayBackend:
+    """Recorded completions served from a fixture file, with no network access.
+
+    Calls are matched on prompt and settings; if the settings have changed
+    since recording (e.g. a tuned route), the latest response recorded for
+    the same prompt is used. latency is None (answer at once), a number of
+    seconds, or "recorded" for each call's recorded duration.
+    """
+
+    name = "replay"
+
+    def __init__(self, path, latency=None):
+        self.path = path
+        self.latency = latency
+        self.by_key = {}
+        self.by_prompt = {}
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self.by_key[entry["key"]] = entry
+                    self.by_prompt[entry["prompt"]] = entry
+
+    def complete(self, prompt, model, route):
+        entry = self.by_key.get(fixture_key(prompt, model, route)) or self.by_prompt.get(prompt)
+        if entry is None:
+            raise FixtureMiss(f"no recorded response for this prompt in {self.path}")
+        delay = entry.get("latency", 0) if self.latency == "recorded" else self.latency
+        if delay:
+            time.sleep(delay)
+        return Completion(entry["response"], entry.get("prompt_tokens", 0), entry.get("completion_tokens", 0))
+
+
+_replay_backends = {}
+
+
+def backend_from_config(get_client):
+    """The backend selected by MAIKNIT_LLM_BACKEND for an agent whose Groq client get_client returns"""
+    kind = os.environ.get("MAIKNIT_LLM_BACKEND", "live")
+    path = os.environ.get("MAIKNIT_LLM_FIXTURE") or data_path("llm_fixture.jsonl")
+    if kind == "record":
+        return RecordBackend(LiveBackend(get_client), path)
+    if kind == "replay":
+        latency = os.environ.get("MAIKNIT_REPLAY_LATENCY")
+        if latency and latency != "recorded":
+            latency = float(latency) / 1000
+        # The fixture is loaded once per process and shared by every agent
+        with _fixture_lock:
+            key = (path, latency)
+            if key not in _replay_backends:
+                _replay_backends[key] = ReplayBackend(path, latency or None)
+            return _replay_backends[key]
+    if kind != "live":
+        print(f"Unknown MAIKNIT_LLM_BACKEND {kind!r}; using live")
+    return LiveBackend(get_client)
@@ -0,0 +1,145 @@
+import re
+import threading
+
+import numpy as np
+
+from candidate_index import chunk_text, embed_texts
+from resume_sections import question_tags
+
+
+def estimate_tokens(text):
+    """Rough token count (about four characters per token)"""
+    return len(text) // 4 + 1
+
+
+def _truncate(text, max_tokens):
+    max_chars = max_tokens * 4
+    return text if len(text) <= max_chars else text[:max_chars].rsplit(" ", 1)[0] + " ..."
+
+
+def _first_sentence(text):
+    text = " ".join(text.split())
+    match = re.search(r"(.+?[.!?])(\s|$)", text)
+    return match.group(1) if match else text
+
+
+class QASession:
+    """Multi-turn Q&A over one resume with a bounded prompt.
+
+    Each question is sent with only the resume chunks most similar to it
+    (and to the previous question, for follow-ups), the last few turns, and
+    a compact summary of older turns. Every part has its own token budget,
+    so the prompt size stays flat however long the conversation grows.
+    Older turns are folded into the summary locally, without an extra LLM call.
+
+    With a ResumeSections index the chunks follow the resume's sections, and
+    chunks from the section or mentioning the skill a question names rank
+    ahead of the rest.
+    """
+
+    def __init__(self, resume_hash, resume_text, llm_func, chunk_size=400, top_k=3,
+                 context_tokens=450, recent_turns=3, turn_tokens=300, summary_tokens=150, sections=None):
+        self.resume_hash = resume_hash
+        self.llm_func = llm_func
+        self.top_k = top_k
+        self.context_tokens = context_tokens
+        self.recent_turns = recent_turns
+        self.turn_tokens = turn_tokens
+        self.summary_tokens = summary_tokens
+        self.chunk_tags = None
+        tagged = sections.chunks(chunk_size) if sections else []
+        if tagged:
+            self.chunks = [text for text, _ in tagged]
+            self.chunk_tags = [tags for _, tags in tagged]
+        else:
+            self.chunks = chunk_text(resume_text, chunk_size) or [resume_text[:chunk_size]]
+        self._vectors = embed_texts(self.chunks)
+        self.turns = []
+        self.summary_lines = []
+        self._lock = threading.Lock()
+
+    @property
+    def vectors(self):
+        """Chunk embeddings, recomputed after release()"""
+        vectors = self._vectors
+        if vectors is None:
+            vectors = self._vectors = embed_texts(self.chunks)
+        return vectors
+
+    def release(self):
+        """Drop the chunk embeddings (the bulk of the memory); the conversation is kept"""
+        self._vectors = None
+
+    def memory_footprint(self):
+        """Approximate bytes held by the session"""
+        size = sum(len(chunk) for chunk in self.chunks)
+        size += self._vectors.nbytes if self._vectors is not None else 0
+        with self._lock:
+            size += sum(len(q) + len(a) for q, a in self.turns) + sum(len(line) for line in self.summary_lines)
+        return size
+
+    def relevant_chunks(self, question, use_history=True):
+        """Resume chunks most similar to the question, in resume order, within the context budget"""
+        query = question
+        with self._lock:
+            previous = self.turns[-1][0] if use_history and self.turns else None
+        if previous:
+            # Follow-ups like "and before that?" borrow the previous question's topic
+            query = f"{question} {previous}"
+        scores = self.vectors @ embed_texts([query])[0]
+        # The opening chunk (name, headline, latest role) is always useful context
+        ranked = [0] + [int(i) for i in np.argsort(-scores) if i != 0]
+        wanted = question_tags(query) if self.chunk_tags else None
+        if wanted:
+            # Most matching section types and skills first; similarity breaks ties
+            ranked = [0] + sorted(ranked[1:], key=lambda i: -len(self.chunk_tags[i] & wanted))
+        chosen = []
+        used = 0
+        for i in ranked[:self.top_k + 1]:
+            cost = estimate_tokens(self.chunks[i])
+            if chosen and used + cost > self.context_tokens:
+                continue
+            chosen.append(i)
+            used += cost
+        return [_truncate(self.chunks[i], self.context_tokens) for i in sorted(chosen)]
+
+    def build_prompt(self, question, use_history=True):
+        """Prompt for the next question: summary, recent turns and relevant resume excerpts"""
+        parts = ["Answer the question about the candidate's resume using the excerpts below. "
+                 "If the excerpts do not contain the answer, say so."]
+        with self._lock:
+            summary = list(self.summary_lines) if use_history else []
+            turns = list(self.turns) if use_history else []
+        if summary:
+            parts.append("Earlier in this conversation:\n" + "\n".join(summary))
+        if turns:
+            parts.append("Recent turns:\n" + "\n".join(f"Q: {q}\nA: {a}" for q, a in turns))
+        parts.append("Resume excerpts:\n" + "\n...\n".join(self.relevant_chunks(question, use_history)))
+        parts.append(f"Question: {question}")
+        return "\n\n".join(parts)
+
+    def ask(self, question, use_history=True):
+        """Answer a question; with use_history the turn becomes part of the conversation"""
+        answer = self.llm_func(self.build_prompt(question, use_history))
+        if use_history and not answer.startswith("ERROR:"):
+            self.record(question, answer)
+        return answer
+
+    def record(self, question, answer):
+        """Add a turn answered elsewhere (e.g. from the answer cache) to the conversation"""
+        with self._lock:
+            if self.turns and self.turns[-1][0].strip().lower() == question.strip().lower():
+                return
+            self.turns.append((question, _truncate(answer, self.turn_tokens // self.recent_turns)))
+            while len(self.turns) > self.recent_turns:
+                old_question, old_answer = self.turns.pop(0)
+                line = f"- {old_question} -> {_first_sentence(old_answer)}"
+                self.summary_lines.append(_truncate(line, self.summary_tokens // 3))
+            while self.summary_lines and estimate_tokens("\n".join(self.summary_lines)) > self.summary_tokens:
+                self.summary_lines.pop(0)
+
+    def reset(self):
+        """Forget the conversation but keep the resume index"""
+        with self._lock:
+            self.turns = []
+            self.summary_lines = []
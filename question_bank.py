@@ -0,0 +1,120 @@
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from config import data_path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS bank_questions (
+    id INTEGER PRIMARY KEY,
+    skill TEXT NOT NULL COLLATE NOCASE,
+    question_type TEXT NOT NULL,
+    difficulty TEXT NOT NULL,
+    question TEXT NOT NULL,
+    normalized TEXT NOT NULL UNIQUE,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_bank_lookup ON bank_questions(skill, question_type, difficulty);
+"""
+
+
+def normalize_question(question):
+    """Canonical form of a question, used to deduplicate and as a cache key"""
+    return re.sub(r"\s+", " ", re.sub(r"[^\w\s+#]", " ", question.lower())).strip()
+
+
+class QuestionBank:
+    """Persistent bank of reusable interview questions per (skill, type, difficulty).
+
+    Questions are about a skill, not a particular resume, so one generation
+    serves every candidate assessed on that skill. The bank is filled in
+    the background; assembling a question set from it is a single indexed
+    query. Near-duplicates are dropped by their normalised text.
+    """
+
+    def __init__(self, db_path=None, target_per_slot=6):
+        self.db_path = db_path or data_path("question_bank.db")
+        self.target_per_slot = target_per_slot
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def add(self, skill, question_type, difficulty, questions):
+        """Add questions to a slot, skipping ones already in the bank; return how many were new"""
+        now = time.time()
+        conn = self._connect()
+        added = 0
+        with conn:
+            for question in questions:
+                normalized = normalize_question(question)
+                if not normalized:
+                    continue
+                cur = conn.execute(
+                    "INSERT OR IGNORE INTO bank_questions "
+                    "(skill, question_type, difficulty, question, normalized, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    (skill, question_type, difficulty, question.strip(), normalized, now)
+                )
+                added += cur.rowcount
+        return added
+
+    def count(self, skill, question_type, difficulty):
+        """Number of banked questions for one slot"""
+        return self._connect().execute(
+            "SELECT COUNT(*) FROM bank_questions WHERE skill = ? AND question_type = ? AND difficulty = ?",
+            (skill, question_type, difficulty)
+        ).fetchone()[0]
+
+    def assemble(self, skills, question_type, difficulty, n):
+        """Up to n banked questions of one type, spread round-robin across skills"""
+        if not skills or n <= 0:
+            return []
+        placeholders = ", ".join("?" for _ in skills)
+        rows = self._connect().execute(
+            f"SELECT skill, question FROM bank_questions WHERE skill IN ({placeholders}) "
+            "AND question_type = ? AND difficulty = ? ORDER BY RANDOM()",
+            (*skills, question_type, difficulty)
+        ).fetchall()
+        by_skill = {}
+        for skill, question in rows:
+            by_skill.setdefault(skill.lower(), []).append(question)
+        queues = [by_skill[skill.lower()] for skill in skills if by_skill.get(skill.lower())]
+        questions = []
+        while queues and len(questions) < n:
+            for queue in list(queues):
+                questions.append(queue.pop())
+                if not queue:
+                    queues.remove(queue)
+                if len(questions) == n:
+                    break
+        return questions
+
+    def missing_slots(self, skills, question_types, difficulties):
+        """Slots holding fewer than target_per_slot questions"""
+        return [(skill, question_type, difficulty)
+                for skill in skills for question_type in question_types for difficulty in difficulties
+                if self.count(skill, question_type, difficulty) < self.target_per_slot]
+
+    def fill(self, generate_func, skills, question_types, difficulties, max_workers=4):
+        """Top up under-filled slots concurrently with generate_func(skill, type, difficulty, n)"""
+        slots = self.missing_slots(skills, question_types, difficulties)
+
+        def fill_slot(slot):
+            try:
+                return self.add(*slot, generate_func(*slot, self.target_per_slot))
+            except Exception as e:
+                print(f"Error filling question bank for {slot}: {e}")
+                return 0
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return sum(executor.map(fill_slot, slots))
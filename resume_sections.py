@@ -0,0 +1,303 @@
+import re
+
+from skill_extractor import skill_matcher
+
+# Heading phrases by section type, lower case with "&" written as "and"
+SECTION_HEADINGS = {
+    "summary": ("summary", "professional summary", "career summary", "profile", "professional profile",
+                "about", "about me", "objective", "career objective", "overview"),
+    "experience": ("experience", "work experience", "professional experience", "relevant experience",
+                   "employment", "employment history", "work history", "career history", "internships"),
+    "education": ("education", "academic background", "education and training", "qualifications",
+                  "academic qualifications"),
+    "skills": ("skills", "technical skills", "key skills", "core skills", "skills and tools",
+               "competencies", "core competencies", "technologies", "tech stack", "tools and technologies"),
+    "projects": ("projects", "key projects", "selected projects", "personal projects", "side projects",
+                 "academic projects"),
+    "certifications": ("certifications", "certificates", "licenses and certifications",
+                       "certifications and licenses", "courses", "training"),
+    "achievements": ("achievements", "awards", "honors", "honours", "accomplishments", "awards and honors",
+                     "awards and achievements"),
+    "publications": ("publications", "research", "patents", "talks", "publications and talks"),
+    "languages": ("languages", "spoken languages"),
+    "activities": ("interests", "hobbies", "activities", "volunteering", "volunteer experience",
+                   "leadership", "extracurricular activities"),
+    "contact": ("contact", "contact information", "contact details", "personal details",
+                "personal information", "references"),
+}
+
+# Single words that make a capitalised or colon-terminated short line a heading
+HEADING_WORDS = {
+    "summary": "summary", "profile": "summary", "objective": "summary", "experience": "experience",
+    "employment": "experience", "education": "education", "qualifications": "education",
+    "skills": "skills", "competencies": "skills", "technologies": "skills", "projects": "projects",
+    "certifications": "certifications", "certificates": "certifications", "achievements": "achievements",
+    "awards": "achievements", "honors": "achievements", "publications": "publications",
+    "languages": "languages", "interests": "activities", "activities": "activities",
+}
+
+# Words in a question that point at a section type
+QUESTION_WORDS = {
+    "experience": ("experience", "worked", "work", "job", "jobs", "role", "roles", "company", "companies",
+                   "employer", "employers", "position", "positions", "recent", "current", "years"),
+    "education": ("education", "degree", "degrees", "university", "college", "school", "studied",
+                  "study", "graduate", "graduated", "gpa", "major"),
+    "skills": ("skills", "skill", "technologies", "technology", "tools", "stack", "proficient"),
+    "projects": ("project", "projects", "built", "side"),
+    "certifications": ("certification", "certifications", "certified", "certificate", "course", "courses"),
+    "achievements": ("award", "awards", "achievement", "achievements", "honors", "accomplishments"),
+    "publications": ("publication", "publications", "paper", "papers", "published", "research", "patent"),
+    "languages": ("languages", "speak", "speaks", "spoken", "fluent"),
+    "summary": ("summary", "profile", "overview", "objective", "background"),
+    "header": ("contact", "email", "phone", "name", "location", "linkedin", "github"),
+}
+
+# Sections an excerpt draws on, most useful first
+EXCERPT_KINDS = ("summary", "experience", "projects", "skills", "education")
+
+_HEADINGS = {phrase: kind for kind, phrases in SECTION_HEADINGS.items() for phrase in phrases}
+_QUESTION_KINDS = {}
+for _kind, _words in QUESTION_WORDS.items():
+    for _word in _words:
+        _QUESTION_KINDS.setdefault(_word, set()).add(_kind)
+
+_BULLET = re.compile(r"(?:[-*•▪◦●■►‣–—·⁃∙]|\d{1,2}[.)])\s+")
+_DECORATION = " \t#*=_-|•·"
+# A wrapped bullet line continues after a line ending in one of these
+_CONTINUES = ",;:-/&("
+
+
+def _heading_kind(line):
+    """(section type, title, text after a colon) if the line is a section heading, else None"""
+    head, colon, rest = line.partition(":")
+    title = head.strip(_DECORATION)
+    if not title or len(title) > 40 or any(char.isdigit() for char in title):
+        return None
+    key = " ".join(title.lower().replace("&", " and ").split())
+    kind = _HEADINGS.get(key)
+    if kind is None:
+        # Unlisted headings: "TECHNICAL SKILLS & TOOLS", "Machine Learning Projects", "Awards:"
+        words = key.split()
+        if len(words) > 5 or (colon and rest.strip()):
+            return None
+        capitalised = all(word[:1].isupper() or word in ("and", "&", "of") for word in title.split())
+        if not (title.isupper() or colon or capitalised):
+            return None
+        kind = HEADING_WORDS.get(words[-1]) or (HEADING_WORDS.get(words[0]) if title.isupper() or colon else None)
+        if kind is None:
+            return None
+    return kind, title, rest.strip() if colon else ""
+
+
+def question_tags(question):
+    """Section types and skills (lower case) a question refers to, comparable with chunk tags"""
+    tags = set()
+    for word in re.findall(r"[a-z]+", question.lower()):
+        tags.update(_QUESTION_KINDS.get(word, ()))
+    tags.update(skill.lower() for skill in skill_matcher().find(question))
+    return tags
+
+
+class ResumeSections:
+    """Sections and entries of a resume with their offsets, built in one pass over the text.
+
+    A section is (type, title, start, end, first entry, end entry) and an
+    entry (start, end, section number, bullet): a bullet with its wrapped
+    lines, or a paragraph of plain lines such as a job title and dates.
+    Text before the first heading is the "header" section. Entries are
+    indexed by the skills they mention and sections by type, so later
+    lookups are dictionary hits rather than scans of the text.
+    """
+
+    def __init__(self, text):
+        self.text = text or ""
+        self.sections = []
+        self.entries = []
+        self.entry_skills = []
+        self.by_kind = {}   # section type -> [section numbers]
+        self.by_skill = {}  # lower-case skill -> [entry numbers]
+        self._segment()
+        matcher = skill_matcher()
+        for number, (start, end, _, _) in enumerate(self.entries):
+            skills = tuple(matcher.find(self.text[start:end]))
+            self.entry_skills.append(skills)
+            for skill in skills:
+                self.by_skill.setdefault(skill.lower(), []).append(number)
+        for number, section in enumerate(self.sections):
+            self.by_kind.setdefault(section[0], []).append(number)
+
+    def _segment(self):
+        sections = [["header", "", 0, 0, 0]]
+        entries = []
+        # Whether the next plain line may continue the last entry (no blank line or heading since)
+        joinable = False
+        previous = ""
+        offset = 0
+        for raw in self.text.splitlines(keepends=True):
+            line_start = offset
+            offset += len(raw)
+            line = raw.strip()
+            if not line:
+                joinable = False
+                continue
+            start = line_start + len(raw) - len(raw.lstrip())
+            end = start + len(line)
+            bullet = _BULLET.match(line) is not None
+            heading = None if bullet else _heading_kind(line)
+            if heading:
+                kind, title, rest = heading
+                sections[-1][4] = len(entries)
+                sections.append([kind, title, start, end, len(entries)])
+                if rest:
+                    entries.append([end - len(rest), end, len(sections) - 1, False])
+                joinable = bool(rest)
+            elif not bullet and joinable and entries and entries[-1][2] == len(sections) - 1 and (
+                    not entries[-1][3] or line[0].islower() or previous[-1] in _CONTINUES):
+                entries[-1][1] = end
+            else:
+                entries.append([start, end, len(sections) - 1, bullet])
+                joinable = True
+            sections[-1][3] = end
+            previous = line
+        sections[-1][4] = len(entries)
+        # Sections become (type, title, start, end, first entry, end entry)
+        first = 0
+        for section in sections:
+            section.insert(4, first)
+            first = section[5]
+        self.sections = [tuple(section) for section in sections if section[0] != "header" or section[5]]
+        if len(self.sections) < len(sections):
+            # The empty header was dropped; renumber the entries' sections
+            entries = [[start, end, number - 1, bullet] for start, end, number, bullet in entries]
+        self.entries = [tuple(entry) for entry in entries]
+
+    def memory_footprint(self):
+        """Approximate bytes held by the index itself (the text is the agent's)"""
+        return 64 * (len(self.sections) + len(self.entries)) + 16 * sum(len(s) for s in self.entry_skills)
+
+    def entry_text(self, number, marker=True):
+        start, end, _, bullet = self.entries[number]
+        text = self.text[start:end]
+        if bullet and not marker:
+            text = _BULLET.sub("", text, count=1)
+        return text
+
+    def section_text(self, kind):
+        """Text of every section of a type, headings included"""
+        return "\n\n".join(self.text[self.sections[n][2]:self.sections[n][3]] for n in self.by_kind.get(kind, ()))
+
+    def find_skill(self, skill):
+        """Numbers of the entries that mention a skill or one of its aliases"""
+        canonical = skill_matcher().canonical(skill)
+        key = (canonical or skill).lower()
+        found = self.by_skill.get(key)
+        if found is None:
+            if canonical:
+                return []
+            # A skill outside the vocabulary is looked up once by substring, then remembered
+            found = [n for n, (start, end, _, _) in enumerate(self.entries) if key in self.text[start:end].lower()]
+            self.by_skill[key] = found
+        return found
+
+    def evidence(self, skill, limit=2):
+        """[(section title, entry text)] for the first entries that mention a skill"""
+        return [(self.sections[self.entries[n][2]][1] or "Header", self.entry_text(n, marker=False))
+                for n in self.find_skill(skill)[:limit]]
+
+    def relevant_block(self, skill):
+        """The entry that mentions a skill or, failing that, the first role in the experience section"""
+        found = self.find_skill(skill)
+        if found:
+            return self.entry_text(found[0])
+        for number in self.by_kind.get("experience", ()):
+            _, _, _, _, first, stop = self.sections[number]
+            if first == stop:
+                continue
+            # A role is its title paragraph and the bullets under it
+            last = first
+            while last + 1 < stop and self.entries[last + 1][3]:
+                last += 1
+            return self.text[self.entries[first][0]:self.entries[last][1]]
+        return ""
+
+    def excerpt(self, max_chars, skills=(), kinds=EXCERPT_KINDS):
+        """At most about max_chars of the most useful entries, in resume order under their headings.
+
+        The header comes first, then entries mentioning the skills, then
+        entries of the given section types in that order.
+        """
+        if not self.entries:
+            return self.text[:max_chars]
+        candidates = []
+        for number in self.by_kind.get("header", ()):
+            candidates.extend(range(self.sections[number][4], self.sections[number][5]))
+        for skill in skills:
+            candidates.extend(self.find_skill(skill))
+        for kind in kinds:
+            for number in self.by_kind.get(kind, ()):
+                candidates.extend(range(self.sections[number][4], self.sections[number][5]))
+        chosen = set()
+        titled = set()
+        used = 0
+        for number in candidates:
+            if number in chosen:
+                continue
+            start, end, section, _ = self.entries[number]
+            cost = end - start + 1
+            if section not in titled:
+                cost += len(self.sections[section][1]) + 2
+            if used + cost > max_chars:
+                continue
+            chosen.add(number)
+            titled.add(section)
+            used += cost
+        if not chosen:
+            return self.text[:max_chars]
+        lines = []
+        current = None
+        for number in sorted(chosen):
+            section = self.entries[number][2]
+            if section != current:
+                current = section
+                title = self.sections[section][1]
+                if title:
+                    lines.append(f"\n{title}" if lines else title)
+            lines.append(self.entry_text(number))
+        return "\n".join(lines)
+
+    def chunks(self, max_chars):
+        """[(text, tags)] packing each section's entries into chunks of about max_chars.
+
+        Tags are the section type and the lower-case skills the chunk
+        mentions, for matching against question_tags().
+        """
+        chunks = []
+        for kind, title, _, _, first, stop in self.sections:
+            parts, tags, size = [], {kind}, len(title)
+            for number in range(first, stop):
+                text = self.entry_text(number)
+                # Break at a role or paragraph rather than between its bullets where possible
+                new_block = not self.entries[number][3] and size > max_chars // 2
+                if parts and (new_block or size + len(text) + 1 > max_chars):
+                    chunks.append(("\n".join([title] + parts if title else parts), tags))
+                    parts, tags, size = [], {kind}, len(title)
+                parts.append(text)
+                tags.update(skill.lower() for skill in self.entry_skills[number])
+                size += len(text) + 1
+            if parts:
+                chunks.append(("\n".join([title] + parts if title else parts), tags))
+        return chunks
+
+    def outline(self):
+        """One line describing the resume's structure, e.g. "Summary; Experience (3 roles, 11 bullets); Skills\""""
+        parts = []
+        for kind, title, _, _, first, stop in self.sections:
+            bullets = sum(1 for number in range(first, stop) if self.entries[number][3])
+            name = title or kind.capitalize()
+            if kind == "experience" and stop - first > bullets:
+                parts.append(f"{name} ({stop - first - bullets} roles, {bullets} bullets)")
+            elif bullets:
+                parts.append(f"{name} ({bullets} bullets)")
+            else:
+                parts.append(name)
+        return "; ".join(parts)
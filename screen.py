@@ -0,0 +1,284 @@
+"""Batch-screen a folder of resumes from the command line.
+
+Results are streamed as JSONL or CSV while the run progresses. A checkpoint
+file records the content hash of every finished resume, so an interrupted
+run picks up where it stopped and duplicate files are screened once.
+Resumes that fail are not checkpointed and are retried by the next run;
+their errors go to <output>.errors.jsonl, rewritten by every run, rather
+than to the results.
+
+    python screen.py resumes/ --role "Data Engineer" --workers 4 -o results.jsonl
+    python screen.py 'inbox/**/*.pdf' --jd job.txt --cutoff 70 -o shortlist.csv
+    python screen.py resumes/ --role "Backend Engineer" --offline -o scores.jsonl
+    python screen.py ats_export/ --role "Data Engineer" --doc-timeout 20 -o results.jsonl
+    python screen.py resumes/ --role "Data Engineer" --offline -o scores.jsonl --matrix scores.npz
+
+PDF, DOCX, HTML and TXT resumes are read directly (the format is detected
+from the content). Each document is read with a time and memory limit, so
+one broken file fails on its own instead of stalling a worker.
+
+--matrix also writes the skill results in columnar form (skill_results.py):
+the role's skills once, then one row of mention counts and scores per
+resume, which is far smaller than the per-resume dicts for large batches.
+The file is saved every MATRIX_SAVE_EVERY rows; rows a killed run had
+checkpointed but not saved are recounted on the next run.
+"""
+import argparse
+import csv
+import glob
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import skill_extractor
+from candidate_store import content_hash
+from roles import ROLE_REQUIREMENTS
+from skill_results import SkillResults, vocabulary_for
+
+from ingestion import EXTENSIONS as RESUME_EXTENSIONS
+
+CSV_FIELDS = ["file", "resume_hash", "role", "overall_score", "selected",
+              "strengths", "missing_skills", "skill_scores", "error"]
+MATRIX_SAVE_EVERY = 500
+
+_agent = None
+
+
+def find_resumes(inputs):
+    """Resume files from directories (searched recursively), globs and plain paths, in a stable order"""
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, _, files in os.walk(item):
+                paths.extend(os.path.join(root, name) for name in files
+                             if os.path.splitext(name)[1].lower() in RESUME_EXTENSIONS)
+        elif os.path.exists(item):
+            paths.append(item)
+        else:
+            paths.extend(p for p in glob.glob(item, recursive=True)
+                         if os.path.splitext(p)[1].lower() in RESUME_EXTENSIONS)
+    return sorted(set(paths))
+
+
+def load_checkpoint(path):
+    """Files already screened in an earlier run, keyed by content hash"""
+    if not path or not os.path.exists(path):
+        return {}
+    done = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                resume_hash, _, file = line.rstrip("\n").partition("\t")
+                done[resume_hash] = file
+    return done
+
+
+def _init_worker(groq_api_key, cutoff, offline, use_store, doc_timeout, doc_memory_mb):
+    global _agent
+    from agents import ResumeAnalysisAgent
+    from candidate_store import CandidateStore
+    from ingestion import limit_memory
+    # Headroom for one document on top of the worker's baseline
+    if doc_memory_mb:
+        limit_memory(doc_memory_mb)
+    # Offline runs use fast mode: deterministic scoring only, weakness analysis
+    # is deferred until the candidate is opened in the app
+    _agent = ResumeAnalysisAgent(groq_api_key, cutoff_score=cutoff,
+                                 store=CandidateStore() if use_store else None, fast_mode=offline)
+    _agent.ingestion_timeout = doc_timeout
+
+
+def _screen_one(path, resume_hash, role_key, skills):
+    row = {"file": path, "resume_hash": resume_hash, "role": role_key}
+    try:
+        result = _agent.analyze_resume(path, role_requirements=skills, role_name=role_key)
+        if not result:
+            row["error"] = "no text could be extracted"
+            return row
+        row.update({
+            "overall_score": result.get("overall_score", 0),
+            "selected": result.get("selected", False),
+            "strengths": result.get("strengths", []),
+            "missing_skills": result.get("missing_skills", []),
+            "skill_scores": result.get("skill_scores", {}),
+        })
+        counts = _agent.skill_counts
+        if counts is None:
+            # Served from the candidate store, which keeps the dict form only
+            counts = vocabulary_for(skills).count_mentions(_agent.resume_text)
+        row["skill_counts"] = counts
+    except Exception as e:
+        row["error"] = str(e)
+    return row
+
+
+def _count_one(path, resume_hash, skills):
+    # Mention counts only, for matrix rows lost when a run was killed between saves
+    try:
+        text = _agent.extract_text_cached(path)
+    except Exception as e:
+        print(f"Error reading {path}: {e}", file=sys.stderr)
+        text = None
+    return resume_hash, vocabulary_for(skills).count_mentions(text) if text else None
+
+
+class ResultWriter:
+    """Appends result rows to a JSONL or CSV file (or stdout), flushing each one"""
+
+    def __init__(self, path, fmt, append=True):
+        self.fmt = fmt
+        self.file = open(path, "a" if append else "w", encoding="utf-8", newline="") if path else sys.stdout
+        if fmt == "csv":
+            self.csv = csv.DictWriter(self.file, fieldnames=CSV_FIELDS, extrasaction="ignore")
+            if not path or self.file.tell() == 0:
+                self.csv.writeheader()
+
+    def write(self, row):
+        if self.fmt == "csv":
+            self.csv.writerow({key: json.dumps(value) if isinstance(value, (list, dict)) else value
+                               for key, value in row.items()})
+        else:
+            self.file.write(json.dumps(row) + "\n")
+        self.file.flush()
+
+    def close(self):
+        if self.file is not sys.stdout:
+            self.file.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0],
+                                     formatter_class=argparse.RawDescriptionHelpFormatter,
+                                     epilog="\n".join(__doc__.splitlines()[1:]))
+    parser.add_argument("inputs", nargs="+", help="resume files, directories or glob patterns (PDF, DOCX, HTML, TXT)")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--role", choices=sorted(ROLE_REQUIREMENTS), help="role from ROLE_REQUIREMENTS")
+    target.add_argument("--jd", help="job description file (PDF, DOCX, HTML or TXT)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes")
+    parser.add_argument("--cutoff", type=int, default=75, help="score needed to be selected")
+    parser.add_argument("-o", "--output", help="output file (.jsonl or .csv); default stdout")
+    parser.add_argument("--format", choices=["jsonl", "csv"], help="output format (default: from --output)")
+    parser.add_argument("--checkpoint", help="progress file (default: <output>.checkpoint)")
+    parser.add_argument("--errors", help="failed resumes of this run, as JSONL (default: <output>.errors.jsonl; "
+                                         "with no output they are written with the results)")
+    parser.add_argument("--restart", action="store_true", help="ignore an existing checkpoint and output")
+    parser.add_argument("--offline", action="store_true", help="fast screening: local scoring only, no LLM calls")
+    parser.add_argument("--no-store", action="store_true", help="do not save results to the candidate store")
+    parser.add_argument("--doc-timeout", type=float, default=30, help="seconds allowed to read one document")
+    parser.add_argument("--doc-memory-mb", type=int, default=512, help="memory allowed to read one document")
+    parser.add_argument("--matrix", help="also write columnar skill results to this .npz file")
+    args = parser.parse_args(argv)
+
+    fmt = args.format or ("csv" if args.output and args.output.lower().endswith(".csv") else "jsonl")
+    checkpoint_path = args.checkpoint or (f"{args.output}.checkpoint" if args.output else None)
+    errors_path = args.errors or (f"{args.output}.errors.jsonl" if args.output else None)
+    groq_api_key = os.environ.get("GROQ_API_KEY", "")
+    if not args.offline and not groq_api_key:
+        parser.error("set GROQ_API_KEY, or use --offline for deterministic scoring only")
+
+    if args.role:
+        role_key, skills = args.role, ROLE_REQUIREMENTS[args.role]
+    else:
+        from agents import ResumeAnalysisAgent
+        jd_agent = ResumeAnalysisAgent(groq_api_key)
+        # Skills are extracted once for the whole batch, under the same key the app uses
+        with open(args.jd, "rb") as f:
+            role_key = f"Custom JD {content_hash(f.read())[:12]}"
+        jd_text = jd_agent.extract_text_from_file(args.jd)
+        if args.offline:
+            skills = skill_extractor.extract_skills(jd_text)
+        else:
+            skills = jd_agent.extract_skills_from_jd(jd_text)
+        if not skills:
+            parser.error(f"no skills could be extracted from {args.jd}")
+
+    if args.matrix and not args.matrix.endswith(".npz"):
+        parser.error("--matrix must name an .npz file")
+    if args.restart:
+        for path in (checkpoint_path, args.output, args.matrix, errors_path):
+            if path and os.path.exists(path):
+                os.remove(path)
+    done = load_checkpoint(checkpoint_path)
+
+    matrix = None
+    recount = []
+    if args.matrix:
+        matrix = SkillResults(vocabulary_for(skills))
+        if os.path.exists(args.matrix):
+            matrix = SkillResults.load(args.matrix)
+            if matrix.vocabulary.skills != tuple(skills):
+                parser.error(f"{args.matrix} holds results for other skills; use --restart or another file")
+        saved = set(matrix.resume_hashes)
+        recount = [(path, resume_hash) for resume_hash, path in done.items() if resume_hash not in saved]
+
+    pending = []
+    skipped = 0
+    for path in find_resumes(args.inputs):
+        with open(path, "rb") as f:
+            resume_hash = content_hash(f.read())
+        if resume_hash in done:
+            skipped += 1
+            continue
+        # Duplicate files in one run are screened once
+        done[resume_hash] = path
+        pending.append((path, resume_hash))
+    print(f"Screening {len(pending)} resumes for {role_key} ({skipped} already done or duplicates) "
+          f"with {args.workers} workers", file=sys.stderr)
+
+    writer = ResultWriter(args.output, fmt)
+    # Failed resumes are retried by every run, so only this run's failures are kept
+    error_writer = ResultWriter(errors_path, "jsonl", append=False) if errors_path else writer
+    checkpoint = open(checkpoint_path, "a", encoding="utf-8") if checkpoint_path else None
+    screened = selected = failed = 0
+    executor = ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker,
+                                   initargs=(groq_api_key, args.cutoff, args.offline, not args.no_store,
+                                             args.doc_timeout, args.doc_memory_mb))
+    try:
+        if recount:
+            print(f"Recounting {len(recount)} rows missing from {args.matrix}", file=sys.stderr)
+            for future in as_completed([executor.submit(_count_one, path, resume_hash, skills)
+                                        for path, resume_hash in recount]):
+                resume_hash, counts = future.result()
+                if counts is not None:
+                    matrix.add(resume_hash, counts)
+        futures = [executor.submit(_screen_one, path, resume_hash, role_key, skills)
+                   for path, resume_hash in pending]
+        for future in as_completed(futures):
+            row = future.result()
+            counts = row.pop("skill_counts", None)
+            if row.get("error"):
+                # Not checkpointed, so a resumed run tries it again
+                error_writer.write(row)
+                failed += 1
+                continue
+            writer.write(row)
+            screened += 1
+            selected += bool(row["selected"])
+            if matrix is not None:
+                matrix.add(row["resume_hash"], counts)
+            if checkpoint:
+                checkpoint.write(f"{row['resume_hash']}\t{row['file']}\n")
+                checkpoint.flush()
+            if matrix is not None and len(matrix) % MATRIX_SAVE_EVERY == 0:
+                matrix.save(args.matrix)
+    except KeyboardInterrupt:
+        print("Interrupted; run the same command again to resume", file=sys.stderr)
+        executor.shutdown(wait=False, cancel_futures=True)
+        return 130
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+        writer.close()
+        if error_writer is not writer:
+            error_writer.close()
+        if checkpoint:
+            checkpoint.close()
+        if matrix is not None:
+            matrix.save(args.matrix)
+    print(f"Done: {screened} screened, {selected} selected, {failed} failed"
+          + (f" (see {errors_path})" if failed and errors_path else ""), file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+"""Reproducible benchmark of the full analyse -> improve -> rewrite flow.
+
+Record once (against Groq, or the fake server with --fake), then replay the
+fixture offline as often as needed. Replay makes no network calls, so
+timings only move when the code does, and the digest of all outputs must
+not change between runs unless the code's behaviour did.
+
+    python scripts/bench_flow.py record --fake --fixture flow.jsonl
+    GROQ_API_KEY=... python scripts/bench_flow.py record --fixture flow.jsonl
+    python scripts/bench_flow.py replay --fixture flow.jsonl --latency-ms 300
+    python scripts/bench_flow.py replay --fixture flow.jsonl --latency-ms recorded
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import fake_groq  # noqa: E402  (sibling script)
+from bench_workers import make_resume_pdfs  # noqa: E402
+
+ROLE = "Backend Engineer"
+QUESTIONS = ["What is the candidate's most recent role?", "Which cloud platforms has the candidate used?"]
+AREAS = ["Content", "Format", "Skills Highlighting", "Achievements"]
+
+
+def run_flow(agent, path, role_requirements, timings):
+    """One candidate through the app's main actions; returns everything the user would see"""
+    def timed(step, func, *args, **kwargs):
+        began = time.perf_counter()
+        result = func(*args, **kwargs)
+        timings.setdefault(step, []).append(time.perf_counter() - began)
+        return result
+
+    return {
+        "analysis": timed("analyze", agent.analyze_resume, path, role_requirements=role_requirements,
+                          role_name=ROLE),
+        "answers": [timed("ask", agent.ask_question, question) for question in QUESTIONS],
+        "questions": timed("questions", agent.generate_interview_questions, ["Basic", "Technical"], "Medium", 6),
+        "improvements": timed("improve", agent.improve_resume, AREAS, ROLE),
+        "rewrite": timed("rewrite", agent.get_improved_resume, ROLE, "Python, Docker"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("mode", choices=["record", "replay"])
+    parser.add_argument("--fixture", required=True, help="JSONL fixture file to write or read")
+    parser.add_argument("--resumes", type=int, default=5, help="synthetic resumes to run through the flow")
+    parser.add_argument("--latency-ms", default=None, help='replay latency per call, or "recorded"')
+    parser.add_argument("--fake", action="store_true", help="record against a local fake Groq server")
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix="maiknit-flow-")
+    os.environ["MAIKNIT_DATA_DIR"] = data_dir
+    os.environ["MAIKNIT_LLM_BACKEND"] = args.mode
+    os.environ["MAIKNIT_LLM_FIXTURE"] = os.path.abspath(args.fixture)
+    if args.latency_ms:
+        os.environ["MAIKNIT_REPLAY_LATENCY"] = args.latency_ms
+    server = None
+    if args.mode == "record":
+        if os.path.exists(args.fixture):
+            os.remove(args.fixture)
+        if args.fake:
+            server, os.environ["GROQ_BASE_URL"] = fake_groq.start_server(fake_groq.FakeGroq(seed=1))
+        elif not os.environ.get("GROQ_API_KEY"):
+            parser.error("set GROQ_API_KEY, or use --fake to record against the fake server")
+
+    try:
+        from agents import ResumeAnalysisAgent
+        from llm import shared_llm_stats
+        from roles import ROLE_REQUIREMENTS
+
+        paths = make_resume_pdfs(data_dir, args.resumes, pages=1)
+        timings = {}
+        outputs = []
+        began = time.perf_counter()
+        for path in paths:
+            # A fresh agent per candidate, as in a new session
+            agent = ResumeAnalysisAgent(os.environ.get("GROQ_API_KEY", "replay"))
+            outputs.append(run_flow(agent, path, ROLE_REQUIREMENTS[ROLE], timings))
+            agent.cleanup()
+        elapsed = time.perf_counter() - began
+    finally:
+        if server:
+            server.shutdown()
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    digest = hashlib.sha256(json.dumps(outputs, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+    print(f"{args.mode}: {len(paths)} candidates in {elapsed:.2f} s, output digest {digest[:16]}")
+    print(f"{'step':10s} {'median ms':>10s} {'max ms':>8s}")
+    for step, values in timings.items():
+        print(f"{step:10s} {statistics.median(values) * 1000:10.1f} {max(values) * 1000:8.1f}")
+    stats = shared_llm_stats().summary()
+    errors = sum(row["errors"] for row in stats.values())
+    print(f"LLM calls: {sum(row['calls'] for row in stats.values())}, errors: {errors}"
+          + (" (prompts missing from the fixture; record it again)" if errors and args.mode == "replay" else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Measure cold-start cost of the Streamlit app.
+
+Each measurement runs in a fresh interpreter so module caches do not hide
+import cost. Reports the import time of the app modules on top of
+Streamlit, which heavy dependencies they pull in eagerly, and the time to
+the first full render of app.py.
+
+    python scripts/bench_startup.py --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ["matplotlib", "groq", "langchain", "langchain_community", "faiss", "PyPDF2"]
+
+IMPORT_PROBE = """
+import json, sys, time
+import streamlit
+start = time.perf_counter()
+import ui, agents
+elapsed = time.perf_counter() - start
+print(json.dumps({"seconds": elapsed, "loaded": [m for m in %r if m in sys.modules]}))
+""" % (HEAVY_MODULES,)
+
+RENDER_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file("app.py", default_timeout=120).run()
+elapsed = time.perf_counter() - start
+print(json.dumps({"seconds": elapsed, "errors": len(at.exception)}))
+"""
+
+
+def run_probe(code):
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env,
+                         capture_output=True, text=True, check=True).stdout
+    # Streamlit may log warnings to stdout before the result line
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3, help="fresh interpreters per measurement")
+    args = parser.parse_args()
+
+    for name, code in (("import ui+agents", IMPORT_PROBE), ("first render of app.py", RENDER_PROBE)):
+        results = [run_probe(code) for _ in range(args.runs)]
+        times = [r["seconds"] * 1000 for r in results]
+        print(f"{name:24s} median {statistics.median(times):8.1f} ms   "
+              f"min {min(times):8.1f} ms   max {max(times):8.1f} ms")
+        if "loaded" in results[-1]:
+            # Only meaningful for the import probe; Streamlit's test harness loads matplotlib itself
+            print(f"{'':24s} heavy modules loaded: {', '.join(results[-1]['loaded']) or 'none'}")
+        if results[-1].get("errors"):
+            print(f"{'':24s} WARNING: app raised {results[-1]['errors']} exception(s) while rendering")
+
+
+if __name__ == "__main__":
+    main()
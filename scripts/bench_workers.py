@@ -0,0 +1,140 @@
+"""Measure resume analysis throughput with 1..N app worker processes.
+
+Simulates the multi-worker layout of scripts/run_workers.sh: every worker
+is a separate process sharing one data directory, and a fixed number of
+concurrent recruiter sessions is spread across the workers. LLM calls are
+replaced by a sleep of --llm-latency-ms, so the numbers reflect PDF
+parsing, scoring and store writes plus waiting on the model. Every resume
+is unique, so no cache hides the work.
+
+    python scripts/bench_workers.py --workers 1 2 4 --sessions 8 --resumes 48
+"""
+import argparse
+import multiprocessing as mp
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+SKILLS = ["Python", "SQL", "Docker", "Kubernetes", "AWS", "Kafka", "Airflow", "Spark",
+          "Terraform", "React", "TypeScript", "Machine Learning", "CI/CD", "Redis"]
+
+
+def make_resume_pdfs(directory, count, pages=3):
+    """Write count distinct synthetic resumes as PDFs and return their paths"""
+    from artifacts import text_to_pdf
+    rng = random.Random(42)
+    paths = []
+    for n in range(count):
+        lines = [f"Candidate {n}", "Experience"]
+        # A handful of skills per candidate, so some are missing and trigger LLM calls
+        skills = rng.sample(SKILLS, 5)
+        for _ in range(pages * 45):
+            skill = rng.choice(skills)
+            lines.append(f"- Built {rng.choice(['services', 'pipelines', 'dashboards'])} with {skill} "
+                         f"for project {rng.randint(1, 10 ** 6)}, improving throughput by {rng.randint(5, 90)}%")
+        path = os.path.join(directory, f"resume_{n}.pdf")
+        with open(path, "wb") as f:
+            f.write(text_to_pdf("\n".join(lines), title=f"Candidate {n}"))
+        paths.append(path)
+    return paths
+
+
+def worker_main(tasks, results, ready, start, sessions, llm_latency):
+    import threading
+    from agents import ResumeAnalysisAgent
+    from candidate_store import CandidateStore
+
+    class SimulatedAgent(ResumeAnalysisAgent):
+        def _groq_completion(self, prompt, model, *args, **kwargs):
+            time.sleep(llm_latency)
+            return "Issue: Limited evidence\nSolution 1: Add a project\nSolution 2: Quantify impact"
+
+    store = CandidateStore()
+    # Pay the one-off import cost (PDF parser, LangChain, FAISS) before timing starts
+    SimulatedAgent("bench", store=store).create_rag_vector_store("warm up")
+    ready.put(os.getpid())
+    start.wait()
+
+    def session():
+        agent = SimulatedAgent("bench", store=store)
+        while True:
+            path = tasks.get()
+            if path is None:
+                return
+            began = time.perf_counter()
+            agent.analyze_resume(path, role_requirements=SKILLS, role_name="Bench")
+            results.put(time.perf_counter() - began)
+
+    threads = [threading.Thread(target=session) for _ in range(sessions)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def run(workers, sessions, paths, llm_latency):
+    ctx = mp.get_context("spawn")
+    data_dir = tempfile.mkdtemp(prefix="maiknit-bench-")
+    os.environ["MAIKNIT_DATA_DIR"] = data_dir
+    if workers > 1:
+        os.environ["MAIKNIT_LLM_LEASE_DB"] = os.path.join(data_dir, "llm_leases.db")
+    else:
+        os.environ.pop("MAIKNIT_LLM_LEASE_DB", None)
+    tasks, results, ready, start = ctx.Queue(), ctx.Queue(), ctx.Queue(), ctx.Event()
+    per_worker = max(1, sessions // workers)
+    procs = [ctx.Process(target=worker_main, args=(tasks, results, ready, start, per_worker, llm_latency))
+             for _ in range(workers)]
+    for proc in procs:
+        proc.start()
+    for _ in procs:
+        ready.get()
+    for path in paths:
+        tasks.put(path)
+    for _ in range(per_worker * workers):
+        tasks.put(None)
+
+    began = time.perf_counter()
+    start.set()
+    latencies = [results.get() for _ in paths]
+    elapsed = time.perf_counter() - began
+    for proc in procs:
+        proc.join()
+    shutil.rmtree(data_dir, ignore_errors=True)
+    return elapsed, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="worker counts to compare")
+    parser.add_argument("--sessions", type=int, default=8, help="concurrent sessions in total")
+    parser.add_argument("--resumes", type=int, default=48, help="resumes analysed per run")
+    parser.add_argument("--llm-latency-ms", type=float, default=200, help="simulated latency per LLM call")
+    args = parser.parse_args()
+
+    corpus = tempfile.mkdtemp(prefix="maiknit-resumes-")
+    try:
+        paths = make_resume_pdfs(corpus, args.resumes)
+        print(f"{args.resumes} resumes, {args.sessions} concurrent sessions, "
+              f"{args.llm_latency_ms:.0f} ms per LLM call, {os.cpu_count()} CPUs")
+        baseline = None
+        for workers in args.workers:
+            elapsed, latencies = run(workers, args.sessions, paths, args.llm_latency_ms / 1000)
+            throughput = len(paths) / elapsed
+            baseline = baseline or throughput
+            latencies.sort()
+            print(f"workers {workers:2d}   {throughput:6.2f} resumes/s   x{throughput / baseline:4.2f}   "
+                  f"p50 {statistics.median(latencies) * 1000:7.0f} ms   "
+                  f"p95 {latencies[int(len(latencies) * 0.95) - 1] * 1000:7.0f} ms")
+    finally:
+        shutil.rmtree(corpus, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""Fake Groq chat completions server for load tests.
+
+Speaks the OpenAI-compatible endpoint the Groq SDK uses, so the app can be
+pointed at it with GROQ_BASE_URL. Latency, random 429s and per-minute
+request/token limits (continuously replenished, like Groq's) are
+configurable, and every response carries x-ratelimit-* headers. Responses
+are shaped so the app's parsers (weaknesses, improvements, interview
+questions) accept them.
+
+    python scripts/fake_groq.py --port 8765 --latency-ms 400 --rate-429 0.05
+    GROQ_BASE_URL=http://127.0.0.1:8765 streamlit run app.py
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def fake_reply(prompt):
+    """A canned reply in whatever format the prompt asks for"""
+    if "[Type:" in prompt:
+        return "\n".join(f"[Type: {t}] What is a {t.lower()} question about your work number {i}?"
+                         for i, t in enumerate(["Basic", "Technical", "Experience", "Scenario", "Coding", "Behavioral"] * 3))
+    if "valid JSON" in prompt:
+        return json.dumps({"description": "Make achievements measurable",
+                           "specific": ["Quantify impact", "Lead with outcomes", "Trim filler"],
+                           "before_after": {"before": "Worked on APIs", "after": "Built APIs serving 2M requests/day"}})
+    if "Issue:" in prompt:
+        return "Issue: Limited evidence of this skill\nSolution 1: Add a project\nSolution 2: Quantify impact\nSolution 3: Add a certification"
+    if prompt.startswith("Extract") or "Python list" in prompt:
+        return '["Python", "SQL", "Docker", "AWS"]'
+    return "The candidate has five years of backend experience. " * 8
+
+
+class FakeGroq:
+    """Latency, error injection and rate limit state shared by all request threads"""
+
+    def __init__(self, latency_ms=300, jitter_ms=100, rate_429=0.0, rpm=None, tpm=None, seed=None):
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.rate_429 = rate_429
+        self.rpm = rpm
+        self.tpm = tpm
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        # Like Groq, budgets replenish continuously: limit/60 per second up to the limit
+        self.levels = {"requests": float(rpm or 0), "tokens": float(tpm or 0)}
+        self.refilled_at = time.time()
+        self.stats = {"requests": 0, "ok": 0, "rate_limited": 0}
+
+    def admit(self, tokens):
+        """Return (allowed, headers) for a request, updating the rate limit buckets"""
+        now = time.time()
+        with self.lock:
+            self.stats["requests"] += 1
+            limits = {"requests": self.rpm, "tokens": self.tpm}
+            for name, limit in limits.items():
+                if limit:
+                    self.levels[name] = min(limit, self.levels[name] + (now - self.refilled_at) * limit / 60)
+            self.refilled_at = now
+            costs = {"requests": 1, "tokens": tokens}
+            short = {name: costs[name] - self.levels[name] for name, limit in limits.items()
+                     if limit and self.levels[name] < costs[name]}
+            over = bool(short) or self.random.random() < self.rate_429
+            if over:
+                self.stats["rate_limited"] += 1
+            else:
+                for name, limit in limits.items():
+                    if limit:
+                        self.levels[name] -= costs[name]
+            headers = {}
+            for name, limit in limits.items():
+                limit = limit or (1000000 if name == "requests" else 100000000)
+                level = self.levels[name] if limits[name] else limit
+                headers[f"x-ratelimit-limit-{name}"] = str(limit)
+                headers[f"x-ratelimit-remaining-{name}"] = str(max(0, int(level)))
+                headers[f"x-ratelimit-reset-{name}"] = f"{(limit - level) * 60 / limit:.2f}s"
+            if over:
+                wait = max([deficit * 60 / limits[name] for name, deficit in short.items()] or [0.2])
+                headers["retry-after"] = f"{max(wait, 0.2):.2f}"
+            return not over, headers
+
+    def delay(self):
+        with self.lock:
+            jitter = self.random.uniform(-self.jitter, self.jitter)
+        time.sleep(max(0.0, self.latency + jitter))
+
+
+def make_handler(fake):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status, body, headers):
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            prompt = "\n".join(m.get("content", "") for m in request.get("messages", []))
+            prompt_tokens = len(prompt) // 4 + 1
+            allowed, headers = fake.admit(prompt_tokens + request.get("max_tokens", 256))
+            if not allowed:
+                self._send(429, {"error": {"message": "Rate limit reached (fake)", "type": "requests",
+                                           "code": "rate_limit_exceeded"}}, headers)
+                return
+            fake.delay()
+            content = fake_reply(prompt)
+            completion_tokens = len(content) // 4 + 1
+            with fake.lock:
+                fake.stats["ok"] += 1
+            self._send(200, {
+                "id": f"chatcmpl-fake-{time.time_ns()}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": request.get("model", "fake"),
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content},
+                             "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                          "total_tokens": prompt_tokens + completion_tokens},
+            }, headers)
+
+    return Handler
+
+
+def start_server(fake, host="127.0.0.1", port=0):
+    """Serve fake on a background thread; returns (server, base_url)"""
+    server = ThreadingHTTPServer((host, port), make_handler(fake))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def add_arguments(parser):
+    parser.add_argument("--latency-ms", type=float, default=300, help="mean response latency")
+    parser.add_argument("--jitter-ms", type=float, default=100, help="uniform latency jitter (+/-)")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="probability of a random 429")
+    parser.add_argument("--rpm", type=int, default=None, help="requests per minute before 429s")
+    parser.add_argument("--tpm", type=int, default=None, help="tokens per minute before 429s")
+
+
+def from_arguments(args, seed=None):
+    return FakeGroq(args.latency_ms, args.jitter_ms, args.rate_429, args.rpm, args.tpm, seed=seed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_arguments(parser)
+    args = parser.parse_args()
+    server, url = start_server(from_arguments(args), args.host, args.port)
+    print(f"Fake Groq listening on {url} (set GROQ_BASE_URL={url})")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
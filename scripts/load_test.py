@@ -0,0 +1,205 @@
+"""Load test: N simulated recruiter sessions against a fake Groq server.
+
+Each simulated user loops for --duration seconds: analyse a resume from the
+corpus for a random role (switching roles re-scores a known resume), ask a
+few Q&A questions and sometimes request a rewrite. The agent talks to
+scripts/fake_groq.py over HTTP through the real Groq SDK, so retries,
+connection handling and 429s behave as in production. Reports throughput,
+latency percentiles and error rates per operation, per-task LLM latency and
+token counts, plus process RSS over time, for capacity planning.
+
+    python scripts/load_test.py --users 8 --duration 60 --latency-ms 400 --rate-429 0.05
+    python scripts/load_test.py --users 16 --corpus 'resumes/*.pdf' --json load.json
+"""
+import argparse
+import glob
+import json
+import os
+import random
+import resource
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import fake_groq  # noqa: E402  (sibling script)
+from bench_workers import SKILLS, make_resume_pdfs  # noqa: E402
+
+ROLES = {
+    "Backend Engineer": ["Python", "SQL", "Docker", "Kubernetes", "AWS", "Redis", "Kafka", "CI/CD"],
+    "Data Engineer": ["Python", "SQL", "Spark", "Airflow", "Kafka", "AWS", "Terraform"],
+    "Frontend Engineer": ["React", "TypeScript", "CI/CD", "Docker"],
+}
+
+QUESTIONS = [
+    "What is the candidate's most recent role?",
+    "How many years of experience does the candidate have with Python?",
+    "What projects has the candidate worked on?",
+    "Does the candidate have experience with cloud technologies?",
+    "Has the candidate managed teams before?",
+]
+
+
+def rss_mb():
+    """Current resident set size of this process in MB"""
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # Peak rather than current RSS where /proc is unavailable (kB on Linux, bytes on macOS)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class Recorder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = {}  # op -> [(latency, ok)]
+        self.rss = []
+
+    def record(self, op, latency, ok):
+        with self.lock:
+            self.samples.setdefault(op, []).append((latency, ok))
+
+
+def simulated_user(user_id, corpus, recorder, stop_at, think, rewrite_rate, seed):
+    from agents import ResumeAnalysisAgent
+    from candidate_store import CandidateStore
+
+    llm_errors = threading.local()
+
+    class LoadTestAgent(ResumeAnalysisAgent):
+        def _groq_completion(self, prompt, model, *args, **kwargs):
+            response = super()._groq_completion(prompt, model, *args, **kwargs)
+            if response.startswith("ERROR:"):
+                llm_errors.count = getattr(llm_errors, "count", 0) + 1
+            return response
+
+    rng = random.Random(seed)
+    agent = LoadTestAgent("load-test-key", store=CandidateStore())
+
+    def timed(op, func, *args, **kwargs):
+        llm_errors.count = 0
+        began = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+            ok = llm_errors.count == 0 and not (isinstance(result, str) and result.startswith("ERROR:"))
+        except Exception as e:
+            print(f"user {user_id}: {op} raised {e}")
+            ok = False
+        recorder.record(op, time.perf_counter() - began, ok)
+
+    while time.time() < stop_at:
+        role = rng.choice(list(ROLES))
+        timed("analyze", agent.analyze_resume, rng.choice(corpus), role_requirements=ROLES[role], role_name=role)
+        for question in rng.sample(QUESTIONS, 2):
+            timed("ask", agent.ask_question, question)
+        if rng.random() < rewrite_rate:
+            timed("rewrite", agent.get_improved_resume, role, ", ".join(ROLES[role][:3]))
+        time.sleep(rng.uniform(0, think))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=8, help="concurrent simulated sessions")
+    parser.add_argument("--duration", type=float, default=60, help="seconds to run")
+    parser.add_argument("--corpus", default=None, help="glob of resume files (default: synthetic PDFs)")
+    parser.add_argument("--resumes", type=int, default=20, help="synthetic resumes when no corpus is given")
+    parser.add_argument("--think-ms", type=float, default=500, help="max pause between a user's iterations")
+    parser.add_argument("--rewrite-rate", type=float, default=0.3, help="share of iterations requesting a rewrite")
+    parser.add_argument("--rss-interval", type=float, default=1.0, help="seconds between RSS samples")
+    parser.add_argument("--with-llm-cache", action="store_true", help="keep the shared LLM response cache on")
+    parser.add_argument("--json", default=None, help="write raw results to this file")
+    parser.add_argument("--seed", type=int, default=1)
+    fake_groq.add_arguments(parser)
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix="maiknit-load-")
+    os.environ["MAIKNIT_DATA_DIR"] = data_dir
+    if not args.with_llm_cache:
+        # Otherwise repeated prompts never reach the fake server
+        os.environ["MAIKNIT_LLM_CACHE"] = "0"
+    if args.rpm:
+        # Response headers only carry the token limit per minute, as with Groq
+        os.environ["MAIKNIT_GROQ_RPM"] = str(args.rpm)
+    fake = fake_groq.from_arguments(args, seed=args.seed)
+    server, url = fake_groq.start_server(fake)
+    os.environ["GROQ_BASE_URL"] = url
+
+    try:
+        if args.corpus:
+            corpus = sorted(glob.glob(args.corpus))
+            if not corpus:
+                parser.error(f"no files match {args.corpus}")
+        else:
+            corpus = make_resume_pdfs(data_dir, args.resumes)
+
+        recorder = Recorder()
+        started = time.time()
+        stop_at = started + args.duration
+        users = [threading.Thread(target=simulated_user,
+                                  args=(n, corpus, recorder, stop_at, args.think_ms / 1000,
+                                        args.rewrite_rate, args.seed + n))
+                 for n in range(args.users)]
+        for user in users:
+            user.start()
+        while any(user.is_alive() for user in users):
+            recorder.rss.append((round(time.time() - started, 1), round(rss_mb(), 1)))
+            time.sleep(args.rss_interval)
+        elapsed = time.time() - started
+    finally:
+        server.shutdown()
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    print(f"{args.users} users, {elapsed:.1f} s, {len(corpus)} resumes, fake Groq "
+          f"{args.latency_ms:.0f}±{args.jitter_ms:.0f} ms, 429 rate {args.rate_429:.0%}"
+          + (f", {args.rpm} rpm" if args.rpm else "") + (f", {args.tpm} tpm" if args.tpm else ""))
+    print(f"{'operation':10s} {'count':>6s} {'ops/s':>7s} {'p50 ms':>8s} {'p90 ms':>8s} {'p99 ms':>8s} "
+          f"{'max ms':>8s} {'errors':>7s}")
+    report = {"users": args.users, "elapsed": elapsed, "operations": {}, "rss_mb": recorder.rss,
+              "fake_groq": fake.stats}
+    for op, samples in sorted(recorder.samples.items()):
+        latencies = [latency * 1000 for latency, _ in samples]
+        errors = sum(1 for _, ok in samples if not ok)
+        row = {"count": len(samples), "ops_per_s": len(samples) / elapsed,
+               "p50_ms": statistics.median(latencies), "p90_ms": percentile(latencies, 0.90),
+               "p99_ms": percentile(latencies, 0.99), "max_ms": max(latencies),
+               "error_rate": errors / len(samples)}
+        report["operations"][op] = row
+        print(f"{op:10s} {row['count']:6d} {row['ops_per_s']:7.2f} {row['p50_ms']:8.0f} {row['p90_ms']:8.0f} "
+              f"{row['p99_ms']:8.0f} {row['max_ms']:8.0f} {row['error_rate']:7.1%}")
+    print(f"fake Groq: {fake.stats['requests']} requests, {fake.stats['rate_limited']} answered 429")
+    from llm import shared_llm_stats
+    report["llm_tasks"] = shared_llm_stats().summary()
+    print(f"{'LLM task':12s} {'calls':>6s} {'errors':>7s} {'wait ms':>8s} {'p50 ms':>8s} {'p95 ms':>8s} "
+          f"{'prompt tok':>11s} {'output tok':>11s}  models")
+    for task, row in report["llm_tasks"].items():
+        print(f"{task:12s} {row['calls']:6d} {row['errors']:7d} {row['avg_wait_ms']:8.0f} {row['p50_ms']:8.0f} "
+              f"{row['p95_ms']:8.0f} "
+              f"{row['avg_prompt_tokens']:11.0f} {row['avg_completion_tokens']:11.0f}  "
+              + ", ".join(f"{model} x{count}" for model, count in row["models"].items()))
+    rss_values = [mb for _, mb in recorder.rss]
+    if rss_values:
+        step = max(1, len(recorder.rss) // 10)
+        print(f"RSS MB: start {rss_values[0]:.0f}  peak {max(rss_values):.0f}  end {rss_values[-1]:.0f}   "
+              + "  ".join(f"{t:.0f}s:{mb:.0f}" for t, mb in recorder.rss[::step]))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+#!/usr/bin/env bash
+# Start MAIKNIT_WORKERS Streamlit processes on consecutive ports, all sharing
+# one data directory (candidate store, extracted-text cache, LLM cache).
+# Put ngnix/app_workers.conf in front of them for load balancing.
+set -e
+
+WORKERS=${MAIKNIT_WORKERS:-1}
+BASE_PORT=${MAIKNIT_BASE_PORT:-8501}
+export MAIKNIT_DATA_DIR=${MAIKNIT_DATA_DIR:-$(pwd)/data}
+mkdir -p "$MAIKNIT_DATA_DIR"
+
+if [ "$WORKERS" -gt 1 ]; then
+    # Identical in-flight LLM prompts are coalesced across workers, not just within one
+    export MAIKNIT_LLM_LEASE_DB=${MAIKNIT_LLM_LEASE_DB:-$MAIKNIT_DATA_DIR/llm_leases.db}
+fi
+
+# However the script ends (a worker exited, a failed command under set -e, or a
+# stop signal), take every worker down with it; TERM is ignored here so that
+# kill 0 does not also cut short our own exit status
+trap 'trap "" TERM; kill 0' EXIT
+trap 'exit 143' TERM INT
+
+for i in $(seq 0 $((WORKERS - 1))); do
+    echo "Starting worker $((i + 1))/$WORKERS on port $((BASE_PORT + i))"
+    streamlit run app.py --server.port=$((BASE_PORT + i)) --server.address=0.0.0.0 --server.headless=true &
+done
+
+# If any worker exits, stop the rest (in the EXIT trap) with its status, so the
+# container restart policy takes over
+status=0
+wait -n || status=$?
+exit $status
@@ -0,0 +1,107 @@
+import os
+import threading
+import time
+import weakref
+
+from agents import remove_files
+from config import data_path
+
+
+class _Session:
+    def __init__(self, agent):
+        self.agent_ref = weakref.ref(agent)
+        self.last_seen = time.time()
+        self.released = False
+
+
+class SessionResourceManager:
+    """Keeps per-session agent memory bounded for the whole process.
+
+    Every rerun touches the session's agent. A periodic sweep releases
+    sessions idle for longer than idle_seconds, and then the least recently
+    used sessions while the total footprint is above max_bytes. Releasing
+    drops rebuildable objects (vector stores, embeddings) and spills raw
+    text to disk. Everything comes back lazily on the next access.
+
+    Agents are tracked by weak reference. When Streamlit drops a closed
+    session, its temp and spill files are deleted straight away instead of
+    at process exit.
+    """
+
+    def __init__(self, idle_seconds=600, max_bytes=256 * 1024 * 1024, spill_dir=None, sweep_interval=30):
+        self.idle_seconds = idle_seconds
+        self.max_bytes = max_bytes
+        self.spill_dir = spill_dir or data_path("spill")
+        self.sweep_interval = sweep_interval
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._last_sweep = 0.0
+        os.makedirs(self.spill_dir, exist_ok=True)
+
+    def touch(self, token, agent):
+        """Record activity for a session and (re)register its agent"""
+        with self._lock:
+            session = self._sessions.get(token)
+            if session is None or session.agent_ref() is not agent:
+                session = self._sessions[token] = _Session(agent)
+                # Runs when the agent is garbage collected, i.e. the session has ended
+                weakref.finalize(agent, remove_files, agent.owned_files)
+            session.last_seen = time.time()
+            session.released = False
+
+    def footprint(self):
+        """{token: approximate bytes} for live sessions"""
+        with self._lock:
+            sessions = list(self._sessions.items())
+        sizes = {}
+        for token, session in sessions:
+            agent = session.agent_ref()
+            if agent is not None:
+                sizes[token] = agent.memory_footprint()
+        return sizes
+
+    def sweep(self, current_token=None, force=False):
+        """Release idle sessions, then least recently used ones while over max_bytes; returns bytes freed"""
+        now = time.time()
+        with self._lock:
+            if not force and now - self._last_sweep < self.sweep_interval:
+                return 0
+            self._last_sweep = now
+            # Forget sessions whose agent is gone
+            for token in [t for t, s in self._sessions.items() if s.agent_ref() is None]:
+                del self._sessions[token]
+            candidates = sorted(
+                ((s.last_seen, token, s) for token, s in self._sessions.items() if token != current_token),
+                key=lambda item: item[0]
+            )
+
+        freed = 0
+        sizes = self.footprint()
+        total = sum(sizes.values())
+        for last_seen, token, session in candidates:
+            if session.released:
+                continue
+            idle = now - last_seen > self.idle_seconds
+            if not idle and total <= self.max_bytes:
+                # Remaining sessions are more recent than this one
+                break
+            agent = session.agent_ref()
+            if agent is None:
+                continue
+            released = agent.release_memory(self.spill_dir)
+            if released is None:
+                # Busy with a background job; retried on the next sweep
+                continue
+            session.released = True
+            freed += released
+            total -= released
+        return freed
+
+    def cleanup_all(self):
+        """Remove temp and spill files of every live session (at process exit)"""
+        with self._lock:
+            sessions = list(self._sessions.values())
+        for session in sessions:
+            agent = session.agent_ref()
+            if agent is not None:
+                agent.cleanup()
@@ -0,0 +1,136 @@
+import os
+import string
+
+from roles import ROLE_REQUIREMENTS
+
+# Aliases and skills beyond ROLE_REQUIREMENTS; MAIKNIT_SKILL_VOCAB names an extra file
+VOCAB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "skills_vocab.txt")
+
+# A skill only matches when not preceded or followed by one of these
+WORD_CHARS = frozenset(string.ascii_letters + string.digits + "+#&")
+
+# ASCII-only lowering keeps offsets in the lowered text equal to the original's
+_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+# Trie key under which a node lists the terms ending there
+_END = ""
+
+
+def load_vocabulary(path):
+    """[(skill, [aliases])] from a vocabulary file: one "Skill = alias, alias" per line"""
+    vocabulary = []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                skill, _, aliases = line.partition("=")
+                vocabulary.append((skill.strip(), [a.strip() for a in aliases.split(",") if a.strip()]))
+    except OSError as e:
+        print(f"Error reading skill vocabulary {path}: {e}")
+    return vocabulary
+
+
+class SkillMatcher:
+    """Finds known skills and their aliases in text with one pass over a character trie.
+
+    Matching ignores case, except for terms written in capitals or of at
+    most two characters ("REST", "R"), which must match exactly.
+    """
+
+    def __init__(self, vocabulary=()):
+        self.trie = {}
+        self.names = {}  # lower-case skill or alias -> skill name
+        for role_skills in ROLE_REQUIREMENTS.values():
+            for skill in role_skills:
+                self.add(skill)
+        for skill, aliases in vocabulary:
+            self.add(skill, aliases)
+
+    def add(self, skill, aliases=()):
+        # The first spelling seen wins, so role names keep their ROLE_REQUIREMENTS form
+        skill = self.names.get(" ".join(skill.split()).translate(_LOWER), skill)
+        for term in (skill, *aliases):
+            term = " ".join(term.split())
+            key = term.translate(_LOWER)
+            exact = term if len(term) <= 2 or term.isupper() else None
+            node = self.trie
+            for char in key:
+                node = node.setdefault(char, {})
+            entries = node.setdefault(_END, [])
+            if (exact, skill) not in entries:
+                entries.append((exact, skill))
+            self.names.setdefault(key, skill)
+
+    def canonical(self, name):
+        """The dictionary spelling of a skill or alias, or None if it is unknown"""
+        return self.names.get(" ".join(name.split()).translate(_LOWER))
+
+    def find(self, text):
+        """Known skills mentioned in text, in order of first appearance"""
+        text = " ".join(text.split())
+        lower = text.translate(_LOWER)
+        found = {}
+        n = len(lower)
+        i = 0
+        while i < n:
+            if lower[i] not in self.trie or (i and lower[i - 1] in WORD_CHARS):
+                i += 1
+                continue
+            # Walk the trie as far as the text allows, keeping the longest term that ends on a boundary
+            node = self.trie
+            j = i
+            match = None
+            while j < n and lower[j] in node:
+                node = node[lower[j]]
+                j += 1
+                if _END in node and (j == n or lower[j] not in WORD_CHARS):
+                    for exact, skill in node[_END]:
+                        if exact is None or text[i:j] == exact:
+                            match = (j, skill)
+                            break
+            if match:
+                found.setdefault(match[1], None)
+                i = match[0]
+            else:
+                i += 1
+        return list(found)
+
+
+_matcher = None
+
+
+def skill_matcher():
+    """The process-wide matcher, compiled on first use"""
+    global _matcher
+    if _matcher is None:
+        vocabulary = load_vocabulary(VOCAB_PATH)
+        extra = os.environ.get("MAIKNIT_SKILL_VOCAB")
+        if extra:
+            vocabulary += load_vocabulary(extra)
+        _matcher = SkillMatcher(vocabulary)
+    return _matcher
+
+
+def extract_skills(jd_text):
+    """Skills mentioned in a job description, found locally without an LLM call"""
+    return skill_matcher().find(jd_text or "")
+
+
+def merge_skills(local_skills, llm_skills):
+    """Dictionary matches first, then skills only the LLM found, without duplicates.
+
+    LLM names that are known skills or aliases are mapped to the dictionary
+    spelling, so "K8s" and "Kubernetes" count once.
+    """
+    matcher = skill_matcher()
+    merged = {}
+    for skill in local_skills:
+        merged.setdefault(skill.lower(), skill)
+    for skill in llm_skills:
+        if not isinstance(skill, str) or not skill.strip():
+            continue
+        skill = matcher.canonical(skill) or skill.strip()
+        merged.setdefault(skill.lower(), skill)
+    return list(merged.values())
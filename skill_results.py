@@ -0,0 +1,189 @@
+"""Columnar skill results: one shared skill vocabulary per role, one array row per candidate.
+
+A candidate's result is its mention count per vocabulary skill (uint16,
+saturating at 65535) and the uint8 scores derived from it. Strengths,
+missing skills and the reasoning strings are derived from the counts on
+demand, so nothing per skill is stored as text.
+analysis_from_counts() converts a row back to the analysis dict the app
+and the candidate store use.
+"""
+import os
+import threading
+from functools import lru_cache
+
+import numpy as np
+
+# Mention count thresholds and the score each earns, highest first
+SCORE_STEPS = ((5, 8, "strong"), (3, 6, "moderate"), (2, 4, "basic"))
+MAX_COUNT = np.iinfo(np.uint16).max
+# Scores up to this are missing skills; from STRENGTH_SCORE up, strengths
+MISSING_SCORE = 4
+STRENGTH_SCORE = 7
+
+
+class SkillVocabulary:
+    """The skills of one role in a fixed order, with the forms matching needs precomputed"""
+
+    def __init__(self, skills):
+        self.skills = tuple(skills)
+        self.lower = tuple(skill.lower() for skill in self.skills)
+        self.compact = tuple(skill.replace(" ", "") for skill in self.lower)
+
+    def __len__(self):
+        return len(self.skills)
+
+    def count_mentions(self, resume_text):
+        """uint16 mention count per skill; a skill found only with spaces removed counts once"""
+        resume_lower = resume_text.lower()
+        resume_compact = resume_lower.replace(" ", "")
+        counts = []
+        for lower, compact in zip(self.lower, self.compact):
+            count = resume_lower.count(lower)
+            if not count and compact in resume_compact:
+                count = 1
+            counts.append(min(count, MAX_COUNT))
+        return np.array(counts, dtype=np.uint16)
+
+
+# Vocabularies kept per process (roles plus recent custom job descriptions)
+MAX_VOCABULARIES = 256
+_vocabularies = {}
+_vocabularies_lock = threading.Lock()
+
+
+def vocabulary_for(skills):
+    """The shared vocabulary for a skill list, created once per process"""
+    key = tuple(skills)
+    with _vocabularies_lock:
+        vocabulary = _vocabularies.get(key)
+        if vocabulary is None:
+            if len(_vocabularies) >= MAX_VOCABULARIES:
+                # Custom job descriptions each add one; start over rather than grow without bound
+                _vocabularies.clear()
+            vocabulary = _vocabularies[key] = SkillVocabulary(key)
+        return vocabulary
+
+
+@lru_cache(maxsize=None)
+def score_for_count(count):
+    """Score (1-8) of a skill mentioned count times"""
+    for threshold, score, _ in SCORE_STEPS:
+        if count >= threshold:
+            return score
+    return 2 if count else 1
+
+
+def scores_from_counts(counts):
+    """uint8 scores (1-8) for an array of mention counts of any shape"""
+    counts = np.asarray(counts)
+    scores = np.where(counts > 0, 2, 1).astype(np.uint8)
+    for threshold, score, _ in reversed(SCORE_STEPS):
+        scores[counts >= threshold] = score
+    return scores
+
+
+@lru_cache(maxsize=None)
+def reasoning_for_count(count):
+    """The reasoning text shown for a skill mentioned count times (one shared string per count)"""
+    if count == 0:
+        return "Not mentioned in resume"
+    for threshold, _, level in SCORE_STEPS:
+        if count >= threshold:
+            return f"Mentioned {count} times - {level} experience"
+    return "Mentioned once - minimal evidence"
+
+
+def overall_score(scores):
+    """0-100 from a candidate's scores, or one per row of a 2-D array"""
+    scores = np.asarray(scores)
+    if scores.shape[-1] == 0:
+        return 0 if scores.ndim == 1 else np.zeros(scores.shape[0], dtype=np.uint8)
+    # Same float arithmetic as the per-skill dict scoring, so results match it exactly
+    overall = (scores.sum(axis=-1, dtype=np.int64) / (10 * scores.shape[-1]) * 100).astype(np.int64)
+    return int(min(100, overall)) if scores.ndim == 1 else np.minimum(overall, 100).astype(np.uint8)
+
+
+def analysis_from_counts(vocabulary, counts, cutoff_score):
+    """The analysis dict for one candidate's counts, as the UI and the candidate store expect it"""
+    counts = np.asarray(counts).tolist()
+    scores = [score_for_count(count) for count in counts]
+    overall = min(100, int((sum(scores) / (10 * len(scores))) * 100)) if scores else 0
+    skill_scores = {}
+    skill_reasoning = {}
+    missing_skills = []
+    for skill, count, score in zip(vocabulary.skills, counts, scores):
+        skill_scores[skill] = score
+        skill_reasoning[skill] = reasoning_for_count(count)
+        if score <= MISSING_SCORE:
+            missing_skills.append(skill)
+    selected = overall >= cutoff_score
+    return {
+        "overall_score": overall,
+        "skill_scores": skill_scores,
+        "skill_reasoning": skill_reasoning,
+        "selected": selected,
+        "reasoning": "Candidate evaluated based on resume content",
+        "missing_skills": missing_skills,
+        "strengths": [skill for skill, score in skill_scores.items() if score >= STRENGTH_SCORE],
+        "improvement_areas": missing_skills if not selected else [],
+    }
+
+
+class SkillResults:
+    """Skill results of many candidates for one vocabulary: a (candidates x skills) count matrix.
+
+    Rows are added as candidates are screened and the matrix grows in
+    blocks. save() atomically writes an .npz file holding the vocabulary,
+    the resume hashes and the count and score matrices; load() reads it back.
+    """
+
+    def __init__(self, vocabulary, capacity=1024):
+        self.vocabulary = vocabulary
+        self.resume_hashes = []
+        self._counts = np.zeros((capacity, len(vocabulary)), dtype=np.uint16)
+
+    def __len__(self):
+        return len(self.resume_hashes)
+
+    @property
+    def counts(self):
+        return self._counts[:len(self)]
+
+    @property
+    def scores(self):
+        return scores_from_counts(self.counts)
+
+    def add(self, resume_hash, counts):
+        """Append one candidate's counts; returns its row number"""
+        row = len(self)
+        if row == self._counts.shape[0]:
+            grown = np.zeros((max(1024, row * 2), len(self.vocabulary)), dtype=np.uint16)
+            grown[:row] = self._counts[:row]
+            self._counts = grown
+        self._counts[row] = counts
+        self.resume_hashes.append(resume_hash)
+        return row
+
+    def overall_scores(self):
+        return overall_score(self.scores)
+
+    def to_dict(self, row, cutoff_score=75):
+        """The analysis dict for one row"""
+        return analysis_from_counts(self.vocabulary, self.counts[row], cutoff_score)
+
+    def save(self, path):
+        # Written to a temp file and swapped in, so a crash mid-save keeps the previous file
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, skills=np.array(self.vocabulary.skills, dtype=str),
+                     resume_hashes=np.array(self.resume_hashes, dtype="S64"),
+                     counts=self.counts, scores=self.scores)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            results = cls(vocabulary_for(data["skills"].tolist()), capacity=max(1024, len(data["counts"])))
+            for resume_hash, counts in zip(data["resume_hashes"].tolist(), data["counts"]):
+                results.add(resume_hash.decode("ascii"), counts)
+        return results
@@ -0,0 +1,7 @@
+import os
+import sys
+import tempfile
+
+# The modules live at the repository root; keep test runs out of the real data directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("MAIKNIT_DATA_DIR", tempfile.mkdtemp(prefix="maiknit-tests-"))
@@ -0,0 +1,74 @@
+import re
+
+import pytest
+
+from artifacts import ArtifactCache, markdown_to_text, render_artifact, text_to_pdf
+from ingestion import read_document
+
+REPORT = """# Resume Analysis Report
+
+**Overall score:** 82 (selected)
+
+## Missing skills
+- *Kubernetes* (score 2)
+- Terraform (f(x) = a \\ b)
+"""
+
+
+def test_markdown_is_stripped_for_plain_text():
+    assert markdown_to_text(REPORT) == """Resume Analysis Report
+
+Overall score: 82 (selected)
+
+Missing skills
+- Kubernetes (score 2)
+- Terraform (f(x) = a \\ b)
+"""
+    assert render_artifact(REPORT, "md") == REPORT.encode("utf-8")
+    with pytest.raises(ValueError):
+        render_artifact(REPORT, "docx")
+
+
+def test_pdf_is_well_formed_and_readable():
+    pdf = text_to_pdf(markdown_to_text(REPORT), title="Report (Jane)")
+    assert pdf.startswith(b"%PDF-1.4") and pdf.endswith(b"%%EOF\n")
+    # Every xref entry points at its object
+    xref = int(re.search(rb"startxref\n(\d+)", pdf).group(1))
+    entries = re.findall(rb"(\d{10}) 00000 n", pdf[xref:])
+    for number, offset in enumerate(entries, start=1):
+        assert pdf[int(offset):].startswith(b"%d 0 obj" % number)
+    text = read_document(pdf, "report.pdf")
+    assert "Overall score: 82 (selected)" in text
+    assert "Terraform (f(x) = a \\ b)" in text
+
+
+def test_long_text_is_wrapped_and_paginated():
+    text = "\n".join(f"Line {i} " + "word " * 40 for i in range(60))
+    pdf = text_to_pdf(text)
+    # 60 paragraphs of ~3 wrapped lines at 49 lines per page
+    assert b"/Count 4" in pdf
+    assert "Line 59" in read_document(pdf, "long.pdf")
+    assert b"/Count 1" in text_to_pdf("")
+
+
+def test_cache_renders_once_and_stays_within_its_budget():
+    cache = ArtifactCache(max_bytes=2500)
+    builds = []
+
+    def build(name):
+        def markdown():
+            builds.append(name)
+            return f"# {name}\n" + "x" * 1000
+        return markdown
+
+    first = cache.get_or_build("a", "txt", build("a"))
+    assert cache.get_or_build("a", "txt", build("a")) is first
+    assert cache.get_or_build("a", "md", build("a")) != first
+    assert builds == ["a", "a"]
+    # A third ~1 KB artefact evicts the least recently used one
+    cache.get_or_build("a", "txt", build("a"))
+    cache.get_or_build("b", "txt", build("b"))
+    assert builds == ["a", "a", "b"]
+    cache.get_or_build("a", "md", build("a"))
+    assert builds == ["a", "a", "b", "a"]
+    assert cache._size <= cache.max_bytes
@@ -0,0 +1,176 @@
+import json
+import os
+import random
+
+import pytest
+
+pytest.importorskip("faiss")
+
+import candidate_index
+from candidate_index import CandidatePoolIndex, chunk_text, embed_texts
+from candidate_store import CandidateStore, content_hash
+
+WORDS = "python java react docker terraform sql pandas spark airflow excel sales marketing figma".split()
+
+
+def make_resumes(count, seed=7):
+    rng = random.Random(seed)
+    resumes = []
+    for i in range(count):
+        lines = [" ".join(rng.choice(WORDS) for _ in range(8)) for _ in range(6)]
+        if i % 10 == 3:
+            lines.append("Built real-time streaming pipelines with Kafka and Flink")
+        resumes.append(f"Candidate {i}\n" + "\n".join(lines))
+    return resumes
+
+
+def add_resumes(store, index, resumes):
+    for i, text in enumerate(resumes):
+        resume_hash = content_hash(text)
+        store.save_resume(resume_hash, text, f"r{i}.txt")
+        index.add_resume(resume_hash, text)
+
+
+def ranking(index, query, k=8):
+    return [(c["resume_hash"], round(c["score"], 5)) for c in index.search(query, k=k)]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return CandidateStore(str(tmp_path / "candidates.db"))
+
+
+def test_embeddings_are_normalised_and_stable():
+    vectors = embed_texts(["Python and Kafka", "", "Python and Kafka"])
+    assert vectors.shape == (3, 512)
+    assert abs(float((vectors[0] ** 2).sum()) - 1) < 1e-5
+    assert not vectors[1].any()
+    assert (vectors[0] == vectors[2]).all()
+
+
+def test_chunk_text_keeps_lines_whole():
+    text = "\n".join(f"line {i} " + "x" * 40 for i in range(30))
+    chunks = chunk_text(text, chunk_size=200)
+    assert all(len(chunk) <= 200 for chunk in chunks)
+    assert "\n".join(chunks).split("\n") == text.split("\n")
+
+
+def test_delta_and_compaction_match_a_full_rebuild(store, tmp_path):
+    resumes = make_resumes(60)
+    incremental = CandidatePoolIndex(store, index_path=str(tmp_path / "inc.index"), compact_threshold=25)
+    add_resumes(store, incremental, resumes)
+    # Some chunks were compacted to disk, the rest are still in the delta
+    assert incremental._main is not None and incremental._delta.ntotal > 0
+
+    rebuilt = CandidatePoolIndex(store, index_path=str(tmp_path / "full.index"))
+    rebuilt.compact()
+    assert rebuilt._delta.ntotal == 0
+
+    chunk_count = sum(len(chunk_text(text)) for text in resumes)
+    assert incremental.size == rebuilt.size == chunk_count
+    for query in ("streaming pipelines with Kafka", "python docker", "sales marketing figma"):
+        assert ranking(incremental, query) == ranking(rebuilt, query)
+
+    incremental.compact()
+    assert incremental._delta.ntotal == 0
+    assert ranking(incremental, "streaming pipelines with Kafka") == ranking(rebuilt, "streaming pipelines with Kafka")
+
+
+def test_reopened_index_catches_up_on_new_chunks(store, tmp_path):
+    path = str(tmp_path / "pool.index")
+    resumes = make_resumes(30)
+    first = CandidatePoolIndex(store, index_path=path)
+    add_resumes(store, first, resumes[:20])
+    first.compact()
+    add_resumes(store, first, resumes[20:])
+
+    reopened = CandidatePoolIndex(store, index_path=path)
+    assert reopened.size == first.size == sum(len(chunk_text(text)) for text in resumes)
+    assert ranking(reopened, "Kafka streaming") == ranking(first, "Kafka streaming")
+
+
+def test_small_ivf_pool_folds_deltas_instead_of_rebuilding(store, tmp_path):
+    index = CandidatePoolIndex(store, index_path=str(tmp_path / "ivf.index"), index_type="ivf", nlist=2,
+                               compact_threshold=10)
+    full_scans = []
+    iter_chunks = store.iter_chunks
+
+    def counting_iter_chunks(after_id=0, **kwargs):
+        if after_id == 0:
+            full_scans.append(after_id)
+        return iter_chunks(after_id=after_id, **kwargs)
+
+    store.iter_chunks = counting_iter_chunks
+    resumes = make_resumes(100)
+    add_resumes(store, index, resumes[:15])
+    index.compact()
+    assert index._main_type == "flat"
+    scans = len(full_scans)
+
+    # Still below nlist * 39 = 78 chunks: compactions only add the delta
+    add_resumes(store, index, resumes[15:25])
+    index.compact()
+    assert index._main_type == "flat"
+    assert len(full_scans) == scans
+
+    # Crossing the threshold trains the IVF index once
+    add_resumes(store, index, resumes[25:])
+    index.compact()
+    assert index._main_type == "ivf"
+    assert len(full_scans) == scans + 1
+    assert index.size == sum(len(chunk_text(text)) for text in resumes)
+
+
+def test_rebuild_records_the_chunks_it_indexed(store, tmp_path):
+    index = CandidatePoolIndex(store, index_path=str(tmp_path / "pool.index"))
+    resumes = make_resumes(12)
+    add_resumes(store, index, resumes[:10])
+    iter_chunks = store.iter_chunks
+
+    def iter_chunks_with_concurrent_writer(after_id=0, **kwargs):
+        if after_id == 0:
+            # Stored by another process after compact() caught up, before the full scan
+            for text in resumes[10:]:
+                resume_hash = content_hash(text)
+                if not store.has_chunks(resume_hash):
+                    store.save_resume(resume_hash, text, "other.txt")
+                    store.add_chunks(resume_hash, chunk_text(text))
+        return iter_chunks(after_id=after_id, **kwargs)
+
+    store.iter_chunks = iter_chunks_with_concurrent_writer
+    index.compact()
+    assert index.size == sum(len(chunk_text(text)) for text in resumes)
+    assert CandidatePoolIndex(store, index_path=str(tmp_path / "pool.index")).size == index.size
+
+
+def test_index_and_meta_are_published_together(store, tmp_path, monkeypatch):
+    path = str(tmp_path / "pool.index")
+    resumes = make_resumes(30)
+    writer = CandidatePoolIndex(store, index_path=path)
+    add_resumes(store, writer, resumes[:10])
+    writer.compact()
+    first_generation = writer._main_path
+
+    reader = CandidatePoolIndex(store, index_path=path)
+    load_json = json.load
+    racing = [True]
+
+    def load_then_compact_elsewhere(f):
+        meta = load_json(f)
+        if racing:
+            # Another process compacts between our reading the meta and opening the index
+            racing.clear()
+            add_resumes(store, writer, resumes[10:])
+            writer.compact()
+        return meta
+
+    monkeypatch.setattr(candidate_index.json, "load", load_then_compact_elsewhere)
+    assert reader.size == writer.size == sum(len(chunk_text(text)) for text in resumes)
+    monkeypatch.undo()
+    # The reader retried with the new meta instead of pairing it with the old index
+    assert reader._main_path == writer._main_path != first_generation
+    assert reader._main.ntotal == writer._main.ntotal and reader._delta.ntotal == 0
+    assert ranking(reader, "Kafka streaming") == ranking(writer, "Kafka streaming")
+    assert not os.path.exists(first_generation)
+    assert sorted(name for name in os.listdir(tmp_path) if name.startswith("pool")) == \
+        sorted(["pool.index.json", os.path.basename(writer._main_path)])
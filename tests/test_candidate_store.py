@@ -0,0 +1,78 @@
+import pytest
+
+from candidate_store import CandidateStore, content_hash, fts_query
+
+
+def analysis(score, skill_scores):
+    return {"overall_score": score, "skill_scores": skill_scores, "strengths": [], "missing_skills": []}
+
+
+@pytest.fixture
+def store(tmp_path):
+    return CandidateStore(str(tmp_path / "candidates.db"))
+
+
+def add_candidate(store, text, role, score, skill_scores, file_name="resume.pdf"):
+    resume_hash = content_hash(text)
+    store.save_resume(resume_hash, text, file_name)
+    return resume_hash, store.save_analysis(resume_hash, role, list(skill_scores), analysis(score, skill_scores))
+
+
+def test_analysis_round_trip(store):
+    resume_hash, candidate_id = add_candidate(store, "Jane Doe\nPython, Kubernetes", "DevOps Engineer", 82,
+                                              {"Python": 8, "Kubernetes": 6})
+
+    stored = store.get_analysis(resume_hash, "DevOps Engineer")
+    assert stored["id"] == candidate_id
+    assert stored["skills"] == ["Python", "Kubernetes"]
+    assert stored["analysis"] == analysis(82, {"Python": 8, "Kubernetes": 6})
+    assert store.get_resume_text(resume_hash) == "Jane Doe\nPython, Kubernetes"
+    assert store.get_candidate(candidate_id)["file_name"] == "resume.pdf"
+    assert store.get_analysis(resume_hash, "Data Engineer") is None
+
+
+def test_save_analysis_replaces_previous_result(store):
+    resume_hash, _ = add_candidate(store, "Jane Doe", "DevOps Engineer", 40, {"Python": 4})
+    _, candidate_id = add_candidate(store, "Jane Doe", "DevOps Engineer", 90, {"Python": 8})
+
+    assert store.count() == 1
+    assert store.get_analysis(resume_hash, "DevOps Engineer")["id"] == candidate_id
+    assert store.count(skills={"Python": 8}) == 1
+
+
+def test_search_filters_and_order(store):
+    add_candidate(store, "Ann\nKubernetes operators", "DevOps Engineer", 60, {"Kubernetes": 8, "Python": 2})
+    add_candidate(store, "Bob\nPython services", "DevOps Engineer", 90, {"Kubernetes": 4, "Python": 8})
+    add_candidate(store, "Cat\nSpark pipelines", "Data Engineer", 75, {"Spark": 8})
+
+    assert [c["overall_score"] for c in store.search()] == [90, 75, 60]
+    assert [c["overall_score"] for c in store.search(role="DevOps Engineer", limit=1, offset=1)] == [60]
+    assert [c["overall_score"] for c in store.search(skills={"kubernetes": 6})] == [60]
+    assert store.count(min_score=70) == 2
+    assert store.roles() == ["Data Engineer", "DevOps Engineer"]
+
+
+def test_full_text_search(store):
+    add_candidate(store, "Ann\nBuilt real-time streaming pipelines with Kafka", "Data Engineer", 70, {"Kafka": 8})
+    add_candidate(store, "Bob\nBatch ETL with Airflow", "Data Engineer", 80, {"Airflow": 8})
+
+    assert [c["file_name"] for c in store.search(text="streaming pipelines")] == ["resume.pdf"]
+    assert store.count(text="kafka") == 1
+    assert store.count(text="Airflow", min_score=75) == 1
+    assert store.count(text="Kafka Airflow") == 0
+    # Query syntax in user input is matched literally rather than parsed
+    assert store.count(text='"Kafka" OR') == 0
+
+
+def test_fts_query_quotes_words():
+    assert fts_query('C++ "senior" dev') == '"C++" """senior""" "dev"'
+
+
+def test_artifacts_and_extracted_text(store):
+    store.save_artifact("h", "qa:1", "first")
+    store.save_artifact("h", "qa:1", "second")
+    store.save_extracted_text("f", "text")
+
+    assert store.get_artifact("h", "qa:1") == "second"
+    assert store.get_artifact("h", "qa:2") is None
+    assert store.get_extracted_text("f") == "text"
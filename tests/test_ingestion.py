@@ -0,0 +1,108 @@
+import io
+import sys
+import time
+import zipfile
+
+import pytest
+
+import ingestion
+from ingestion import IngestionError, IngestionPool, detect_format, normalize_text, read_document
+
+_DOCX_PARAGRAPH = b"<w:p><w:r><w:t>Python Kafka Spark experience line</w:t></w:r></w:p>"
+
+
+def docx(paragraphs):
+    body = b"".join(paragraphs) if isinstance(paragraphs, list) else paragraphs
+    xml = (b'<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:body>'
+           + body + b"</w:body></w:document>")
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("word/document.xml", xml)
+    return buffer.getvalue()
+
+
+@pytest.fixture(scope="module")
+def big_docx():
+    # About 40 MB of XML: parsing it takes seconds and far more than 64 MB of memory
+    return docx(_DOCX_PARAGRAPH * 600000)
+
+
+def test_formats_are_detected_from_content():
+    assert detect_format(b"%PDF-1.4 ...", "resume.txt") == "pdf"
+    assert detect_format(docx([_DOCX_PARAGRAPH]), "resume.bin") == "docx"
+    assert detect_format(b"<!doctype html><p>Hi</p>", "resume.txt") == "html"
+    assert detect_format(b"<b>Jane</b>", "resume.htm") == "html"
+    assert detect_format(b"Jane Doe", "resume.pdf") == "txt"
+    assert detect_format(b"PK\x03\x04not a zip") is None
+    assert detect_format(b"\x00\x01binary") is None
+
+
+def test_documents_are_read_and_normalised():
+    bullet = b'<w:p><w:pPr><w:numPr/></w:pPr><w:r><w:t>Built APIs</w:t></w:r></w:p>'
+    assert read_document(docx([_DOCX_PARAGRAPH, bullet]), "a.docx") == \
+        "Python Kafka Spark experience line\n- Built APIs"
+    assert read_document(b"<html><ul><li>Python</li><li>SQL</li></ul><script>x</script></html>") == "- Python\n- SQL"
+    assert read_document("Café ﬁnance  team\r\n\n\n\nEnd".encode("utf-8")) == "Café finance team\n\nEnd"
+    assert normalize_text("  a  \n  b \n\n\n\nc ") == "a\nb\n\nc"
+
+
+def test_unreadable_documents_raise_ingestion_error():
+    with pytest.raises(IngestionError, match="unsupported"):
+        read_document(b"\x00\x01", "resume.bin")
+    with pytest.raises(IngestionError, match="could not read PDF"):
+        read_document(b"%PDF-1.4 broken", "resume.pdf")
+
+
+def test_in_process_read_times_out(monkeypatch):
+    def slow_reader(data):
+        time.sleep(5)
+
+    monkeypatch.setitem(ingestion.READERS, "txt", slow_reader)
+    began = time.perf_counter()
+    with pytest.raises(IngestionError, match="timed out"):
+        read_document(b"Jane Doe", "resume.txt", timeout=0.2)
+    assert time.perf_counter() - began < 2
+
+
+def test_in_process_memory_error_is_reported(monkeypatch):
+    def greedy_reader(data):
+        raise MemoryError
+
+    monkeypatch.setitem(ingestion.READERS, "txt", greedy_reader)
+    with pytest.raises(IngestionError, match="more memory than allowed"):
+        read_document(b"Jane Doe", "resume.txt")
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="memory limits use RLIMIT_AS on Linux")
+def test_pool_enforces_memory_limit_and_recovers(big_docx):
+    pool = IngestionPool(max_workers=1, timeout=30, memory_mb=64)
+    try:
+        with pytest.raises(IngestionError, match="memory"):
+            pool.read(big_docx, "big.docx")
+        assert pool.read(b"plain Python", "p.txt") == "plain Python"
+    finally:
+        pool.close()
+
+
+def test_pool_enforces_timeout_and_recovers(big_docx):
+    pool = IngestionPool(max_workers=1, timeout=0.3, memory_mb=4096)
+    try:
+        began = time.perf_counter()
+        with pytest.raises(IngestionError, match="timed out"):
+            pool.read(big_docx, "big.docx")
+        assert time.perf_counter() - began < pool.timeout + 5
+        assert pool.read(b"plain Python", "p.txt") == "plain Python"
+    finally:
+        pool.close()
+
+
+def test_read_many_reports_each_failure_separately():
+    pool = IngestionPool(max_workers=2, timeout=10, memory_mb=512)
+    try:
+        documents = [(b"Jane Doe", "a.txt"), (b"%PDF-1.4 broken", "b.pdf"), (b"<html><p>Bob</p></html>", "c.html")]
+        results = sorted(pool.read_many(documents))
+    finally:
+        pool.close()
+    assert results[0] == (0, "Jane Doe", None)
+    assert results[1][1] is None and "could not read PDF" in results[1][2]
+    assert results[2] == (2, "Bob", None)
@@ -0,0 +1,59 @@
+import pytest
+
+from agents import ResumeAnalysisAgent
+from question_bank import QuestionBank
+
+
+@pytest.fixture
+def agent():
+    agent = ResumeAnalysisAgent("test-key")
+    agent.resume_text = "Python and SQL developer"
+    agent.extracted_skills = ["Python", "SQL"]
+    agent.analysis_result = {"strengths": ["Python"], "missing_skills": []}
+    return agent
+
+
+def fake_generator(agent, per_type=None):
+    """Replace the LLM with one returning per_type[type] questions (default: as many as asked)"""
+    calls = []
+
+    def generate(counts, difficulty, exclude=()):
+        calls.append(dict(counts))
+        return [(q_type, f"Generated {q_type} question {i} ({len(calls)})")
+                for q_type, n in counts.items() for i in range((per_type or {}).get(q_type, n))]
+
+    agent.generate_personalized_questions = generate
+    return calls
+
+
+def test_quota_is_split_evenly_and_zero_quotas_are_not_requested(agent):
+    calls = fake_generator(agent)
+    questions = agent.generate_interview_questions(["Basic", "Technical", "Coding"], "Medium", 2)
+    assert [q_type for q_type, _ in questions] == ["Basic", "Technical"]
+    assert sorted(calls, key=str) == [{"Basic": 1}, {"Technical": 1}]
+
+    calls.clear()
+    questions = agent.generate_interview_questions(["Basic", "Technical"], "Medium", 5)
+    assert [q_type for q_type, _ in questions] == ["Basic"] * 3 + ["Technical"] * 2
+    assert sorted(calls, key=str) == [{"Basic": 3}, {"Technical": 2}]
+
+
+def test_banked_questions_leave_only_gaps_to_generate(agent, tmp_path):
+    bank = QuestionBank(str(tmp_path / "bank.db"))
+    bank.add("Python", "Basic", "Medium", [f"Banked Python question {i}?" for i in range(3)])
+    agent.question_bank = bank
+    calls = fake_generator(agent)
+    questions = agent.generate_interview_questions(["Basic", "Coding"], "Medium", 4)
+    assert len(questions) == 4
+    assert calls == [{"Coding": 2}]
+    assert sum(question.startswith("Banked") for _, question in questions) == 2
+
+
+def test_templates_top_up_until_the_count_is_met(agent):
+    # The model returns nothing, and there are only two skills to template on
+    calls = fake_generator(agent, per_type={"Behavioral": 0})
+    questions = agent.generate_interview_questions(["Behavioral"], "Hard", 7)
+    assert len(questions) == 7
+    assert calls == [{"Behavioral": 7}, {"Behavioral": 7}]
+    assert len({question for _, question in questions}) == 7
+    assert all("Python" in question or "SQL" in question for _, question in questions)
@@ -0,0 +1,92 @@
+import threading
+import time
+
+import pytest
+
+from jobs import DONE, FAILED, JobManager
+
+
+@pytest.fixture
+def manager():
+    return JobManager(max_workers=2, max_finished=3)
+
+
+def wait_for(manager, job_id, timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = manager.get(job_id)
+        if job.finished:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def test_identical_submissions_share_one_job(manager):
+    release = threading.Event()
+    calls = []
+
+    def work(value):
+        calls.append(value)
+        release.wait(5)
+        return value * 2
+
+    first = manager.submit("double", ["resume", 21], work, 21)
+    # In flight: the same inputs return the same job
+    assert manager.submit("double", ["resume", 21], work, 21) == first
+    assert manager.submit("double", ["resume", 22], work, 22) != first
+    release.set()
+    job = wait_for(manager, first)
+    assert (job.status, job.result, job.kind) == (DONE, 42, "double")
+    # Finished: reused unless the caller needs the side effects again
+    assert manager.submit("double", ["resume", 21], work, 21) == first
+    assert wait_for(manager, first) is job
+    assert manager.submit("double", ["resume", 21], work, 21, reuse_finished=False) == first
+    assert wait_for(manager, first) is not job
+    assert sorted(calls) == [21, 21, 22]
+
+
+def test_failed_jobs_are_reported_and_retried(manager):
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("rate limited")
+        return "ok"
+
+    job_id = manager.submit("flaky", [], flaky)
+    job = wait_for(manager, job_id)
+    assert (job.status, job.error, job.result) == (FAILED, "rate limited", None)
+    assert manager.submit("flaky", [], flaky) == job_id
+    assert wait_for(manager, job_id).result == "ok"
+    assert len(attempts) == 2
+
+
+def test_finished_jobs_are_kept_in_a_bounded_lru(manager):
+    ids = [manager.submit("square", [n], lambda n=n: n * n) for n in range(3)]
+    for job_id in ids:
+        wait_for(manager, job_id)
+    # Resubmitting job 0 marks it recently used, so job 1 is the oldest
+    assert manager.submit("square", [0], lambda: 0) == ids[0]
+    wait_for(manager, manager.submit("square", [3], lambda: 9))
+    assert manager.get(ids[1]) is None
+    assert manager.get(ids[0]).result == 0
+    assert manager.get(ids[2]).result == 4
+    assert manager.get("never submitted") is None
+
+
+def test_progress_is_published_while_the_job_runs(manager):
+    reported, release = threading.Event(), threading.Event()
+
+    def work(report_progress):
+        report_progress({"done": 1, "total": 2})
+        reported.set()
+        release.wait(5)
+        return "finished"
+
+    job_id = manager.submit("details", ["resume"], work, with_progress=True)
+    assert reported.wait(5)
+    job = manager.get(job_id)
+    assert not job.finished and job.progress == {"done": 1, "total": 2}
+    release.set()
+    assert wait_for(manager, job_id).result == "finished"
@@ -0,0 +1,194 @@
+import threading
+import time
+
+import pytest
+
+from agents import ResumeAnalysisAgent
+from llm import LLMCache, RateLimiter, SingleFlight, cacheable, parse_reset, route_for
+from llm_backends import Completion
+
+
+def run_in_threads(count, target):
+    results = [None] * count
+    threads = [threading.Thread(target=lambda i=i: results.__setitem__(i, target(i))) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+    return results
+
+
+def slow_call(calls, value, started=None, delay=0.3):
+    def func():
+        calls.append(value)
+        if started:
+            started.set()
+        time.sleep(delay)
+        return value
+    return func
+
+
+def test_single_flight_coalesces_concurrent_calls_in_process():
+    flight = SingleFlight()
+    calls = []
+    assert run_in_threads(8, lambda i: flight.do("key", slow_call(calls, f"answer {i}"))) == \
+        [calls[0]] * 8
+    assert len(calls) == 1
+    # Different keys and later calls run on their own
+    assert flight.do("other", lambda: "other") == "other"
+    assert flight.do("key", lambda: "again") == "again"
+
+
+def test_single_flight_shares_errors_with_waiters():
+    flight = SingleFlight()
+    started = threading.Event()
+
+    def failing():
+        started.set()
+        time.sleep(0.2)
+        raise RuntimeError("rate limited")
+
+    def call(i):
+        if i:
+            started.wait(5)
+        try:
+            return flight.do("key", failing if i == 0 else lambda: "ran")
+        except RuntimeError as e:
+            return str(e)
+
+    assert run_in_threads(3, call) == ["rate limited"] * 3
+
+
+def test_single_flight_coalesces_across_processes_through_the_lease(tmp_path):
+    lease_db = str(tmp_path / "leases.db")
+    # Each instance stands in for one worker process sharing the lease database
+    leader, follower = SingleFlight(lease_db, poll_interval=0.02), SingleFlight(lease_db, poll_interval=0.02)
+    calls = []
+    started = threading.Event()
+
+    def call(i):
+        if i == 0:
+            return leader.do("key", slow_call(calls, "leader", started))
+        started.wait(5)
+        return follower.do("key", slow_call(calls, "follower"))
+
+    assert run_in_threads(2, call) == ["leader", "leader"]
+    assert calls == ["leader"]
+    # The lease is released, so the next call runs again
+    assert follower.do("key", lambda: "fresh") == "fresh"
+
+
+def test_expired_lease_of_a_dead_worker_is_taken_over(tmp_path):
+    lease_db = str(tmp_path / "leases.db")
+    dead = SingleFlight(lease_db, lease_seconds=0.3)
+    # Acquired and never released, as by a worker killed mid-call
+    assert dead._acquire(dead._connect(), "key")[0]
+
+    live = SingleFlight(lease_db, lease_seconds=0.3, poll_interval=0.02)
+    began = time.perf_counter()
+    assert live.do("key", lambda: "recovered") == "recovered"
+    assert 0.2 < time.perf_counter() - began < 3
+    with pytest.raises(RuntimeError):
+        live.do("key", lambda: (_ for _ in ()).throw(RuntimeError("boom")))
+    # A failed call releases its lease without publishing a result
+    assert live.do("key", lambda: "after failure") == "after failure"
+
+
+def test_interactive_calls_go_before_queued_batch_calls():
+    # An empty request bucket that refills one request every 0.1 s; no reserve, so only priority orders them
+    limiter = RateLimiter(rpm=600, reserve=0)
+    limiter._levels["requests"] = 0.0
+    order = []
+
+    def batch():
+        limiter.acquire(0)
+        order.append("batch")
+
+    batch_thread = threading.Thread(target=batch)
+    batch_thread.start()
+    time.sleep(0.05)
+    limiter.acquire(0, interactive=True)
+    order.append("interactive")
+    batch_thread.join(10)
+    assert order == ["interactive", "batch"]
+
+
+def test_batch_calls_leave_the_reserve_to_interactive_ones():
+    limiter = RateLimiter(tpm=1000, reserve=0.2)
+    assert limiter.acquire(700) < 0.05
+    # 300 tokens left: a 200 token batch call would eat into the 200 token reserve
+    limiter.max_wait = 0.2
+    assert limiter.acquire(200) >= 0.2
+    limiter.max_wait = 120
+    assert limiter.acquire(100, interactive=True) < 0.05
+
+
+def test_headers_set_the_token_budget_but_not_the_request_rate():
+    limiter = RateLimiter(rpm=30)
+    limiter.update({"x-ratelimit-limit-requests": "14400", "x-ratelimit-remaining-requests": "14000",
+                    "x-ratelimit-limit-tokens": "6000", "x-ratelimit-remaining-tokens": "2500",
+                    "x-ratelimit-reset-tokens": "35s"})
+    snapshot = limiter.snapshot()
+    # The request headers count per day; the configured per-minute limit stays
+    assert snapshot["limits"] == {"requests": 30, "tokens": 6000}
+    assert snapshot["levels"]["requests"] > 29
+    assert 2500 <= snapshot["levels"]["tokens"] < 2510
+    assert snapshot["blocked_for"] == 0
+
+    unconfigured = RateLimiter()
+    unconfigured.update({"x-ratelimit-limit-requests": "14400", "x-ratelimit-remaining-requests": "14000"})
+    assert unconfigured.snapshot()["limits"]["requests"] is None
+
+
+def test_spent_budget_and_retry_after_pause_every_caller():
+    limiter = RateLimiter()
+    limiter.update({"x-ratelimit-remaining-requests": "0", "x-ratelimit-reset-requests": "2m59.56s"})
+    assert 170 < limiter.snapshot()["blocked_for"] <= 180
+    limiter = RateLimiter()
+    limiter.update({"retry-after": "0.3"})
+    began = time.perf_counter()
+    limiter.acquire(100, interactive=True)
+    assert 0.2 < time.perf_counter() - began < 2
+    assert parse_reset("350ms") == pytest.approx(0.35)
+    assert parse_reset("1h2m3s") == 3723
+    assert parse_reset("soon") is None
+
+
+def test_llm_cache_expires_entries_after_the_ttl(tmp_path):
+    path = str(tmp_path / "llm_cache.db")
+    cache = LLMCache(path, ttl=0.2)
+    cache.put("key", "response")
+    assert cache.get("key") == "response"
+    assert cache.get("missing") is None
+    time.sleep(0.3)
+    assert cache.get("key") is None
+    # Entries kept without a ttl; expired ones are dropped when a cache with a ttl opens
+    assert LLMCache(path).get("key") == "response"
+    LLMCache(path, ttl=0.2)
+    assert LLMCache(path).get("key") is None
+
+
+class CountingBackend:
+    name = "live"
+
+    def __init__(self):
+        self.prompts = []
+
+    def complete(self, prompt, model, route):
+        self.prompts.append(prompt)
+        return Completion(f"response {len(self.prompts)}")
+
+
+def test_only_deterministic_routes_use_the_persistent_cache(tmp_path):
+    assert cacheable(route_for("skills"))
+    assert not cacheable(route_for("qa"))
+    assert cacheable(dict(route_for("qa"), cache=True))
+
+    backend = CountingBackend()
+    agent = ResumeAnalysisAgent("test-key", llm_backend=backend, llm_cache=LLMCache(str(tmp_path / "cache.db")))
+    assert agent.call_groq_llm("List the skills", task="skills") == "response 1"
+    assert agent.call_groq_llm("List the skills", task="skills") == "response 1"
+    # Sampled answers (temperature > 0) reach the model every time
+    assert agent.call_groq_llm("What does she do?", task="qa") == "response 2"
+    assert agent.call_groq_llm("What does she do?", task="qa") == "response 3"
+    assert len(backend.prompts) == 3
@@ -0,0 +1,90 @@
+import json
+import time
+
+import pytest
+
+import llm_backends
+from agents import ResumeAnalysisAgent
+from llm import route_for
+from llm_backends import (Completion, FixtureMiss, LiveBackend, RecordBackend, ReplayBackend, backend_from_config,
+                          fixture_key)
+
+
+class FakeLive:
+    name = "live"
+
+    def __init__(self):
+        self.prompts = []
+
+    def complete(self, prompt, model, route):
+        self.prompts.append(prompt)
+        return Completion(f"answer to {prompt}", prompt_tokens=len(prompt), completion_tokens=3)
+
+
+@pytest.fixture
+def fixture_path(tmp_path):
+    path = str(tmp_path / "fixture.jsonl")
+    recorder = RecordBackend(FakeLive(), path)
+    for prompt in ("first prompt", "second prompt"):
+        recorder.complete(prompt, "llama-3.1-8b-instant", route_for("qa"))
+    return path
+
+
+def test_record_appends_each_call(fixture_path):
+    with open(fixture_path, encoding="utf-8") as f:
+        entries = [json.loads(line) for line in f]
+    assert [entry["prompt"] for entry in entries] == ["first prompt", "second prompt"]
+    first = entries[0]
+    assert first["key"] == fixture_key("first prompt", "llama-3.1-8b-instant", route_for("qa"))
+    assert (first["response"], first["prompt_tokens"], first["completion_tokens"]) == \
+        ("answer to first prompt", 12, 3)
+    assert first["latency"] >= 0
+
+
+def test_replay_serves_recorded_responses_offline(fixture_path):
+    replay = ReplayBackend(fixture_path)
+    completion = replay.complete("second prompt", "llama-3.1-8b-instant", route_for("qa"))
+    assert (completion.content, completion.prompt_tokens, completion.completion_tokens) == \
+        ("answer to second prompt", 13, 3)
+    # A tuned route still finds the response recorded for the same prompt
+    tuned = dict(route_for("qa"), max_tokens=100)
+    assert replay.complete("first prompt", "llama-3.3-70b-versatile", tuned).content == "answer to first prompt"
+    with pytest.raises(FixtureMiss):
+        replay.complete("never recorded", "llama-3.1-8b-instant", route_for("qa"))
+
+
+def test_replay_latency(fixture_path):
+    replay = ReplayBackend(fixture_path, latency=0.2)
+    began = time.perf_counter()
+    replay.complete("first prompt", "llama-3.1-8b-instant", route_for("qa"))
+    assert time.perf_counter() - began >= 0.2
+
+
+def test_backend_is_chosen_from_the_environment(fixture_path, monkeypatch):
+    monkeypatch.setattr(llm_backends, "_replay_backends", {})
+    monkeypatch.setenv("MAIKNIT_LLM_FIXTURE", fixture_path)
+    monkeypatch.setenv("MAIKNIT_LLM_BACKEND", "replay")
+    monkeypatch.setenv("MAIKNIT_REPLAY_LATENCY", "5")
+    replay = backend_from_config(lambda: None)
+    assert isinstance(replay, ReplayBackend) and replay.latency == 0.005
+    # Loaded once per process
+    assert backend_from_config(lambda: None) is replay
+
+    monkeypatch.setenv("MAIKNIT_LLM_BACKEND", "record")
+    recorder = backend_from_config(lambda: None)
+    assert isinstance(recorder, RecordBackend) and recorder.path == fixture_path
+    monkeypatch.setenv("MAIKNIT_LLM_BACKEND", "bogus")
+    assert isinstance(backend_from_config(lambda: None), LiveBackend)
+
+
+def test_replayed_agent_bypasses_the_response_cache(tmp_path):
+    path = str(tmp_path / "fixture.jsonl")
+    recorder = RecordBackend(FakeLive(), path)
+    agent = ResumeAnalysisAgent("test-key", llm_backend=recorder)
+    assert agent.llm_cache is None
+    recorded = agent.call_groq_llm("List the skills in: Python, SQL", task="skills")
+
+    replayed = ResumeAnalysisAgent("test-key", llm_backend=ReplayBackend(path))
+    assert replayed.llm_cache is None
+    assert replayed.call_groq_llm("List the skills in: Python, SQL", task="skills") == recorded
+    assert replayed.call_groq_llm("Something new", task="skills").startswith("ERROR:")
@@ -0,0 +1,59 @@
+import pytest
+
+from question_bank import QuestionBank, normalize_question
+
+
+@pytest.fixture
+def bank(tmp_path):
+    return QuestionBank(str(tmp_path / "question_bank.db"), target_per_slot=3)
+
+
+def test_near_duplicates_are_dropped(bank):
+    assert normalize_question("  What is a Python GIL?! ") == "what is a python gil"
+    assert normalize_question("C++ or C#?") == "c++ or c#"
+    assert bank.add("Python", "Technical", "Medium", [
+        "What is the GIL?", "what is the  GIL", "How do generators work?", "", "?!"]) == 2
+    assert bank.add("python", "Technical", "Medium", ["What is the GIL?"]) == 0
+    # Skills match case-insensitively
+    assert bank.count("PYTHON", "Technical", "Medium") == 2
+    assert bank.count("Python", "Technical", "Hard") == 0
+
+
+def test_assemble_spreads_questions_across_skills(bank):
+    bank.add("Python", "Technical", "Medium", [f"Python question {i}?" for i in range(4)])
+    bank.add("SQL", "Technical", "Medium", [f"SQL question {i}?" for i in range(2)])
+    bank.add("SQL", "Basic", "Medium", ["A basic SQL question?"])
+
+    questions = bank.assemble(["SQL", "Python", "Kafka"], "Technical", "Medium", 4)
+    assert len(questions) == len(set(questions)) == 4
+    assert sum(q.startswith("SQL") for q in questions) == 2
+    # Fewer banked questions than asked for returns what there is
+    assert len(bank.assemble(["SQL"], "Technical", "Medium", 5)) == 2
+    assert bank.assemble(["Kafka"], "Technical", "Medium", 3) == []
+    assert bank.assemble(["Python"], "Technical", "Medium", 0) == []
+
+
+def test_fill_tops_up_only_missing_slots(bank):
+    bank.add("Python", "Basic", "Easy", ["One?", "Two?", "Three?"])
+    requested = []
+
+    def generate(skill, question_type, difficulty, n):
+        requested.append((skill, question_type, difficulty))
+        if skill == "Rust":
+            raise RuntimeError("model unavailable")
+        return [f"{skill} {question_type} {difficulty} {i}?" for i in range(n)]
+
+    assert bank.missing_slots(["Python", "SQL"], ["Basic"], ["Easy", "Hard"]) == [
+        ("Python", "Basic", "Hard"), ("SQL", "Basic", "Easy"), ("SQL", "Basic", "Hard")]
+    # A failing slot is skipped; the others are still filled
+    assert bank.fill(generate, ["Python", "SQL", "Rust"], ["Basic"], ["Easy", "Hard"], max_workers=2) == 9
+    assert sorted(requested) == [("Python", "Basic", "Hard"), ("Rust", "Basic", "Easy"), ("Rust", "Basic", "Hard"),
+                                 ("SQL", "Basic", "Easy"), ("SQL", "Basic", "Hard")]
+    assert bank.missing_slots(["Python", "SQL"], ["Basic"], ["Easy", "Hard"]) == []
+
+
+def test_bank_is_shared_through_the_database(bank):
+    # Another worker process opening the same file sees the same questions
+    bank.add("Docker", "Scenario", "Hard", ["A container keeps restarting. What do you check?"])
+    other = QuestionBank(bank.db_path)
+    assert other.assemble(["docker"], "Scenario", "Hard", 1) == ["A container keeps restarting. What do you check?"]
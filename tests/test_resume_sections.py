@@ -0,0 +1,93 @@
+from resume_sections import ResumeSections, question_tags
+
+RESUME = """Jane Doe
+Data Engineer | jane@example.com
+
+PROFESSIONAL SUMMARY
+Data engineer with eight years of experience.
+
+Work Experience
+Senior Data Engineer, Acme Corp (2020 - present)
+- Built streaming pipelines with Kafka,
+  Apache Spark and Flink for 40 teams
+- Migrated the warehouse to Snowflake
+Data Engineer, Beta Ltd (2016 - 2020)
+- Wrote Airflow DAGs in Python
+
+Education
+BSc Computer Science, State University
+
+Skills: Python, SQL, Docker
+"""
+
+
+def test_sections_and_entries():
+    sections = ResumeSections(RESUME)
+    assert [(kind, title) for kind, title, *_ in sections.sections] == [
+        ("header", ""), ("summary", "PROFESSIONAL SUMMARY"), ("experience", "Work Experience"),
+        ("education", "Education"), ("skills", "Skills"),
+    ]
+    experience = sections.sections[2]
+    entries = [sections.entry_text(n) for n in range(experience[4], experience[5])]
+    assert entries == [
+        "Senior Data Engineer, Acme Corp (2020 - present)",
+        "- Built streaming pipelines with Kafka,\n  Apache Spark and Flink for 40 teams",
+        "- Migrated the warehouse to Snowflake",
+        "Data Engineer, Beta Ltd (2016 - 2020)",
+        "- Wrote Airflow DAGs in Python",
+    ]
+    # Offsets point into the original text
+    for kind, title, start, end, _, _ in sections.sections:
+        assert RESUME[start:end].startswith(title)
+    # Text after a heading's colon is the section's first entry
+    assert sections.entry_text(sections.sections[4][4]) == "Python, SQL, Docker"
+
+
+def test_skill_lookups_use_the_index():
+    sections = ResumeSections(RESUME)
+    # Wrapped bullet lines belong to their bullet
+    assert sections.evidence("kafka") == [("Work Experience", "Built streaming pipelines with Kafka,\n  "
+                                                               "Apache Spark and Flink for 40 teams")]
+    # Aliases resolve to the dictionary skill
+    assert sections.find_skill("Spark") == sections.find_skill("Apache Spark") != []
+    assert [sections.entry_text(n) for n in sections.find_skill("Python")] == [
+        "- Wrote Airflow DAGs in Python", "Python, SQL, Docker"]
+    # Unknown skills fall back to a remembered substring search
+    assert sections.find_skill("Snowflake") == sections.by_skill["snowflake"]
+    assert sections.find_skill("Kubernetes") == []
+
+
+def test_relevant_block_falls_back_to_the_latest_role():
+    sections = ResumeSections(RESUME)
+    assert sections.relevant_block("Docker") == "Python, SQL, Docker"
+    assert sections.relevant_block("Kubernetes") == RESUME[RESUME.index("Senior"):RESUME.index("\nData Engineer, Beta")]
+
+
+def test_excerpt_respects_budget_and_prefers_skills():
+    sections = ResumeSections(RESUME)
+    excerpt = sections.excerpt(160, skills=["Airflow"])
+    assert len(excerpt) <= 160
+    assert excerpt.startswith("Jane Doe")
+    assert "- Wrote Airflow DAGs in Python" in excerpt
+    assert "Snowflake" not in excerpt
+    full = sections.excerpt(10000)
+    assert full.index("PROFESSIONAL SUMMARY") < full.index("Work Experience") < full.index("Education")
+
+
+def test_chunks_carry_section_and_skill_tags():
+    chunks = ResumeSections(RESUME).chunks(120)
+    assert all(len(text) <= 140 for text, _ in chunks)
+    assert all(text.startswith("Work Experience\n") for text, tags in chunks if "experience" in tags)
+    kafka_tags = [tags for text, tags in chunks if "Kafka" in text]
+    assert kafka_tags == [{"experience", "kafka", "apache spark", "apache flink"}]
+    assert {"education"} in [tags for text, tags in chunks if text.startswith("Education")]
+    assert question_tags("Which university did she attend, and does she know Kafka?") >= {"education", "kafka"}
+
+
+def test_outline_and_plain_text():
+    assert ResumeSections(RESUME).outline() == \
+        "Header; PROFESSIONAL SUMMARY; Work Experience (2 roles, 3 bullets); Education; Skills"
+    plain = ResumeSections("Just a few words about me")
+    assert [kind for kind, *_ in plain.sections] == ["header"]
+    assert plain.excerpt(10) == "Just a few"
+    assert ResumeSections("").excerpt(10) == ""
@@ -0,0 +1,31 @@
+import json
+
+import screen
+
+
+def read_jsonl(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_failed_resumes_are_retried_without_duplicating_rows(tmp_path):
+    folder = tmp_path / "resumes"
+    folder.mkdir()
+    (folder / "good.txt").write_text("Jane Doe\nPython, Django and PostgreSQL", encoding="utf-8")
+    (folder / "broken.pdf").write_bytes(b"%PDF-1.4 broken")
+    output = str(tmp_path / "scores.jsonl")
+    argv = [str(folder), "--role", "Backend Engineer", "--offline", "--no-store", "--workers", "1", "-o", output]
+
+    for _ in range(2):
+        assert screen.main(argv) == 1
+        assert [row["file"] for row in read_jsonl(output)] == [str(folder / "good.txt")]
+        errors = read_jsonl(output + ".errors.jsonl")
+        assert [row["file"] for row in errors] == [str(folder / "broken.pdf")]
+        assert errors[0]["error"]
+
+    # Once the file is fixed, the next run screens it and leaves no errors behind
+    (folder / "broken.pdf").unlink()
+    (folder / "fixed.txt").write_text("John Roe\nJava and Spring", encoding="utf-8")
+    assert screen.main(argv) == 0
+    assert [row["file"] for row in read_jsonl(output)] == [str(folder / "good.txt"), str(folder / "fixed.txt")]
+    assert read_jsonl(output + ".errors.jsonl") == []
@@ -0,0 +1,87 @@
+import gc
+import os
+import threading
+import time
+
+import pytest
+
+from agents import ResumeAnalysisAgent
+from session_resources import SessionResourceManager
+
+
+def make_agent(text):
+    agent = ResumeAnalysisAgent("test-key")
+    agent.resume_hash = "h" + text[:8]
+    agent.resume_text = text
+    agent.analysis_result = {"overall_score": 50}
+    return agent
+
+
+@pytest.fixture
+def manager(tmp_path):
+    return SessionResourceManager(idle_seconds=60, max_bytes=10000, spill_dir=str(tmp_path / "spill"))
+
+
+def test_idle_sessions_are_spilled_and_read_back(manager):
+    agent = make_agent("Jane Doe " * 100)
+    manager.touch("a", agent)
+    assert manager.sweep(force=True) == 0
+    manager._sessions["a"].last_seen = time.time() - 120
+
+    assert manager.sweep(force=True) > 0
+    assert agent.__dict__["_resume_text"] is None
+    assert len(os.listdir(manager.spill_dir)) == 1
+    # Read back lazily; a sweep of an already released session frees nothing
+    assert agent.resume_text == "Jane Doe " * 100
+    assert manager.sweep(force=True) == 0
+
+
+def test_least_recently_used_sessions_go_first_when_over_budget(manager):
+    agents = {token: make_agent(token * 4000) for token in "abc"}
+    for token in "abc":
+        manager.touch(token, agents[token])
+        time.sleep(0.01)
+    # 12000 bytes against a 10000 byte budget: releasing the oldest is enough
+    assert manager.sweep(force=True) > 0
+    assert [token for token in "abc" if agents[token].__dict__["_resume_text"] is None] == ["a"]
+    # The current session is never released
+    manager.max_bytes = 0
+    manager.sweep(current_token="c", force=True)
+    assert agents["c"].__dict__["_resume_text"] is not None
+
+
+def test_busy_agents_are_skipped_until_the_next_sweep(manager):
+    agent = make_agent("Jane Doe " * 2000)
+    manager.touch("a", agent)
+    manager.max_bytes = 0
+    acquired, release = threading.Event(), threading.Event()
+
+    def background_job():
+        with agent._state_lock:
+            acquired.set()
+            release.wait(5)
+
+    job = threading.Thread(target=background_job)
+    job.start()
+    acquired.wait(5)
+    try:
+        assert manager.sweep(force=True) == 0
+        assert agent.__dict__["_resume_text"] is not None
+    finally:
+        release.set()
+        job.join()
+    assert manager.sweep(force=True) > 0
+
+
+def test_files_are_removed_when_the_session_ends(manager):
+    agent = make_agent("Jane Doe " * 100)
+    manager.touch("a", agent)
+    manager.sweep(force=True)
+    manager._sessions["a"].last_seen = 0
+    manager.sweep(force=True)
+    assert len(os.listdir(manager.spill_dir)) == 1
+    del agent
+    gc.collect()
+    assert os.listdir(manager.spill_dir) == []
+    manager.sweep(force=True)
+    assert manager._sessions == {}
@@ -0,0 +1,51 @@
+from skill_extractor import SkillMatcher, extract_skills, load_vocabulary, merge_skills
+
+
+def matcher(*lines):
+    vocabulary = []
+    for line in lines:
+        skill, _, aliases = line.partition("=")
+        vocabulary.append((skill.strip(), [a.strip() for a in aliases.split(",") if a.strip()]))
+    return SkillMatcher(vocabulary)
+
+
+def test_aliases_map_to_the_skill_in_order_of_appearance():
+    m = matcher("Kubernetes = K8s", "Terraform = TF modules")
+    assert m.find("Deploy on k8s with terraform; Kubernetes operators a plus") == ["Kubernetes", "Terraform"]
+
+
+def test_matches_need_word_boundaries():
+    m = matcher("Java", "C++", "C#")
+    assert m.find("JavaScript and Java") == ["JavaScript", "Java"]
+    assert m.find("Modern C++ and C#, not C+") == ["C++", "C#"]
+    assert m.find("Javanese") == []
+
+
+def test_longest_term_wins():
+    m = matcher("Machine Learning", "Machine Learning Ops = MLOps")
+    assert m.find("machine learning ops experience") == ["Machine Learning Ops"]
+    assert m.find("Machine  learning\nand more") == ["Machine Learning"]
+
+
+def test_short_and_capitalised_terms_match_exactly():
+    m = matcher("R", "Go", "REST = restful")
+    assert m.find("R and Go, REST") == ["R", "Go", "REST"]
+    assert m.find("r, go and rest") == []
+    assert m.find("restful services") == ["REST"]
+
+
+def test_role_skills_are_always_known():
+    assert "Python" in extract_skills("Strong python and SQL needed")
+    assert extract_skills("") == []
+
+
+def test_merge_skills_deduplicates_through_the_dictionary():
+    assert merge_skills(["Kubernetes", "Python"], ["k8s", "python", "Rust", "", None, "rust"]) == \
+        ["Kubernetes", "Python", "Rust"]
+
+
+def test_load_vocabulary(tmp_path):
+    path = tmp_path / "vocab.txt"
+    path.write_text("# comment\n\nDbt = data build tool, dbt core\nSnowflake\n", encoding="utf-8")
+    assert load_vocabulary(str(path)) == [("Dbt", ["data build tool", "dbt core"]), ("Snowflake", [])]
+    assert load_vocabulary(str(tmp_path / "missing.txt")) == []
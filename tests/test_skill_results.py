@@ -0,0 +1,133 @@
+import os
+import random
+
+import numpy as np
+import pytest
+
+from roles import ROLE_REQUIREMENTS
+from skill_results import (MAX_COUNT, SkillResults, analysis_from_counts, overall_score, scores_from_counts,
+                           vocabulary_for)
+
+
+def dict_scoring(resume_text, skills, cutoff_score):
+    """The per-skill dict scoring the agent used before the columnar format"""
+    skill_scores = {}
+    skill_reasoning = {}
+    missing_skills = []
+    total_score = 0
+    resume_lower = resume_text.lower()
+    resume_compact = resume_lower.replace(" ", "")
+    for skill in skills:
+        skill_lower = skill.lower()
+        if not (skill_lower in resume_lower or skill_lower.replace(" ", "") in resume_compact):
+            score, reasoning = 1, "Not mentioned in resume"
+        else:
+            count = resume_lower.count(skill_lower)
+            if count >= 5:
+                score, reasoning = 8, f"Mentioned {count} times - strong experience"
+            elif count >= 3:
+                score, reasoning = 6, f"Mentioned {count} times - moderate experience"
+            elif count >= 2:
+                score, reasoning = 4, f"Mentioned {count} times - basic experience"
+            else:
+                score, reasoning = 2, "Mentioned once - minimal evidence"
+        skill_scores[skill] = score
+        skill_reasoning[skill] = reasoning
+        total_score += score
+        if score <= 4:
+            missing_skills.append(skill)
+    overall = min(100, max(0, int((total_score / (10 * len(skills))) * 100))) if skills else 0
+    selected = overall >= cutoff_score
+    return {
+        "overall_score": overall,
+        "skill_scores": skill_scores,
+        "skill_reasoning": skill_reasoning,
+        "selected": selected,
+        "reasoning": "Candidate evaluated based on resume content",
+        "missing_skills": missing_skills,
+        "strengths": [skill for skill, score in skill_scores.items() if score >= 7],
+        "improvement_areas": missing_skills if not selected else [],
+    }
+
+
+def random_resumes(count, seed=3):
+    rng = random.Random(seed)
+    words = [skill for skills in ROLE_REQUIREMENTS.values() for skill in skills]
+    words += ["node js", "machinelearning", "rest apis", "the", "and", "built"]
+    return ["Python " * 300] + [" ".join(rng.choice(words) for _ in range(rng.randint(0, 300)))
+                                for _ in range(count)]
+
+
+@pytest.mark.parametrize("role", sorted(ROLE_REQUIREMENTS))
+def test_analysis_from_counts_matches_dict_scoring(role):
+    skills = ROLE_REQUIREMENTS[role]
+    vocabulary = vocabulary_for(skills)
+    for text in random_resumes(60):
+        for cutoff in (40, 75):
+            assert analysis_from_counts(vocabulary, vocabulary.count_mentions(text), cutoff) == \
+                dict_scoring(text, skills, cutoff)
+
+
+def test_no_skills():
+    assert analysis_from_counts(vocabulary_for([]), [], 75) == dict_scoring("Python", [], 75)
+
+
+def test_counts_saturate_instead_of_wrapping():
+    vocabulary = vocabulary_for(["R"])
+    assert vocabulary.count_mentions("r" * (MAX_COUNT + 10)).tolist() == [MAX_COUNT]
+
+
+def test_vectorised_scores_match_per_candidate_scores():
+    skills = ROLE_REQUIREMENTS["Data Engineer"]
+    vocabulary = vocabulary_for(skills)
+    results = SkillResults(vocabulary, capacity=4)
+    texts = random_resumes(20)
+    for i, text in enumerate(texts):
+        assert results.add(f"{i:064x}", vocabulary.count_mentions(text)) == i
+    assert len(results) == len(texts)
+    assert results.scores.dtype == np.uint8
+    for row, text in enumerate(texts):
+        expected = dict_scoring(text, skills, 75)
+        assert results.to_dict(row) == expected
+        assert results.overall_scores()[row] == expected["overall_score"] == overall_score(results.scores[row])
+        assert scores_from_counts(results.counts[row]).tolist() == list(expected["skill_scores"].values())
+
+
+def test_save_and_load_round_trip(tmp_path):
+    vocabulary = vocabulary_for(ROLE_REQUIREMENTS["Backend Engineer"])
+    results = SkillResults(vocabulary)
+    for i, text in enumerate(random_resumes(5)):
+        results.add(f"{i:064x}", vocabulary.count_mentions(text))
+    path = str(tmp_path / "results.npz")
+    results.save(path)
+    assert os.listdir(tmp_path) == ["results.npz"]
+
+    loaded = SkillResults.load(path)
+    assert loaded.vocabulary is vocabulary
+    assert loaded.resume_hashes == results.resume_hashes
+    assert (loaded.counts == results.counts).all()
+    assert loaded.to_dict(3, cutoff_score=40) == results.to_dict(3, cutoff_score=40)
+
+
+def test_screen_recounts_matrix_rows_lost_by_a_killed_run(tmp_path):
+    import screen
+    folder = tmp_path / "resumes"
+    folder.mkdir()
+    for i, text in enumerate(random_resumes(4)):
+        (folder / f"resume_{i}.txt").write_text(f"Candidate {i}\n{text}", encoding="utf-8")
+    output = str(tmp_path / "scores.jsonl")
+    matrix = str(tmp_path / "scores.npz")
+    argv = [str(folder), "--role", "Backend Engineer", "--offline", "--no-store", "--workers", "1",
+            "-o", output, "--matrix", matrix]
+
+    assert screen.main(argv) == 0
+    complete = SkillResults.load(matrix)
+    assert len(complete) == 5
+    # As if the run had been killed before the matrix was saved
+    os.remove(matrix)
+    assert screen.main(argv) == 0
+    recounted = SkillResults.load(matrix)
+    assert sorted(zip(recounted.resume_hashes, recounted.counts.tolist())) == \
+        sorted(zip(complete.resume_hashes, complete.counts.tolist()))
+    with open(output, encoding="utf-8") as f:
+        assert len(f.readlines()) == 5
@@ -1,8 +1,12 @@
 import streamlit as st
 import pandas as pd
 import base64
+import html
 import io
-import matplotlib.pyplot as plt
+import json
+from functools import lru_cache
+from artifacts import ArtifactCache, FORMATS
+from candidate_store import content_hash
 def setup_page():
     """Apply custom CSS and setup page (without setting page config)"""
     # Apply custom CSS only
@@ -205,6 +209,12 @@ def setup_sidebar():
 
         st.markdown("---")
 
+        st.subheader("Screening")
+        fast_screening = st.checkbox("Fast screening (no LLM calls)", value=False,
+                                     help="Score resumes locally only. Detailed weakness analysis runs when you open a candidate.")
+
+        st.markdown("---")
+
         st.subheader("Theme")
         theme_color= st.color_picker("Accent Color", "#d32f2f")
         st.markdown (f"""
@@ -227,7 +237,8 @@ def setup_sidebar():
 
         return {
             "groq_api_key": groq_api_key,
-            "theme_color": theme_color
+            "theme_color": theme_color,
+            "fast_screening": fast_screening
         }
     
 def role_selection_section(role_requirements):
@@ -243,7 +254,8 @@ def role_selection_section(role_requirements):
            
         custom_jd = None
         if upload_jd:
-            custom_jd_file = st.file_uploader("Upload job description (PDF or TXT)",type=["pdf", "txt"])
+            custom_jd_file = st.file_uploader("Upload job description (PDF, DOCX, HTML or TXT)",
+                                              type=DOCUMENT_TYPES)
             if custom_jd_file:
                 st.success("Custom job description uploaded!")
                 custom_jd = custom_jd_file
@@ -260,22 +272,26 @@ def resume_upload_section():
     st.markdown ("""
     <div class="card">
         <h3> Upload Your Resume</h3>
-        <p>Supported format: PDF</p>
+        <p>Supported formats: PDF, DOCX, HTML, TXT</p>
     </div>
     """, unsafe_allow_html=True)
 
-    uploaded_resume = st.file_uploader("Upload resume (PDF)", type=["pdf"])
+    uploaded_resume = st.file_uploader("Upload resume (PDF, DOCX, HTML or TXT)", type=DOCUMENT_TYPES)
 
     return uploaded_resume
 
-def create_score_pie_chart(score):
+def create_score_pie_chart(score, cutoff_score=75, accent_color="#d32f2f"):
     """Create a professional pie chart for the score visualization"""
+    # Matplotlib is only loaded once the first chart is drawn
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
     fig, ax = plt.subplots(figsize=(4, 4), facecolor='#111111')
 
     # Data
     sizes = [score, 100 - score]
     labels = ['', ''] # We'll use annotation instead
-    colors = ["#d32f2f", "#333333"]
+    colors = [accent_color, "#333333"]
     explode = (0.05, 0) # explode the ft slice (Score)
 
     # Plot
@@ -302,8 +318,8 @@ def create_score_pie_chart(score):
         color='white')
     
     #Add pass/fail indicator
-    status = "PASS" if score >= 75 else "FAIL"
-    status_color="#4CAF50" if score >= 75 else "#d32f2f"
+    status = "PASS" if score >= cutoff_score else "FAIL"
+    status_color="#4CAF50" if score >= cutoff_score else "#d32f2f"
     ax.text(0, -0.15, status,
         ha='center', va='center',
         fontsize=14, fontweight='bold',
@@ -314,7 +330,123 @@ def create_score_pie_chart(score):
 
     return fig
 
-def display_analysis_results(analysis_result):
+@lru_cache(maxsize=128)
+def score_chart_png(score, cutoff_score=75, accent_color="#d32f2f"):
+    """Render the score chart to PNG bytes, memoised so reruns skip Matplotlib entirely"""
+    import matplotlib.pyplot as plt
+    fig = create_score_pie_chart(score, cutoff_score, accent_color)
+    try:
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format="png", facecolor=fig.get_facecolor(), bbox_inches="tight")
+        return buffer.getvalue()
+    finally:
+        # Figures stay registered with pyplot until closed
+        plt.close(fig)
+
+@st.cache_resource
+def get_artifact_cache():
+    """Bounded server-side cache of rendered downloads (one per process)"""
+    return ArtifactCache()
+
+def artifact_download(artifact_key, file_stem, label, build_markdown):
+    """Offer a report as Markdown, TXT or PDF; it is rendered server-side only when requested"""
+    labels = {FORMATS[f][0]: f for f in FORMATS}
+    fmt = labels[st.radio("Format:", list(labels), horizontal=True, key=f"fmt_{file_stem}")]
+    prepared = st.session_state.setdefault("prepared_artifacts", set())
+    if (artifact_key, fmt) not in prepared:
+        if st.button(f"📥 {label}", key=f"prepare_{file_stem}"):
+            prepared.add((artifact_key, fmt))
+    if (artifact_key, fmt) in prepared:
+        data = get_artifact_cache().get_or_build(artifact_key, fmt, build_markdown, title=label)
+        st.download_button(f"📥 Save as {FORMATS[fmt][0]}", data, file_name=f"{file_stem}.{fmt}",
+                           mime=FORMATS[fmt][1], key=f"save_{file_stem}")
+
+def build_analysis_report(analysis_result):
+    """Markdown report of an analysis result"""
+    overall_score = analysis_result.get('overall_score', 0)
+    selected = analysis_result.get("selected", False)
+    strengths = analysis_result.get("strengths", [])
+    missing_skills = analysis_result.get("missing_skills", [])
+    report_content = f"""
+# Overall Score: {overall_score}/100
+
+**Status:** {"Shortlisted" if selected else "Not Selected"}
+
+{analysis_result.get('reasoning', 'No reasoning provided.')}
+
+**Strengths:** {", ".join(strengths) if strengths else "None identified."}
+
+**Areas for Improvement:** {", ".join(missing_skills) if missing_skills else "None identified."}
+
+## Detailed Weakness Analysis
+"""
+    for weakness in analysis_result.get("detailed_weaknesses", []):
+        skill_name = weakness.get('skill', '')
+        score = weakness.get('score', 0)
+        detail = weakness.get('detail', 'No specific details provided.')
+        
+        if detail.startswith('```json') or '{' in detail:
+            detail = "The resume lacks examples of this skill."
+        report_content += f"\n### {skill_name} (Score: {score}/10)\n"
+        report_content += f"**Issue:** {detail}\n"
+
+        if 'suggestions' in weakness and weakness['suggestions']:
+            report_content += "\n**Improvement Suggestions:**\n"
+            for i, sugg in enumerate(weakness['suggestions']):
+                report_content += f"- {sugg}\n"
+
+        if 'example' in weakness and weakness['example']:
+            report_content += f"\n**Example:**\n{weakness['example']}\n"
+
+    report_content += "\n---\n*Analysis Provided by MaiKnit Recruitment Agent*"
+    return report_content
+
+def build_questions_report(result):
+    """Markdown document of generated interview questions"""
+    download_content = f"# Interview Questions\n\n"
+    download_content += f"Difficulty: {result['difficulty']}\n"
+    download_content += f"Types: {', '.join(result['types'])}\n\n"
+    for i, (q_type, question) in enumerate(result["questions"]):
+        download_content += f"## {i+1}. [{q_type}] {question}\n\n"
+        download_content += f"{question}\n\n"
+        if q_type == "Coding":
+            download_content += "```python\n# Write your solution here\n```\n\n"
+    download_content += "\n--\nQuestions generated by MaiKnit Recruitment Agent"
+    return download_content
+
+def build_improvements_report(result):
+    """Markdown document of resume improvement suggestions"""
+    target_role = result["target_role"]
+    download_content = f"# MaiKnit Recruitment -Resume Improvement Suggestions\n\nTarget Role: {target_role if target_role else 'Not specified'}\n\n"
+    for area, suggestions in result["improvements"].items():
+        download_content += f"## Improvements for {area}\n\n"
+        download_content += f"{suggestions.get('description', '')}\n\n"
+        download_content += "### Specific Suggestions\n\n"
+        for i, suggestion in enumerate(suggestions.get("specific", [])):
+            download_content += f"{i+1}. {suggestion}\n"
+        download_content += "\n"
+
+        if "before_after" in suggestions:
+            download_content += "### Before\n\n"
+            download_content += f"```\n{suggestions['before_after'].get('before', 'N/A')}\n```\n\n"
+            download_content += "### After\n\n"
+            download_content += f"```\n{suggestions['before_after'].get('after', 'N/A')}\n```\n\n"
+
+    download_content += "\n--\nProvided by MaiKnit Recruitment Agent"
+    return download_content
+
+def build_improved_resume_report(result):
+    """Markdown document of an improved resume"""
+    target_role = result["target_role"]
+    return f"""# {target_role if target_role else 'Professional'} Resume
+{result['text']}
+
+----
+Resume enhanced by MaiKnit Recruitment Agent
+"""
+
+def display_analysis_results(analysis_result, cutoff_score=75, accent_color="#d32f2f", details_progress=None):
+    """Scores first; while the weakness analysis runs, details_progress holds the weaknesses ready so far"""
     if not analysis_result:
         return
     
@@ -322,6 +454,9 @@ def display_analysis_results(analysis_result):
     selected = analysis_result.get("selected", False)
     skill_scores = analysis_result.get("skill_scores", {})
     detailed_weaknesses = analysis_result.get("detailed_weaknesses", [])
+    details_running = details_progress is not None and analysis_result.get("details_pending")
+    if details_running:
+        detailed_weaknesses = details_progress["weaknesses"]
 
     st.markdown('<div class="card">', unsafe_allow_html=True)
 
@@ -333,8 +468,8 @@ def display_analysis_results(analysis_result):
     col1, col2 = st.columns([1, 2])
     with col1:
         st.metric("Overall Score", f" {overall_score}/100")
-        fig = create_score_pie_chart(overall_score)
-        st.pyplot(fig)
+        st.image(score_chart_png(int(overall_score), cutoff_score, accent_color),
+                 use_column_width=True)
 
     with col2:
         if selected:
@@ -369,10 +504,19 @@ def display_analysis_results(analysis_result):
 
     st.markdown('</div>', unsafe_allow_html=True)
 
-    if detailed_weaknesses:
+    if details_running:
+        st.markdown('<hr>', unsafe_allow_html=True)
+        st.subheader(" Detailed Weakness Analysis")
+        total = details_progress["total"]
+        st.caption(f"Analyzing weaknesses... {len(detailed_weaknesses)} of {total} ready." if total
+                   else "Analyzing weaknesses...")
+    elif analysis_result.get("details_pending"):
+        st.caption("Scored with fast screening. Detailed weakness analysis runs when the candidate is opened from the pool.")
+    elif detailed_weaknesses:
         st.markdown('<hr>', unsafe_allow_html=True)
         st.subheader(" Detailed Weakness Analysis")
 
+    if detailed_weaknesses:
         for weakness in detailed_weaknesses:
             skill_name = weakness.get('skill', '')
             score = weakness.get('score', 0)
@@ -394,49 +538,40 @@ def display_analysis_results(analysis_result):
                     st.markdown("<strong>Example addition:</strong>",unsafe_allow_html=True)
                     st.markdown(f'<div class="example-detail">{weakness["example"]}</div>',unsafe_allow_html=True)
         
+    if detailed_weaknesses and not details_running:
         st.markdown("---")
         col1, col2, col3 = st.columns([1, 2, 1])
         with col2:
-            report_content = f"""
-# Overall Score: {overall_score}/100
-
-**Status:** {"Shortlisted" if selected else "Not Selected"}
-
-{analysis_result.get('reasoning', 'No reasoning provided.')}
-
-**Strengths:** {", ".join(strengths) if strengths else "None identified."}
-
-**Areas for Improvement:** {", ".join(missing_skills) if missing_skills else "None identified."}
-
-## Detailed Weakness Analysis
-"""
-            for weakness in detailed_weaknesses:
-                skill_name = weakness.get('skill', '')
-                score = weakness.get('score', 0)
-                detail = weakness.get('detail', 'No specific details provided.')
-                
-                if detail.startswith('```json') or '{' in detail:
-                    detail = "The resume lacks examples of this skill."
-                report_content += f"\n### {skill_name} (Score: {score}/10)\n"
-                report_content += f"**Issue:** {detail}\n"
-
-                if 'suggestions' in weakness and weakness['suggestions']:
-                    report_content += "\n**Improvement Suggestions:**\n"
-                    for i, sugg in enumerate(weakness['suggestions']):
-                        report_content += f"- {sugg}\n"
-
-                if 'example' in weakness and weakness['example']:
-                    report_content += f"\n**Example:**\n{weakness['example']}\n"
-
-            report_content += "\n---\n*Analysis Provided by MaiKnit Recruitment Agent*"
-
-            report_b64 = base64.b64encode(report_content.encode()).decode()
-            href = f'<a class="download-btn" href="data:text/plain;base64,{report_b64}" download="maiknit_resume_analysis.txt">📥 Download Analysis Report</a>'
-            st.markdown(href, unsafe_allow_html=True)
+            artifact_download(
+                f"analysis:{content_hash(json.dumps(analysis_result, sort_keys=True))}",
+                "maiknit_resume_analysis",
+                "Download Analysis Report",
+                lambda: build_analysis_report(analysis_result)
+            )
 
     st.markdown('</div>', unsafe_allow_html=True)
         
-def resume_qa_section(has_resume, ask_question_func=None):
+EXAMPLE_QUESTIONS = [
+    "What is the candidate's most recent role?",
+    "How many years of experience does the candidate have with Python?",
+    "What educational qualifications does the candidate have?",
+    "What are the candidate's key achievements?",
+    "Has the candidate managed teams before?",
+    "What projects has the candidate worked on?",
+    "Does the candidate have experience with cloud technologies?"
+]
+
+def _use_example_question(question):
+    # Runs before the rerun, so the text input picks up the new value
+    st.session_state.user_question = question
+    st.session_state.pop("qa_answer", None)
+
+def _start_new_conversation(reset_conversation_func):
+    reset_conversation_func()
+    st.session_state.user_question = ""
+    st.session_state.pop("qa_answer", None)
+
+def resume_qa_section(has_resume, ask_question_func=None, conversation_func=None, reset_conversation_func=None):
     if not has_resume:
         st.warning("Please upload and analyze a resume first.")
         return
@@ -444,35 +579,49 @@ def resume_qa_section(has_resume, ask_question_func=None):
     st.markdown('<div class="card">', unsafe_allow_html=True)
 
     st.subheader(" Ask Questions About Your Resume")
-    user_question = st.text_input("Enter your question about the resume:", placeholder="What is the candidate's most recent experience?")
+    user_question = st.text_input("Enter your question about the resume:", key="user_question",
+                                  placeholder="What is the candidate's most recent experience?")
 
     if user_question and ask_question_func:
-        with st.spinner ("Searching resume and generating response..."):
-            response = ask_question_func(user_question)
-            st.markdown('<div style="background-color: #111122; padding: 15px; border-radius: 5px; border-left: 5px solid #d32f2f;">',
-            unsafe_allow_html=True)
-            st.write(response)
-            st.markdown('</div>', unsafe_allow_html=True)
+        # Asked once: reruns (e.g. while background jobs are polled) show the same answer, even a
+        # failed one, until the user asks again
+        answered = st.session_state.get("qa_answer")
+        if answered and answered[0] == user_question:
+            response = answered[1]
+        else:
+            with st.spinner ("Searching resume and generating response..."):
+                response = ask_question_func(user_question)
+            st.session_state.qa_answer = (user_question, response)
+        st.markdown('<div style="background-color: #111122; padding: 15px; border-radius: 5px; border-left: 5px solid #d32f2f;">',
+        unsafe_allow_html=True)
+        st.write(response)
+        st.markdown('</div>', unsafe_allow_html=True)
+
+    # Earlier turns are sent to the model in compact form so follow-up questions keep their context
+    earlier_turns = conversation_func()[:-1] if conversation_func else []
+    if earlier_turns:
+        with st.expander(f"Conversation so far ({len(earlier_turns)} earlier questions)"):
+            for question, answer in earlier_turns:
+                st.markdown(f"**Q:** {question}")
+                st.write(answer)
+    if reset_conversation_func:
+        st.button("Start new conversation", key="qa_reset",
+                  on_click=_start_new_conversation, args=(reset_conversation_func,))
     
     # Add example questions
     with st.expander ("Example Questions"):
-        example_questions = [
-            "What is the candidate's most recent role?",
-            "How many years of experience does the candidate have with Python?",
-            "What educational qualifications does the candidate have?",
-            "What are the candidate's key achievements?",
-            "Has the candidate managed teams before?",
-            "What projects has the candidate worked on?",
-            "Does the candidate have experience with cloud technologies?" 
-        ]
-
-        for question in example_questions:
-                if st.button(question, key=f"q_{question}"):
-                    st.session_state.current_question = question
-                    st.experimental_rerun()
+        for question in EXAMPLE_QUESTIONS:
+            st.button(question, key=f"q_{question}", on_click=_use_example_question, args=(question,))
 
     st.markdown('</div>', unsafe_allow_html=True)
 
+QUESTION_TYPES = ["Basic", "Technical", "Experience", "Scenario", "Coding", "Behavioral"]
+DEFAULT_QUESTION_TYPES = ["Basic", "Technical"]
+DEFAULT_DIFFICULTY = "Medium"
+
+# Upload types the ingestion pipeline can read
+DOCUMENT_TYPES = ["pdf", "docx", "html", "htm", "txt"]
+
 def interview_questions_section(has_resume, generate_questions_func=None):
     if not has_resume:
         st.warning("Please upload and analyze a resume first.")
@@ -485,15 +634,15 @@ def interview_questions_section(has_resume, generate_questions_func=None):
     with col1:
         question_types = st.multiselect(
             "Select question types:",
-            ["Basic", "Technical", "Experience", "Scenario", "Coding", "Behavioral"],
-            default=["Basic", "Technical"]
+            QUESTION_TYPES,
+            default=DEFAULT_QUESTION_TYPES
         )
 
     with col2:
         difficulty = st.select_slider(
             "Question difficulty:",
             options=["Easy", "Medium", "Hard"],
-            value="Medium"
+            value=DEFAULT_DIFFICULTY
         )
 
     num_questions = st.slider("Number of questions:", 3,15,5)
@@ -501,39 +650,38 @@ def interview_questions_section(has_resume, generate_questions_func=None):
     if st.button("Generate Interview Questions"):
         if generate_questions_func:
             with st.spinner("Generating interview questions..."):
-                questions = generate_questions_func(question_types, difficulty, num_questions)
-                st.subheader("Personalized Interview Questions...")
-                
-                # Create Content for download
-                download_content = f"# Interview Questions\n\n"
-                download_content += f"Difficulty: {difficulty}\n"
-                download_content += f"Types: {', '.join(question_types)}\n\n"
-                for i, (q_type, question) in enumerate(questions):
-                    with st.expander (f"{q_type}: {question[:50]}..."):
-                        st.write(question)
-               
-                        # For coding questions, add code editor
-                        if q_type == "Coding":
-                            st.code("# Write your solution here", language="python")
-                    
-                    download_content += f"## {i+1}. [{q_type}] {question}\n\n"
-                    download_content += f"{question}\n\n"
-                    if q_type == "Coding":
-                        download_content += "```python\n# Write your solution here\n```\n\n"
-
-                download_content += "\n--\nQuestions generated by MaiKnit Recruitment Agent"
-
-                # Add download button
-                if questions:
-                    st.markdown("---")
-                    question_bytes = download_content.encode()
-                    b64 = base64.b64encode(question_bytes).decode()
-                    href = f'<a class="download-btn" href="data:text/markdown;base64,{b64}" download="maiknit_interview_questions.md">Download All Questions</a>'
-                    st.markdown(href, unsafe_allow_html=True)
-                
-st.markdown('</div>', unsafe_allow_html=True)     
-
-def resume_improvement_section(has_resume, improve_resume_func=None):
+                # Kept in session state so later reruns (e.g. a download click) still show them
+                st.session_state.interview_questions = {
+                    "questions": generate_questions_func(question_types, difficulty, num_questions),
+                    "difficulty": difficulty,
+                    "types": list(question_types),
+                }
+
+    result = st.session_state.get("interview_questions")
+    if result:
+        questions = result["questions"]
+        st.subheader("Personalized Interview Questions...")
+        for i, (q_type, question) in enumerate(questions):
+            with st.expander (f"{q_type}: {question[:50]}..."):
+                st.write(question)
+       
+                # For coding questions, add code editor
+                if q_type == "Coding":
+                    st.code("# Write your solution here", language="python")
+
+        # Add download button
+        if questions:
+            st.markdown("---")
+            artifact_download(
+                f"questions:{content_hash(json.dumps(result, sort_keys=True))}",
+                "maiknit_interview_questions",
+                "Download All Questions",
+                lambda: build_questions_report(result)
+            )
+
+    st.markdown('</div>', unsafe_allow_html=True)     
+
+def resume_improvement_section(has_resume, improve_resume_func=None, pending=False):
     if not has_resume:
         st.warning("Please upload and analyze a resume first.")
         return
@@ -549,66 +697,53 @@ def resume_improvement_section(has_resume, improve_resume_func=None):
     target_role = st.text_input("Target role (optional):", placeholder="e.g., Senior Data Scientist at Google")
     if st.button("Generate Resume Improvements"):
         if improve_resume_func:
-            with st.spinner("Analyzing and generating improvements..."):
-                improvements = improve_resume_func(improvement_areas, target_role)
+            # Runs in the background; the result lands in st.session_state.resume_improvements
+            improve_resume_func(improvement_areas, target_role)
+            pending = True
+
+    if pending:
+        st.info("Analyzing and generating improvements... You can keep using the app.")
+
+    result = st.session_state.get("resume_improvements")
+    if result:
+        for area, suggestions in result["improvements"].items():
+            with st.expander (f"Improvements for {area}", expanded=True):
+                st.markdown (f"<p>{suggestions.get('description', '')}</p>",
+                unsafe_allow_html=True)
+            
+                st.subheader("Specific Suggestions")
+                for i, suggestion in enumerate (suggestions.get("specific", [])): 
+                    st.markdown(f'<div class="solution-detail"><strong>{i +1}.</strong> {suggestion}</div>',
+                    unsafe_allow_html=True)
+            
+                if "before_after" in suggestions:
+                    st.markdown('<div class="comparison-container">',
+                    unsafe_allow_html=True)
+
+                    st.markdown('<div class="comparison-box">', unsafe_allow_html=True)
+                    st.markdown("<strong>Before:</strong>", unsafe_allow_html=True)
+                    st.markdown(f"<pre>{suggestions ['before_after'].get('before', 'N/A')}</pre>", unsafe_allow_html=True)
+                    st.markdown('</div>', unsafe_allow_html=True)
 
-                # Create content for download
-                download_content = f"# MaiKnit Recruitment -Resume Improvement Suggestions\n\nTarget Role: {target_role if target_role else 'Not specified'}\n\n"
+                    st.markdown('<div class="comparison-box">', unsafe_allow_html=True)
+                    st.markdown("<strong>After:</strong>", unsafe_allow_html=True)
+                    st.markdown(f"<pre>{suggestions ['before_after'].get('after', 'N/A')}</pre>", unsafe_allow_html=True)
+                    st.markdown('</div>', unsafe_allow_html=True)
                 
-                for area, suggestions in improvements.items():
-                    with st.expander (f"Improvements for {area}", expanded=True):
-                        st.markdown (f"<p>{suggestions ['description']}</p>",
-                        unsafe_allow_html=True)
-                    
-                    st.subheader("Specific Suggestions")
-                    if "specific" in suggestions:
-                        for i, suggestion in enumerate (suggestions ["specific"]): 
-                            st.markdown(f'<div class="solution-detail"><strong>{i +1}.</strong> {suggestion}</div>',
-                            unsafe_allow_html=True)
-                    
-                    if "before_after" in suggestions:
-                        st.markdown('<div class="comparison-container">',
-                        unsafe_allow_html=True)
-
-                        st.markdown('<div class="comparison-box">', unsafe_allow_html=True)
-                        st.markdown("<strong>Before:</strong>", unsafe_allow_html=True)
-                        st.markdown(f"<pre>{suggestions ['before_after'].get('before', 'N/A')}</pre>", unsafe_allow_html=True)
-                        st.markdown('</div>', unsafe_allow_html=True)
-
-                        st.markdown('<div class="comparison-box">', unsafe_allow_html=True)
-                        st.markdown("<strong>After:</strong>", unsafe_allow_html=True)
-                        st.markdown(f"<pre>{suggestions ['before_after'].get('after', 'N/A')}</pre>", unsafe_allow_html=True)
-                        st.markdown('</div>', unsafe_allow_html=True)
-                        
-                        st.markdown('</div>', unsafe_allow_html=True)
-
                     st.markdown('</div>', unsafe_allow_html=True)
 
-                    download_content = f"## Improvements for {area}\n\n"
-                    download_content += f"{suggestions ['description']}\n\n"
-                    download_content += "### Specific Suggestions\n\n"
-                    for i, suggestion in enumerate (suggestions ["specific"]):
-                        download_content += f"{i+1}. {suggestion}\n"
-                    download_content += "\n"
-
-                    if "before_after" in suggestions:
-                        download_content += "### Before\n\n"
-                        download_content += f"```\n{suggestions ['before_after'] ['before']}\n```\n\n"
-                        download_content += "### After\n\n"
-                        download_content += f"```\n{suggestions ['before_after'] ['after']}\n```\n\n"
-
-                    download_content += "\n--\nProvided by MaiKnit Recruitment Agent"
-
-                    # Add download button
-                    st.markdown("---")
-                    report_bytes = download_content.encode()
-                    b64 = base64.b64encode(report_bytes).decode()
-                    href = f'<a class="download-btn" href="data:text/markdown;base64,{b64}" download="maiknit_resume_improvements.md">📥 Download All Suggestions</a>'
-                    st.markdown(href, unsafe_allow_html=True)
+        # Add download button
+        st.markdown("---")
+        artifact_download(
+            f"improvements:{content_hash(json.dumps(result, sort_keys=True))}",
+            "maiknit_resume_improvements",
+            "Download All Suggestions",
+            lambda: build_improvements_report(result)
+        )
               
     st.markdown('</div>', unsafe_allow_html=True)   
 
-def improved_resume_section(has_resume, get_improved_resume_func=None):
+def improved_resume_section(has_resume, get_improved_resume_func=None, pending=False):
     if not has_resume:
         st.warning("Please upload and analyze a resume first.")
         return
@@ -619,34 +754,24 @@ def improved_resume_section(has_resume, get_improved_resume_func=None):
     highlight_skills = st.text_area ("Paste your JD to get updated Resume", placeholder="e.g., Python, React, Cloud Architecture")
     if st.button("Generate Improved Resume"):
         if get_improved_resume_func:
-            with st.spinner("Creating improved resume..."):
-                improved_resume = get_improved_resume_func(target_role, highlight_skills)
-
-                st.subheader("Improved Resume")
-                st.text_area ("Your improved resume:", improved_resume, height=400)
-                # Download buttons
-                coll, col2 = st.columns (2)
-                with coll:
-                #Text file download
-                    resume_bytes = improved_resume.encode()
-                    b64 = base64.b64encode(resume_bytes).decode()
-                    href = f'<a class="download-btn" href="data:file/txt;base64, {b64}" download="MaiKnit_improved_resume.txt"> Download as TXT</a>'
-                    st.markdown(href, unsafe_allow_html=True)
-
-                with col2:
-                    #Markdown file download
-                    md_content = f"""# {target_role if target_role else
-                    'Professional'} Resume
-{improved_resume}
-
-----
-Resume enhanced by MaiKnit Recruitment Agent
-"""
-                    
-                    md_bytes = md_content.encode()
-                    md_b64 = base64.b64encode(md_bytes).decode()  
-                    md_href = f'<a class="download-btn" href="data:text/markdown;base64,{md_b64}" download="maiknit_improved_resume.md">Download as Markdown</a>'
-                    st.markdown(md_href, unsafe_allow_html=True)
+            # Runs in the background; the result lands in st.session_state.improved_resume
+            get_improved_resume_func(target_role, highlight_skills)
+            pending = True
+
+    if pending:
+        st.info("Creating improved resume... You can keep using the app.")
+
+    result = st.session_state.get("improved_resume")
+    if result:
+        st.subheader("Improved Resume")
+        st.text_area ("Your improved resume:", result["text"], height=400)
+        # Download buttons
+        artifact_download(
+            f"improved_resume:{content_hash(json.dumps(result, sort_keys=True))}",
+            "maiknit_improved_resume",
+            "Download Improved Resume",
+            lambda: build_improved_resume_report(result)
+        )
                     
     st.markdown('</div>', unsafe_allow_html=True)
 
@@ -656,5 +781,94 @@ def create_tabs():
         "Resume Q&A",
         "Interview Questions",
         "Resume Improvement",
-        "Improved Resume"
-    ])
\ No newline at end of file
+        "Improved Resume",
+        "Candidate Search"
+    ])
+def candidate_search_section(store, role_names, pool_index=None, open_candidate_func=None, page_size=20):
+    st.markdown('<div class="card">', unsafe_allow_html=True)
+
+    if pool_index is not None:
+        st.subheader(" Ask the Candidate Pool")
+        pool_query = st.text_input("Describe the experience you need:",
+                                   placeholder="Who has built streaming pipelines with Kafka?", key="pool_query")
+        if pool_query:
+            matches = pool_index.search(pool_query, k=10)
+            if not matches:
+                st.write("No matching candidates found.")
+            for match in matches:
+                with st.expander(f"{match['file_name'] or match['resume_hash'][:12]} (match {match['score']:.2f})"):
+                    for snippet in match["snippets"]:
+                        # Snippets are raw resume text; escape them so an upload cannot inject HTML
+                        st.markdown(f'<div class="example-detail">{html.escape(snippet)}</div>',
+                                    unsafe_allow_html=True)
+        st.markdown('<hr>', unsafe_allow_html=True)
+
+    st.subheader(" Search Past Candidates")
+
+    col1, col2, col3 = st.columns([2, 2, 1])
+    with col1:
+        roles = ["All roles"] + sorted(set(role_names) | set(store.roles()))
+        role = st.selectbox("Role:", roles, key="search_role")
+    with col2:
+        skill = st.text_input("Skill:", placeholder="e.g., Kubernetes", key="search_skill")
+    with col3:
+        min_skill_score = st.number_input("Min skill score:", 0, 10, 6, key="search_skill_score")
+
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        min_score = st.number_input("Min overall score:", 0, 100, 0, key="search_min_score")
+    with col2:
+        text = st.text_input("Resume contains:", placeholder="e.g., streaming pipelines", key="search_text")
+
+    filters = {
+        "role": None if role == "All roles" else role,
+        "skills": {skill.strip(): min_skill_score} if skill.strip() else None,
+        "min_score": min_score or None,
+        "text": text.strip() or None,
+    }
+
+    # Reset to the first page whenever the filters change
+    if st.session_state.get("search_filters") != filters:
+        st.session_state.search_filters = filters
+        st.session_state.search_page = 0
+
+    total = store.count(**filters)
+    pages = max(1, (total + page_size - 1) // page_size)
+    page = min(st.session_state.get("search_page", 0), pages - 1)
+    rows = store.search(**filters, limit=page_size, offset=page * page_size)
+
+    st.caption(f"{total} matching candidates - page {page + 1} of {pages}")
+    if rows:
+        st.dataframe(
+            pd.DataFrame([{
+                "ID": row["id"],
+                "File": row["file_name"],
+                "Role": row["role"],
+                "Score": row["overall_score"],
+            } for row in rows]),
+            hide_index=True,
+            use_container_width=True
+        )
+
+    col1, col2, col3 = st.columns([1, 1, 2])
+    with col1:
+        if st.button("Previous", disabled=page == 0, key="search_prev"):
+            st.session_state.search_page = page - 1
+            st.rerun()
+    with col2:
+        if st.button("Next", disabled=page >= pages - 1, key="search_next"):
+            st.session_state.search_page = page + 1
+            st.rerun()
+    with col3:
+        if rows and open_candidate_func:
+            candidate_id = st.selectbox(
+                "Open candidate:",
+                [row["id"] for row in rows],
+                format_func=lambda cid: next(f"#{r['id']} {r['file_name']} ({r['overall_score']})" for r in rows if r["id"] == cid),
+                key="search_open"
+            )
+            if st.button("Load Analysis", key="search_load"):
+                if open_candidate_func(candidate_id):
+                    st.success("Candidate loaded. Open the other tabs to continue.")
+
+    st.markdown('</div>', unsafe_allow_html=True)